@@ -0,0 +1,125 @@
+"""
+Benchmark for the bolt storage of WaveSim and ArrayWaveSim.
+
+This script times one frame of bolt work (moving every bolt, removing the ones that
+have left the window, and testing the alien bolts against the ship) with the list of
+SimBolt records in WaveSim, and with the SimBolts arrays in ArrayWaveSim.  Bolts that
+leave the window are fired again, so the number of bolts in play stays the same.  It
+then times a whole seeded game with each class.
+
+With the handful of bolts in a normal game, the per-call overhead of NumPy dominates
+and the list wins, which is why WaveSim keeps it.  The arrays win by a wide margin
+once there are hundreds of bolts, which is what the bullet-heavy modes need.
+
+Run it from the root of the repository:
+
+    python benchmarks/bench_bolts.py
+"""
+import os
+import sys
+import random
+import time
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','invaders'))
+from consts import *
+from simulation import ArrayWaveSim, SimBolt, SimBolts, SimInput, WaveSim
+
+# The number of frames to time
+FRAMES = 200
+# The number of runs of each timing (the fastest is reported)
+REPEAT = 5
+# The number of frames in a timed game
+GAME_FRAMES = 3000
+# The center of the ship
+SHIP_X = GAME_WIDTH/2
+SHIP_Y = SHIP_BOTTOM
+
+
+def fire(rng):
+    """
+    Returns the (x,y,velocity) of a new random bolt.
+    """
+    if rng.random() < 0.5:
+        return (rng.uniform(0,GAME_WIDTH),rng.uniform(0,GAME_HEIGHT),BOLT_SPEED)
+    return (rng.uniform(0,GAME_WIDTH),rng.uniform(0,GAME_HEIGHT),-BOLT_SPEED)
+
+
+def list_frames(count,rng):
+    """
+    Returns the seconds per frame using a list of records, as in WaveSim.
+    """
+    bolts = [SimBolt(*fire(rng)) for _ in range(count)]
+    halfW = (SHIP_WIDTH+BOLT_WIDTH)/2
+    halfH = (SHIP_HEIGHT+BOLT_HEIGHT)/2
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        kept = []
+        for bolt in bolts:
+            if bolt.velocity < 0 and abs(bolt.x-SHIP_X) < halfW:
+                if bolt.y-bolt.velocity > SHIP_Y-halfH and bolt.y < SHIP_Y+halfH:
+                    continue
+            kept.append(bolt)
+        bolts = kept
+        kept = []
+        for bolt in bolts:
+            bolt.y += bolt.velocity
+            if 0 <= bolt.y <= GAME_HEIGHT:
+                kept.append(bolt)
+        bolts = kept
+        while len(bolts) < count:
+            bolts.append(SimBolt(*fire(rng)))
+    return (time.perf_counter()-start)/FRAMES
+
+
+def array_frames(count,rng):
+    """
+    Returns the seconds per frame using SimBolts, as in ArrayWaveSim.
+    """
+    bolts = SimBolts(count)
+    for _ in range(count):
+        bolts.add(*fire(rng))
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        bolts.removeTouching(SHIP_X,SHIP_Y,SHIP_WIDTH,SHIP_HEIGHT,False)
+        bolts.move()
+        while bolts.count() < count:
+            bolts.add(*fire(rng))
+    return (time.perf_counter()-start)/FRAMES
+
+
+def game_frames(cls):
+    """
+    Returns the seconds per frame of a seeded game of class cls.
+    """
+    rng = random.Random(1)
+    wave = cls(1)
+    input = SimInput()
+    start = time.perf_counter()
+    for frame in range(GAME_FRAMES):
+        input.clear()
+        for key in ('left','right','spacebar'):
+            if rng.random() < 0.3:
+                input.press(key)
+        if wave.getShip() is None:
+            wave.setShip()
+            wave.setShipCol()
+        wave.update(input,1/60)
+    return (time.perf_counter()-start)/GAME_FRAMES
+
+
+def main():
+    """
+    Runs the benchmark and prints a table of the results.
+    """
+    print('%8s %14s %14s %9s' % ('bolts','list (us)','arrays (us)','speedup'))
+    for count in (4,16,64,1000,10000):
+        slow = min(list_frames(count,random.Random(count)) for _ in range(REPEAT))
+        fast = min(array_frames(count,random.Random(count)) for _ in range(REPEAT))
+        print('%8d %14.1f %14.1f %8.1fx' % (count,slow*1e6,fast*1e6,slow/fast))
+    slow = min(game_frames(WaveSim) for _ in range(REPEAT))
+    fast = min(game_frames(ArrayWaveSim) for _ in range(REPEAT))
+    print('%8s %14.1f %14.1f %8.1fx' % ('game',slow*1e6,fast*1e6,slow/fast))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark for GObject.contains.
+
+This script times single-point containment tests against a rectangle, with the
+current GObject.contains and with the original version of that method, which
+imported numpy, validated the point with is_num_tuple, and (for rotated shapes)
+built a new inverse matrix on every call.  The original rotated branch could not
+run at all (it indexed the map returned by Matrix._transform), so the copy here
+converts that map to a tuple.
+
+The script also times contains_many on the same points, to show the cost per point
+of the batch version.
+
+Run it from the root of the repository:
+
+    python benchmarks/bench_contains.py
+"""
+import os
+import sys
+import random
+import time
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','invaders'))
+from game2d import GRectangle
+from game2d.gobject import is_num_tuple
+from introcs.geom import Point2
+
+# The number of points tested in each run
+POINTS = 20000
+# The number of runs to time (the best one is reported)
+RUNS   = 5
+
+
+def original_contains(self,point):
+    """
+    Returns True if the shape contains the point, using the original algorithm.
+    """
+    import numpy as np
+    if isinstance(point,Point2):
+        point = (point.x,point.y)
+    assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
+
+    if self._rotate.angle != 0.0:
+        point = tuple(self.matrix.inverse()._transform(point[0],point[1]))
+
+    return abs(point[0]-self.x) < self.width/2.0 and abs(point[1]-self.y) < self.height/2.0
+
+
+def best_time(func,shape,points):
+    """
+    Returns the best time per point (in microseconds) of func over RUNS runs.
+    """
+    best = None
+    for run in range(RUNS):
+        start = time.perf_counter()
+        for point in points:
+            func(shape,point)
+        elapsed = time.perf_counter()-start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best*1e6/len(points)
+
+
+def best_batch(shape,points):
+    """
+    Returns the best time per point (in microseconds) of contains_many over RUNS runs.
+    """
+    best = None
+    for run in range(RUNS):
+        start = time.perf_counter()
+        shape.contains_many(points)
+        elapsed = time.perf_counter()-start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best*1e6/len(points)
+
+
+def main():
+    """
+    Runs the benchmark and prints a table of the results.
+    """
+    rng = random.Random(0)
+    points = [(rng.uniform(0,200),rng.uniform(0,200)) for _ in range(POINTS)]
+    print('%8s %16s %16s %9s %16s' % ('angle','original (us)','contains (us)','speedup','many (us)'))
+    for angle in (0,30):
+        shape = GRectangle(x=100,y=100,width=80,height=40,angle=angle)
+        slow = best_time(original_contains,shape,points)
+        fast = best_time(GRectangle.contains,shape,points)
+        many = best_batch(shape,points)
+        print('%8d %16.3f %16.3f %8.1fx %16.3f' % (angle,slow,fast,slow/fast,many))
+
+
+if __name__ == '__main__':
+    main()
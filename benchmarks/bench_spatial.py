@@ -0,0 +1,96 @@
+"""
+Benchmark for the game2d spatial hash.
+
+This script compares finding the objects hit by a set of bolts with GSpatialHash
+against the all-pairs loop used by the original Wave collision code, at 100, 1,000
+and 10,000 objects.  The objects are alien-sized rectangles scattered at a constant
+density, and every frame each object moves a little (as a marching wave would), so
+the hash timings include the incremental updates.
+
+Run it from the root of the repository:
+
+    python benchmarks/bench_spatial.py
+"""
+import os
+import sys
+import random
+import time
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','invaders'))
+from game2d import GRectangle, GSpatialHash
+
+# The number of bolts tested against the objects each frame
+BOLTS  = 50
+# The number of frames to time
+FRAMES = 20
+# The distance between objects, on average
+SPACING = 50
+
+
+def overlaps(a,b):
+    """
+    Returns True if the bounding boxes of a and b overlap
+    """
+    return a.left <= b.right and a.right >= b.left and a.bottom <= b.top and a.top >= b.bottom
+
+
+def make_scene(count,rng):
+    """
+    Returns a list of count objects and a list of BOLTS bolts in a square world.
+    """
+    side = int(SPACING*count**0.5)
+    objects = [GRectangle(x=rng.uniform(0,side),y=rng.uniform(0,side),width=33,height=33)
+               for _ in range(count)]
+    bolts = [GRectangle(x=rng.uniform(0,side),y=rng.uniform(0,side),width=4,height=16)
+             for _ in range(BOLTS)]
+    return objects, bolts
+
+
+def brute_force(objects,bolts):
+    """
+    Returns the seconds per frame and the number of hits using all pairs.
+    """
+    hits = 0
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        for obj in objects:
+            obj.x += 1 if frame % 2 == 0 else -1
+        for bolt in bolts:
+            for obj in objects:
+                if overlaps(bolt,obj):
+                    hits += 1
+    return (time.perf_counter()-start)/FRAMES, hits
+
+
+def spatial_hash(objects,bolts):
+    """
+    Returns the seconds per frame and the number of hits using GSpatialHash.
+    """
+    index = GSpatialHash(64)
+    for obj in objects:
+        index.insert(obj)
+    hits = 0
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        for obj in objects:
+            obj.x += 1 if frame % 2 == 0 else -1
+        for bolt in bolts:
+            hits += len(index.query_object(bolt))
+    return (time.perf_counter()-start)/FRAMES, hits
+
+
+def main():
+    """
+    Runs the benchmark and prints a table of the results.
+    """
+    print('%8s %14s %14s %9s' % ('objects','brute (ms)','hash (ms)','speedup'))
+    for count in (100,1000,10000):
+        objects, bolts = make_scene(count,random.Random(count))
+        slow, expected = brute_force(objects,bolts)
+        fast, actual = spatial_hash(objects,bolts)
+        assert actual == expected, 'the hash found %d hits, not %d' % (actual,expected)
+        print('%8d %14.3f %14.3f %8.1fx' % (count,slow*1000,fast*1000,slow/fast))
+
+
+if __name__ == '__main__':
+    main()
@@ -25,4 +25,5 @@ from app import *
 
 # Application code
 if __name__ == '__main__':
-    Invaders(width=GAME_WIDTH,height=GAME_HEIGHT).run()
+    Invaders(width=GAME_WIDTH,height=GAME_HEIGHT,timestep=GAME_TIMESTEP,
+             maxsteps=GAME_MAXSTEPS,turbo=GAME_TURBO).run()
@@ -0,0 +1,426 @@
+"""
+Batched simulation module for Alien Invaders
+
+This module contains WaveBatch, which simulates many independent waves at
+once.  Every piece of wave state is a NumPy array whose first axis is the
+wave index: the aliens are stored as arrays of shape (N, ALIEN_ROWS,
+ALIENS_IN_ROW), and the bolts are stored in padded arrays of shape
+(N, capacity).  A single call to step advances all of the waves by one frame.
+
+The rules are the same as WaveSim in simulation.py; see that class for the
+details.  WaveBatch also plays the part of Invaders: a destroyed ship is
+restored on the next step (as if the player pressed 'S'), and a wave that is
+won or lost stops changing.
+
+Like simulation.py, this module must never import game2d.
+"""
+from consts import *
+import numpy as np
+
+
+class WaveBatch(object):
+    """
+    This class simulates N independent waves of Alien Invaders with NumPy.
+
+    The input for each step is given as arrays of N booleans, one for each
+    of the keys 'left', 'right' and 'spacebar'.  A new bolt is fired when the
+    spacebar is down and no key was down the frame before, exactly like
+    Wave and WaveSim.
+
+    Alien fire uses a NumPy random generator shared by the whole batch, so a
+    batch is reproducible from its seed, but wave i will not fire the same
+    bolts as a WaveSim with the same seed.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _size: the number of waves in the batch
+    # Invariant: _size is an int > 0
+    #
+    # Attribute _alive: whether each alien is alive
+    # Invariant: _alive is a bool array of shape (N, ALIEN_ROWS, ALIENS_IN_ROW)
+    #
+    # Attribute _alienX, _alienY: the center of each alien
+    # Invariant: _alienX and _alienY are float arrays with the shape of _alive
+    #
+    # Attribute _boltX, _boltY, _boltV: the position and velocity of each bolt slot
+    # Invariant: _boltX, _boltY and _boltV are float arrays of shape (N, capacity)
+    #
+    # Attribute _boltOn: whether each bolt slot is in use
+    # Invariant: _boltOn is a bool array of shape (N, capacity)
+    #
+    # Attribute _shipX: the horizontal coordinate of each ship
+    # Invariant: _shipX is a float array of shape (N,)
+    #
+    # Attribute _shipOn: whether each wave has a ship
+    # Invariant: _shipOn is a bool array of shape (N,)
+    #
+    # Attribute _deathTime: the time spent in each ship explosion
+    # Invariant: _deathTime is a float array of shape (N,), < 0 if not exploding
+    #
+    # Attribute _lives, _direction, _lastkeys, _randStep, _stepsSince: as in WaveSim
+    # Invariant: each is an int array of shape (N,)
+    #
+    # Attribute _time: the time since the last alien step of each wave
+    # Invariant: _time is a float array of shape (N,)
+    #
+    # Attribute _shipCol, _waveEmpty, _contactLine: as in WaveSim
+    # Invariant: each is a bool array of shape (N,)
+    #
+    # Attribute _frames: the number of frames each wave has been played
+    # Invariant: _frames is an int array of shape (N,)
+    #
+    # Attribute _shots: the number of player bolts fired in each wave
+    # Invariant: _shots is an int array of shape (N,)
+    #
+    # Attribute _rng: the random number generator for alien fire
+    # Invariant: _rng is a numpy.random.Generator
+
+    # GETTERS
+    def getSize(self):
+        """Returns the number of waves in this batch"""
+        return self._size
+
+    def getLives(self):
+        """Returns the array of lives left in each wave"""
+        return self._lives
+
+    def getWaveEmpty(self):
+        """Returns the array of wave emptiness flags"""
+        return self._waveEmpty
+
+    def getContactLine(self):
+        """Returns the array of defense line contact flags"""
+        return self._contactLine
+
+    def getShipCol(self):
+        """Returns the array of ship collision flags"""
+        return self._shipCol
+
+    def getFrames(self):
+        """Returns the array of frames played in each wave"""
+        return self._frames
+
+    def getShots(self):
+        """Returns the array of player bolts fired in each wave"""
+        return self._shots
+
+    def getAlive(self):
+        """Returns the (N, ALIEN_ROWS, ALIENS_IN_ROW) array of living aliens"""
+        return self._alive
+
+    def getDone(self):
+        """
+        Returns the array of finished waves.
+
+        A wave is finished when it is won or lost, which is when Invaders
+        would switch to STATE_COMPLETE.
+        """
+        return self._waveEmpty | self._contactLine | (self._lives <= 0)
+
+    # INITIALIZER
+    def __init__(self, size, capacity=16, seed=None):
+        """
+        The initializer for the WaveBatch class.
+
+        Parameter size: the number of waves to simulate
+        Precondition: size is an int > 0
+
+        Parameter capacity: the maximum number of bolts in play in one wave
+        Precondition: capacity is an int > 1
+
+        Parameter seed: the seed for alien fire (None for a random seed)
+        Precondition: seed is None or a value accepted by numpy.random.default_rng
+        """
+        assert type(size) == int and size > 0, '%s is not a valid size' % repr(size)
+        assert type(capacity) == int and capacity > 1, '%s is not a valid capacity' % repr(capacity)
+        self._size = size
+        self._rng = np.random.default_rng(seed)
+
+        shape = (size,ALIEN_ROWS,ALIENS_IN_ROW)
+        cols = ALIEN_H_SEP + ALIEN_H_SEP*np.arange(ALIENS_IN_ROW,dtype=float)
+        rows = GAME_HEIGHT - (ALIEN_CEILING + ALIEN_V_SEP*np.arange(ALIEN_ROWS,dtype=float))
+        self._alive  = np.ones(shape,dtype=bool)
+        self._alienX = np.broadcast_to(cols[None,None,:],shape).copy()
+        self._alienY = np.broadcast_to(rows[None,:,None],shape).copy()
+
+        self._boltX  = np.zeros((size,capacity))
+        self._boltY  = np.zeros((size,capacity))
+        self._boltV  = np.zeros((size,capacity))
+        self._boltOn = np.zeros((size,capacity),dtype=bool)
+
+        self._shipX  = np.full(size,GAME_WIDTH/2)
+        self._shipOn = np.ones(size,dtype=bool)
+        self._deathTime = np.full(size,-1.0)
+
+        self._lives = np.full(size,SHIP_LIVES)
+        self._direction = np.ones(size,dtype=int)
+        self._lastkeys = np.zeros(size,dtype=int)
+        self._randStep = self._rng.integers(1,BOLT_RATE+1,size)
+        self._stepsSince = np.zeros(size,dtype=int)
+        self._time = np.zeros(size)
+
+        self._shipCol = np.zeros(size,dtype=bool)
+        self._waveEmpty = np.zeros(size,dtype=bool)
+        self._contactLine = np.zeros(size,dtype=bool)
+        self._frames = np.zeros(size,dtype=int)
+        self._shots = np.zeros(size,dtype=int)
+
+    # UPDATE METHOD
+    def step(self, left, right, fire, dt):
+        """
+        Advances every unfinished wave by a single animation frame.
+
+        Parameter left, right, fire: whether 'left', 'right' and 'spacebar'
+        are held down in each wave
+        Precondition: each is a bool or a bool array of shape (N,)
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        n = self._size
+        left  = np.broadcast_to(np.asarray(left,dtype=bool),(n,))
+        right = np.broadcast_to(np.asarray(right,dtype=bool),(n,))
+        fire  = np.broadcast_to(np.asarray(fire,dtype=bool),(n,))
+
+        active = ~self.getDone()
+        self._respawn(active)
+        self._frames[active] += 1
+
+        self._waveEmpty[active] = ~self._alive[active].any(axis=(1,2))
+        touch = self._alive & (self._alienY - ALIEN_HEIGHT/2 <= DEFENSE_LINE)
+        self._contactLine[active] = touch[active].any(axis=(1,2))
+
+        self._detShipCol(active)
+        playing = active & ~self._waveEmpty
+        self._detAlCol(playing)
+        self._moveWave(playing,dt)
+        self._alienFire(playing & (self._stepsSince == self._randStep))
+
+        control = active & self._shipOn & ~self._shipCol
+        self._moveShip(control,left,right)
+        self._boltKeyPress(control,left,right,fire)
+        self._explode(active & self._shipOn & self._shipCol,dt)
+        self._moveBolt(active)
+
+    # HELPER METHODS
+    def _respawn(self, mask):
+        """
+        Restores the ship in every masked wave that lost it.
+
+        Parameter mask: the waves to update
+        Precondition: mask is a bool array of shape (N,)
+        """
+        dead = mask & ~self._shipOn
+        self._shipOn[dead] = True
+        self._shipX[dead] = GAME_WIDTH/2
+        self._shipCol[dead] = False
+        self._deathTime[dead] = -1.0
+
+    def _overlaps(self, bx, by, bv, x, y, width, height):
+        """
+        Returns the array of bolts that touched the boxes centered at (x,y)
+        during the last frame.
+
+        This is the swept bolt test from SimBolts.touching applied elementwise.
+        Bolts only move vertically, so the bolt touched a box if it is lined
+        up with the box horizontally, and the span from by-bv to by overlaps
+        the box vertically.
+
+        Parameter bx, by: the bolt centers
+        Precondition: bx and by are float arrays
+
+        Parameter bv: the bolt velocities
+        Precondition: bv is a float array broadcastable with bx and by
+
+        Parameter x, y: the box centers
+        Precondition: x and y are float arrays broadcastable with bx and by
+
+        Parameter width, height: the size of the boxes
+        Precondition: width and height are numbers > 0
+        """
+        halfH = (height+BOLT_HEIGHT)/2
+        start = by-bv
+        return ((np.abs(bx-x) < (width+BOLT_WIDTH)/2) &
+                (np.minimum(start,by) < y+halfH) & (np.maximum(start,by) > y-halfH))
+
+    def _detShipCol(self, mask):
+        """
+        Removes every alien bolt that hits a ship, costing a life for each.
+
+        Parameter mask: the waves to update
+        Precondition: mask is a bool array of shape (N,)
+        """
+        hits = self._boltOn & (self._boltV < 0) & (mask & self._shipOn)[:,None]
+        hits &= self._overlaps(self._boltX,self._boltY,self._boltV,self._shipX[:,None],
+                               SHIP_BOTTOM,SHIP_WIDTH,SHIP_HEIGHT)
+        count = hits.sum(axis=1)
+        self._boltOn &= ~hits
+        self._lives -= count
+        self._shipCol |= count > 0
+
+    def _detAlCol(self, mask):
+        """
+        Removes the player bolt from every masked wave where it hits an alien,
+        destroying the lowest (then leftmost) alien that it touched in the
+        last frame.
+
+        Parameter mask: the waves to update
+        Precondition: mask is a bool array of shape (N,)
+        """
+        player = self._boltOn & (self._boltV > 0) & mask[:,None]
+        waves = np.flatnonzero(player.any(axis=1))
+        if len(waves) == 0:
+            return
+        slots = np.argmax(player[waves],axis=1)
+        bx = self._boltX[waves,slots][:,None,None]
+        by = self._boltY[waves,slots][:,None,None]
+        bv = self._boltV[waves,slots][:,None,None]
+        hits = self._alive[waves] & self._overlaps(bx,by,bv,self._alienX[waves],
+                                                   self._alienY[waves],ALIEN_WIDTH,ALIEN_HEIGHT)
+        # A rising bolt enters the bottom row first, then left to right
+        order = hits[:,::-1,:].reshape(len(waves),-1)
+        found = order.any(axis=1)
+        first = np.argmax(order,axis=1)[found]
+        waves = waves[found]
+        rows = ALIEN_ROWS-1-first // ALIENS_IN_ROW
+        cols = first % ALIENS_IN_ROW
+        self._alive[waves,rows,cols] = False
+        self._boltOn[waves,slots[found]] = False
+
+    def _moveWave(self, mask, dt):
+        """
+        Marches every masked wave that is due for a step, dropping it down
+        and reversing it when it reaches an edge.
+
+        Parameter mask: the waves to update
+        Precondition: mask is a bool array of shape (N,)
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        stepping = mask & (self._time > ALIEN_SPEED)
+        self._alienX += (ALIEN_H_WALK*self._direction*stepping)[:,None,None]
+        self._time[stepping] = 0
+        self._stepsSince[stepping] += 1
+
+        left  = np.where(self._alive,self._alienX,np.inf).min(axis=(1,2))
+        right = np.where(self._alive,self._alienX,-np.inf).max(axis=(1,2))
+        edge  = (((self._direction == 1) & (GAME_WIDTH - ALIEN_H_SEP <= right)) |
+                 ((self._direction == -1) & (ALIEN_H_SEP >= left)))
+        reverse = stepping & edge
+        self._alienY -= (ALIEN_V_WALK*reverse)[:,None,None]
+        self._direction[reverse] *= -1
+        self._time[mask] += dt
+
+    def _alienFire(self, mask):
+        """
+        Fires an alien bolt in every masked wave, from the bottom alien of a
+        random nonempty column.
+
+        Parameter mask: the waves to update
+        Precondition: mask is a bool array of shape (N,)
+        """
+        self._stepsSince[mask] = 0
+        self._randStep[mask] = self._rng.integers(1,BOLT_RATE+1,mask.sum())
+
+        columns = self._alive.any(axis=1)
+        waves = np.flatnonzero(mask & columns.any(axis=1))
+        if len(waves) == 0:
+            return
+        pick = np.where(columns[waves],self._rng.random((len(waves),ALIENS_IN_ROW)),-1.0)
+        cols = np.argmax(pick,axis=1)
+        rows = ALIEN_ROWS-1-np.argmax(self._alive[waves,::-1,cols],axis=1)
+        self._addBolts(waves,self._alienX[waves,rows,cols],
+                       self._alienY[waves,rows,cols]-ALIEN_HEIGHT/2,-BOLT_SPEED)
+
+    def _addBolts(self, waves, x, y, velocity):
+        """
+        Puts a new bolt in the first free slot of each of the given waves,
+        and returns the array of waves that got one.
+
+        A wave with no free slot does not get the bolt.
+
+        Parameter waves: the waves to add a bolt to
+        Precondition: waves is an int array of distinct wave indices
+
+        Parameter x, y: the bolt centers
+        Precondition: x and y are float arrays with the same length as waves
+
+        Parameter velocity: the bolt velocity
+        Precondition: velocity is an int or float
+        """
+        free = ~self._boltOn[waves]
+        room = free.any(axis=1)
+        slots = np.argmax(free,axis=1)[room]
+        waves = waves[room]
+        self._boltX[waves,slots] = np.asarray(x)[room]
+        self._boltY[waves,slots] = np.asarray(y)[room]
+        self._boltV[waves,slots] = velocity
+        self._boltOn[waves,slots] = True
+        return waves
+
+    def _moveShip(self, mask, left, right):
+        """
+        Moves every masked ship left or right, keeping it on screen.
+
+        Parameter mask: the waves to update
+        Precondition: mask is a bool array of shape (N,)
+
+        Parameter left, right: whether 'left' and 'right' are held down
+        Precondition: left and right are bool arrays of shape (N,)
+        """
+        goLeft = mask & left & (self._shipX > SHIP_WIDTH/2)
+        self._shipX[goLeft] -= SHIP_MOVEMENT
+        goRight = mask & right & (self._shipX < GAME_WIDTH-(SHIP_WIDTH/2))
+        self._shipX[goRight] += SHIP_MOVEMENT
+
+    def _boltKeyPress(self, mask, left, right, fire):
+        """
+        Fires a player bolt in every masked wave with a new press of the
+        spacebar and no player bolt in play.
+
+        Parameter mask: the waves to update
+        Precondition: mask is a bool array of shape (N,)
+
+        Parameter left, right, fire: whether each key is held down
+        Precondition: each is a bool array of shape (N,)
+        """
+        count = left.astype(int) + right + fire
+        ready = ~(self._boltOn & (self._boltV > 0)).any(axis=1)
+        change = mask & (count > 0) & (self._lastkeys == 0) & fire & ready
+        waves = np.flatnonzero(change)
+        fired = self._addBolts(waves,self._shipX[waves],
+                               np.full(len(waves),SHIP_BOTTOM+SHIP_HEIGHT/2),BOLT_SPEED)
+        self._shots[fired] += 1
+        self._lastkeys[mask] = count[mask]
+
+    def _explode(self, mask, dt):
+        """
+        Advances the ship explosion in every masked wave, removing the ship
+        and clearing the bolts when the explosion is over.
+
+        Parameter mask: the waves to update
+        Precondition: mask is a bool array of shape (N,)
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        starting = mask & (self._deathTime < 0)
+        running  = mask & ~starting
+        self._deathTime[starting] = 0
+        self._deathTime[running] += dt
+        over = running & (self._deathTime >= DEATH_SPEED)
+        self._shipOn[over] = False
+        self._boltOn[over] = False
+
+    def _moveBolt(self, mask):
+        """
+        Moves every bolt in the masked waves, removing those that have left
+        the window.
+
+        Parameter mask: the waves to update
+        Precondition: mask is a bool array of shape (N,)
+        """
+        moving = self._boltOn & mask[:,None]
+        self._boltY += np.where(moving,self._boltV,0)
+        gone = moving & ((self._boltY > GAME_HEIGHT) | (self._boltY < 0))
+        self._boltOn &= ~gone
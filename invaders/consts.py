@@ -73,6 +73,8 @@ BOLT_HEIGHT = 16
 BOLT_SPEED  = 10
 # the number of ALIEN STEPS (not frames) between bolts
 BOLT_RATE   = 5
+# the default number of slots in the bolt arrays (see SimBolts in simulation.py)
+BOLT_CAPACITY = 64
 
 
 ### GAME CONSTANTS ###
@@ -91,6 +93,16 @@ STATE_CONTINUE = 4
 STATE_COMPLETE = 5
 
 
+### TIMING CONSTANTS ###
+
+# the number of seconds in each fixed simulation step
+GAME_TIMESTEP = 1/60
+# the maximum number of simulation steps to catch up on in one frame
+GAME_MAXSTEPS = 5
+# the number of simulation steps per step of real time (fast-forward)
+GAME_TURBO    = 1
+
+
 ### USE COMMAND LINE ARGUMENTS TO CHANGE NUMBER OF ALIENS IN A ROW
 """
 sys.argv is a list of the command line arguments when you run Python. These
@@ -100,7 +112,11 @@ arguments are everything after the word python. So if you start the game typing
 
 Python puts ['breakout.py', '3', '4', '0.5'] into sys.argv. Below, we take
 advantage of this fact to change the constants ALIEN_ROWS, ALIENS_IN_ROW, and
-ALIEN_SPEED.
+ALIEN_SPEED.  An optional fourth argument sets GAME_TURBO, so
+
+    python invaders 5 12 1.0 20
+
+plays the game at twenty times normal speed.
 """
 try:
     rows = int(sys.argv[1])
@@ -123,6 +139,13 @@ try:
 except:
     pass # Use original value
 
+try:
+    turbo = float(sys.argv[4])
+    if turbo > 0 and turbo <= 100:
+        GAME_TURBO = turbo
+except:
+    pass # Use original value
+
 ### ADD MORE CONSTANTS (PROPERLY COMMENTED) AS NECESSARY ###
 
 #the image file for a sprite that animates the ship explosion
@@ -0,0 +1,447 @@
+"""
+Formation module for Alien Invaders
+
+This module contains the class Formation, which stores the aliens of a wave
+as a structure of NumPy arrays instead of a 2D list of objects.  There is one
+array each for the x-coordinates, the y-coordinates, the alive flags and the
+alien types, all of shape (rows, columns).
+
+The coordinate arrays are formation-local: they hold the starting layout of
+the wave, and never change.  The formation keeps a single offset for how far
+the wave has marched, so a march step is one addition no matter how many
+aliens there are.  Wave draws the aliens the same way, with one GSpriteBatch
+per alien image.  The sprites are at the formation-local positions, and the
+position of each batch is the offset.
+
+The formation also keeps an index of the living aliens (the total count, the
+count in each column, and the bottom-most living alien in each column), and
+the bounds of the living aliens (the leftmost and rightmost columns and the
+lowest row).  These are only updated when an alien dies or the wave marches,
+so checking whether the wave is empty, choosing the next alien to fire, and
+checking the edges of the window and the defense line take constant time.
+
+Bolts are tested against the aliens with a swept (continuous) test: the
+function sweepBox intersects the segment a bolt moved along in its last frame
+with the box of an alien, so a fast bolt (or a slow frame rate) can never
+tunnel through an alien between two frames.
+
+Like simulation.py, this module must never import game2d.
+"""
+from consts import *
+import numpy as np
+import math
+
+
+def sweepBox(x0, y0, x1, y1, cx, cy, halfW, halfH):
+    """
+    Returns the fraction of the segment (x0,y0)-(x1,y1) before it enters a box.
+
+    The box is centered at (cx,cy) and does not include its edges, just
+    like the overlap tests in WaveSim.  The value is 0 if the segment starts
+    inside of the box, and None if the segment never enters it.  This is the
+    slab method: the segment is clipped against the two horizontal edges and
+    the two vertical edges in turn.
+
+    To sweep a box of size (w,h) instead of a point, add w/2 and h/2 to
+    halfW and halfH.
+
+    Parameter x0, y0: the start of the segment
+    Precondition: x0 and y0 are numbers
+
+    Parameter x1, y1: the end of the segment
+    Precondition: x1 and y1 are numbers
+
+    Parameter cx, cy: the center of the box
+    Precondition: cx and cy are numbers
+
+    Parameter halfW, halfH: half of the width and height of the box
+    Precondition: halfW and halfH are numbers >= 0
+    """
+    enter = -math.inf
+    leave = math.inf
+    for (start, delta, center, half) in ((x0,x1-x0,cx,halfW),(y0,y1-y0,cy,halfH)):
+        if delta == 0:
+            if not abs(start-center) < half:
+                return None
+        else:
+            near = (center-half-start)/delta
+            far  = (center+half-start)/delta
+            if near > far:
+                near, far = far, near
+            enter = max(enter,near)
+            leave = min(leave,far)
+
+    if enter < leave and enter < 1 and leave > 0:
+        return max(enter,0.0)
+    return None
+
+
+class Formation(object):
+    """
+    A class representing the grid of aliens in a wave.
+
+    Row 0 is the top row of the wave, and column 0 is the leftmost column,
+    just like the 2D list of aliens in the original Wave.  Destroyed aliens
+    keep their position (and keep marching with the rest of the wave), but
+    their alive flag is False.
+
+    The alien types are indices into ALIEN_IMAGES.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _x: the local horizontal coordinate of each alien center
+    # Invariant: _x is a float array of shape (rows, columns)
+    #
+    # Attribute _y: the local vertical coordinate of each alien center
+    # Invariant: _y is a float array of shape (rows, columns)
+    #
+    # Attribute _offsetX, _offsetY: how far the wave has marched
+    # Invariant: _offsetX and _offsetY are floats
+    #
+    # Attribute _colX: the local x-coordinate of each column
+    # Invariant: _colX is a list of floats, ALIEN_H_SEP apart
+    #
+    # Attribute _rowY: the local y-coordinate of each row
+    # Invariant: _rowY is a list of floats, ALIEN_V_SEP apart (decreasing)
+    #
+    # Attribute _alive: whether each alien is alive
+    # Invariant: _alive is a bool array of shape (rows, columns)
+    #
+    # Attribute _kind: the type of each alien
+    # Invariant: _kind is an int array of shape (rows, columns), with values
+    # that are valid indices into ALIEN_IMAGES
+    #
+    # Attribute _count: the number of living aliens
+    # Invariant: _count is an int >= 0, equal to the number of True in _alive
+    #
+    # Attribute _colCount: the number of living aliens in each column
+    # Invariant: _colCount is a list of ints >= 0, one for each column
+    #
+    # Attribute _bottom: the row of the bottom-most living alien in each column
+    # Invariant: _bottom is a list with one element per column, which is an int
+    # (a valid row) or None if the column is empty
+    #
+    # Attribute _leftCol, _rightCol: the leftmost and rightmost living columns
+    # Invariant: _leftCol is the smallest column whose _colCount > 0, and
+    # _rightCol is the largest; both are None if the formation is empty
+    #
+    # Attribute _columns: the columns with at least one living alien
+    # Invariant: _columns is a sorted list of the columns whose _colCount > 0,
+    # or None if it must be recomputed from _colCount
+    #
+    # Attribute _rowCount: the number of living aliens in each row
+    # Invariant: _rowCount is a list of ints >= 0, one for each row
+    #
+    # Attribute _lowRow: the lowest row with a living alien
+    # Invariant: _lowRow is the largest row whose _rowCount > 0, or None if empty
+    #
+    # Attribute _left, _right: the local x-coordinates of the leftmost and
+    # rightmost living columns
+    # Invariant: _left and _right are floats, or None if the formation is empty
+    #
+    # Attribute _low: the local y-coordinate of the lowest living row
+    # Invariant: _low is a float, or None if the formation is empty
+
+    # GETTERS
+    def getRows(self):
+        """Returns the number of rows in this formation"""
+        return self._alive.shape[0]
+
+    def getCols(self):
+        """Returns the number of columns in this formation"""
+        return self._alive.shape[1]
+
+    def getX(self):
+        """Returns the array of local alien x-coordinates"""
+        return self._x
+
+    def getY(self):
+        """Returns the array of local alien y-coordinates"""
+        return self._y
+
+    def getOffset(self):
+        """Returns the (x, y) distance the wave has marched"""
+        return (self._offsetX,self._offsetY)
+
+    def getAlive(self):
+        """Returns the array of alive flags"""
+        return self._alive
+
+    def getKind(self):
+        """Returns the array of alien types"""
+        return self._kind
+
+    def getSource(self, row, col):
+        """
+        Returns the image file for the alien at (row, col)
+
+        Parameter row, col: the position of the alien in the grid
+        Precondition: row and col are valid indices into this formation
+        """
+        return ALIEN_IMAGES[self._kind[row,col]]
+
+    # INITIALIZER
+    def __init__(self, rows=ALIEN_ROWS, cols=ALIENS_IN_ROW):
+        """
+        The initializer for the Formation class.
+
+        Creates a full formation laid out exactly as in the original Wave:
+        the top alien is ALIEN_CEILING below the top of the window, aliens are
+        ALIEN_H_SEP and ALIEN_V_SEP apart, and the images cycle (from the top)
+        through two rows of alien3, two of alien2 and two of alien1.
+
+        Parameter rows: the number of rows of aliens
+        Precondition: rows is an int > 0
+
+        Parameter cols: the number of aliens in each row
+        Precondition: cols is an int > 0
+        """
+        assert type(rows) == int and rows > 0, '%s is not a valid row count' % repr(rows)
+        assert type(cols) == int and cols > 0, '%s is not a valid column count' % repr(cols)
+        hpos = ALIEN_H_SEP + ALIEN_H_SEP*np.arange(cols,dtype=float)
+        vpos = GAME_HEIGHT - (ALIEN_CEILING + ALIEN_V_SEP*np.arange(rows,dtype=float))
+        self._x = np.tile(hpos,(rows,1))
+        self._y = np.tile(vpos[:,None],(1,cols))
+        self._colX = [float(x) for x in hpos]
+        self._rowY = [float(y) for y in vpos]
+        self._alive = np.ones((rows,cols),dtype=bool)
+        self._offsetX = 0.0
+        self._offsetY = 0.0
+
+        # Row % 6 in (5,0) -> alien3, (1,2) -> alien2, (3,4) -> alien1
+        kinds = 2 - ((np.arange(rows)+1) % 6)//2
+        self._kind = np.tile(kinds[:,None],(1,cols))
+
+        self._count = rows*cols
+        self._colCount = [rows]*cols
+        self._bottom = [rows-1]*cols
+        self._leftCol = 0
+        self._rightCol = cols-1
+        self._columns = list(range(cols))
+        self._rowCount = [cols]*rows
+        self._lowRow = rows-1
+        self._refit()
+
+    # PUBLIC METHODS
+    def isAlive(self, row, col):
+        """
+        Returns True if the alien at (row, col) is alive
+
+        Parameter row, col: the position of the alien in the grid
+        Precondition: row and col are valid indices into this formation
+        """
+        return bool(self._alive[row,col])
+
+    def kill(self, row, col):
+        """
+        Destroys the alien at (row, col), updating the index of living aliens.
+
+        Destroying an alien that is already dead does nothing.
+
+        Parameter row, col: the position of the alien in the grid
+        Precondition: row and col are valid indices into this formation
+        """
+        if not self._alive[row,col]:
+            return
+        self._alive[row,col] = False
+        self._count -= 1
+        self._colCount[col] -= 1
+        self._rowCount[row] -= 1
+        if self._colCount[col] == 0:
+            self._bottom[col] = None
+            self._columns = None
+            if self._count == 0:
+                self._leftCol = None
+                self._rightCol = None
+            else:
+                while self._colCount[self._leftCol] == 0:
+                    self._leftCol += 1
+                while self._colCount[self._rightCol] == 0:
+                    self._rightCol -= 1
+        elif self._bottom[col] == row:
+            above = row-1
+            while not self._alive[above,col]:
+                above -= 1
+            self._bottom[col] = above
+
+        if self._count == 0:
+            self._lowRow = None
+        elif self._rowCount[row] == 0 and self._lowRow == row:
+            while self._rowCount[self._lowRow] == 0:
+                self._lowRow -= 1
+        self._refit()
+
+    def count(self):
+        """Returns the number of living aliens"""
+        return self._count
+
+    def march(self, dx, dy):
+        """
+        Moves every alien by (dx, dy)
+
+        Parameter dx, dy: the distance to move
+        Precondition: dx and dy are numbers
+        """
+        self._offsetX += dx
+        self._offsetY += dy
+
+    def position(self, row, col):
+        """
+        Returns the (x, y) screen position of the alien at (row, col)
+
+        Parameter row, col: the position of the alien in the grid
+        Precondition: row and col are valid indices into this formation
+        """
+        return (float(self._x[row,col])+self._offsetX,float(self._y[row,col])+self._offsetY)
+
+    def extremes(self):
+        """
+        Returns the leftmost and rightmost x-coordinates of the living aliens.
+
+        Both values are None if every alien has been destroyed.
+        """
+        if self._count == 0:
+            return (None,None)
+        return (self._left+self._offsetX,self._right+self._offsetX)
+
+    def bottom(self):
+        """
+        Returns the lowest y-coordinate of a living alien center.
+
+        The value is None if every alien has been destroyed.
+        """
+        if self._count == 0:
+            return None
+        return self._low+self._offsetY
+
+    def columns(self):
+        """
+        Returns the sorted list of columns that contain a living alien.
+
+        This list is part of the index of this formation.  It must not be
+        modified.  It is only rebuilt (from the column counts) after a column
+        has been cleared.
+        """
+        if self._columns is None:
+            self._columns = [col for col in range(len(self._colCount)) if self._colCount[col] > 0]
+        return self._columns
+
+    def columnCount(self, col):
+        """
+        Returns the number of living aliens in column col.
+
+        Parameter col: the column to check
+        Precondition: col is a valid column index into this formation
+        """
+        return self._colCount[col]
+
+    def shooter(self, col):
+        """
+        Returns the row of the bottom-most living alien in column col.
+
+        The value is None if the column is empty.
+
+        Parameter col: the column to check
+        Precondition: col is a valid column index into this formation
+        """
+        return self._bottom[col]
+
+    def hit(self, x, y, width, height):
+        """
+        Returns the (row, col) of the alien hit by a box centered at (x,y).
+
+        If the box overlaps more than one living alien, the one in the bottom
+        row is chosen, and then the leftmost one in that row.  The value is
+        None if the box does not overlap any living alien.
+
+        The formation is a regular grid, so the cells the box can touch are
+        computed from its position relative to the grid origin.  Only those
+        cells (one or two in each direction for a bolt) are tested, so the
+        cost does not depend on the size of the formation.
+
+        Parameter x, y: the center of the box
+        Precondition: x and y are numbers
+
+        Parameter width, height: the size of the box
+        Precondition: width and height are numbers >= 0
+        """
+        x -= self._offsetX
+        y -= self._offsetY
+        halfW = (ALIEN_WIDTH+width)/2
+        halfH = (ALIEN_HEIGHT+height)/2
+
+        # Widen each range by a cell so rounding can never miss a hit
+        left  = max(0,int(math.floor((x-halfW-self._colX[0])/ALIEN_H_SEP)))
+        right = min(self.getCols()-1,int(math.ceil((x+halfW-self._colX[0])/ALIEN_H_SEP)))
+        top   = max(0,int(math.floor((self._rowY[0]-y-halfH)/ALIEN_V_SEP)))
+        low   = min(self.getRows()-1,int(math.ceil((self._rowY[0]-y+halfH)/ALIEN_V_SEP)))
+
+        for row in range(low,top-1,-1):
+            if abs(self._rowY[row]-y) < halfH:
+                for col in range(left,right+1):
+                    if abs(self._colX[col]-x) < halfW and self._alive[row,col]:
+                        return (row,col)
+        return None
+
+    def sweep(self, x0, y0, x1, y1, width, height):
+        """
+        Returns the (row, col) of the first alien hit by a moving box.
+
+        The box has the given size, and its center moves along the segment
+        from (x0,y0) to (x1,y1).  The alien hit is the living alien that the
+        box enters first along the segment (see sweepBox).  If the box enters
+        more than one at the same time, the one in the bottom row is chosen,
+        and then the leftmost one in that row.  The value is None if the box
+        does not touch any living alien along the way.
+
+        A segment of length 0 is the same test as hit.  As with hit, only the
+        cells around the segment are tested.
+
+        Parameter x0, y0: the center of the box at the start of the motion
+        Precondition: x0 and y0 are numbers
+
+        Parameter x1, y1: the center of the box at the end of the motion
+        Precondition: x1 and y1 are numbers
+
+        Parameter width, height: the size of the box
+        Precondition: width and height are numbers >= 0
+        """
+        x0 -= self._offsetX
+        x1 -= self._offsetX
+        y0 -= self._offsetY
+        y1 -= self._offsetY
+        halfW = (ALIEN_WIDTH+width)/2
+        halfH = (ALIEN_HEIGHT+height)/2
+
+        # Widen each range by a cell so rounding can never miss a hit
+        left  = max(0,int(math.floor((min(x0,x1)-halfW-self._colX[0])/ALIEN_H_SEP)))
+        right = min(self.getCols()-1,int(math.ceil((max(x0,x1)+halfW-self._colX[0])/ALIEN_H_SEP)))
+        top   = max(0,int(math.floor((self._rowY[0]-max(y0,y1)-halfH)/ALIEN_V_SEP)))
+        low   = min(self.getRows()-1,int(math.ceil((self._rowY[0]-min(y0,y1)+halfH)/ALIEN_V_SEP)))
+
+        found = None
+        first = None
+        for row in range(low,top-1,-1):
+            for col in range(left,right+1):
+                if self._alive[row,col]:
+                    t = sweepBox(x0,y0,x1,y1,self._colX[col],self._rowY[row],halfW,halfH)
+                    if t is not None and (first is None or t < first):
+                        found = (row,col)
+                        first = t
+        return found
+
+    # HIDDEN METHODS
+    def _refit(self):
+        """
+        Recomputes the local bounds of the living aliens from the index.
+
+        Every alien in a column has the same x-coordinate, and every alien in
+        a row has the same y-coordinate, so this only reads three cells.
+        """
+        if self._count == 0:
+            self._left = None
+            self._right = None
+            self._low = None
+        else:
+            self._left = float(self._x[0,self._leftCol])
+            self._right = float(self._x[0,self._rightCol])
+            self._low = float(self._y[self._lowRow,0])
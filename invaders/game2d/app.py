@@ -19,6 +19,7 @@ from kivy.clock  import Clock
 import numpy as np
 
 import os.path
+import tempfile
 
 class GameApp(kivy.app.App):
     """
@@ -41,6 +42,12 @@ class GameApp(kivy.app.App):
     """
     # Class attribute for tracking textures (to reduce memory footprint)
     TEXTURE_CACHE = {}
+    # Class attribute for the regions of the texture atlas (None until it is loaded)
+    ATLAS_CACHE = None
+    # The image formats that are packed into the texture atlas
+    ATLAS_FORMATS = ('.png','.jpg','.jpeg','.gif')
+    # The cache folder for the texture atlas (each Images folder gets its own subfolder)
+    ATLAS_FOLDER = os.path.join(tempfile.gettempdir(),'game2d-atlas')
     
     
     # MUTABLE ATTRIBUTES
@@ -65,6 +72,68 @@ class GameApp(kivy.app.App):
         self._fps = value
         Clock.schedule_interval(self._refresh,1.0/self._fps)
     
+    @property
+    def timestep(self):
+        """
+        The fixed simulation step in seconds, or None for a variable step
+        
+        If this value is None (the default), :meth:`update` is called exactly once per
+        animation frame with the time since the last frame.  Otherwise, the elapsed time
+        is collected in an accumulator, and :meth:`update` is called zero or more times
+        per frame, always with exactly this value.  This makes the game play the same
+        no matter the frame rate.
+        
+        **Invariant**: Must be None or an int or float > 0.
+        """
+        return self._timestep
+    
+    @timestep.setter
+    def timestep(self,value):
+        assert value is None or type(value) in [int,float], 'value %s is not a number' % repr(value)
+        assert value is None or value > 0, 'value %s is not positive' % repr(value)
+        self._timestep = value
+        self._accumulator = 0.0
+    
+    @property
+    def maxsteps(self):
+        """
+        The maximum number of fixed steps in a single animation frame
+        
+        If the game falls behind (for example, after the window is dragged), it will
+        only catch up this many steps in one frame, and drop the rest of the backlog.
+        This keeps a slow frame from causing an even slower frame.  This value is
+        multiplied by :attr:`turbo`.  It is unused if :attr:`timestep` is None.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._maxsteps
+    
+    @maxsteps.setter
+    def maxsteps(self,value):
+        assert type(value) == int, 'value %s is not an int' % repr(value)
+        assert value > 0, 'value %s is not positive' % repr(value)
+        self._maxsteps = value
+    
+    @property
+    def turbo(self):
+        """
+        The speed of the simulation relative to real time
+        
+        When :attr:`timestep` is not None, a turbo of 10 runs ten simulation steps for
+        every step of real time, while still drawing only once per animation frame.  This
+        is useful for fast-forwarding and soak tests.  It is unused if :attr:`timestep`
+        is None.
+        
+        **Invariant**: Must be an int or float > 0.
+        """
+        return self._turbo
+    
+    @turbo.setter
+    def turbo(self,value):
+        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        assert value > 0, 'value %s is not positive' % repr(value)
+        self._turbo = value
+    
     
     # IMMUTABLE PROPERTIES
     @property
@@ -182,15 +251,47 @@ class GameApp(kivy.app.App):
         if name in cls.TEXTURE_CACHE:
             return cls.TEXTURE_CACHE[name]
         
+        atlas = cls.load_atlas()
+        if name in atlas:
+            cls.TEXTURE_CACHE[name] = atlas[name]
+            return atlas[name]
+        
         try:
             from kivy.core.image import Image
             texture = Image(name).texture
             cls.TEXTURE_CACHE[name] = texture
-        except:
+        except Exception:
             texture = None
         
         return texture
     
+    @classmethod
+    def load_atlas(cls):
+        """
+        Returns: The regions of the texture atlas for the **Images** folder
+        
+        The atlas is a single texture that contains every image in the **Images** 
+        folder.  Drawing images from the same texture is faster, because the graphics 
+        card does not need to switch textures between them.  The value returned is a 
+        dictionary from each file name (e.g. ``'ship.png'``) to the region of the atlas 
+        for that image.  Regions can be used anywhere a texture can.  The method 
+        :meth:`load_texture` uses the atlas automatically, so you should not need to 
+        call this method yourself.
+        
+        The atlas is saved in a cache folder (``ATLAS_FOLDER``, in the temporary folder 
+        by default), never in **Images**, so it is only built once.  It is built again 
+        when an image is added, removed, or changed.  Building the atlas requires PIL.  
+        An image that PIL cannot read is left out of the atlas, and is loaded as its own
+        texture (if it can be).  If the atlas cannot be built or read at all, this method
+        returns an empty dictionary, and every image is loaded as its own texture.
+        """
+        if cls.ATLAS_CACHE is None:
+            try:
+                cls.ATLAS_CACHE = cls._load_atlas()
+            except (OSError, ValueError, ImportError):
+                cls.ATLAS_CACHE = {}
+        return cls.ATLAS_CACHE
+    
     @classmethod
     def unload_texture(cls,name):
         """
@@ -223,6 +324,9 @@ class GameApp(kivy.app.App):
             
             GameApp(width=400,height=400)
         
+        To simulate with a fixed step, also provide the keywords ``timestep``, ``maxsteps``
+        and ``turbo``.  See the documentation of those attributes for more information.
+        
         The game window will not show until you start the game. To start the game, use 
         the method ``run()``.
         
@@ -244,6 +348,9 @@ class GameApp(kivy.app.App):
         self._gwidth = w
         self._gheight = h
         self._fps = f
+        self.timestep = keywords.pop('timestep', None)
+        self.maxsteps = keywords.pop('maxsteps', 5)
+        self.turbo = keywords.pop('turbo', 1)
         
         Config.set('graphics', 'width', str(self.width))
         Config.set('graphics', 'height', str(self.height))
@@ -347,14 +454,173 @@ class GameApp(kivy.app.App):
         Processes a single animation frame.
         
         This method a callback-proxy for the methods `update` and `draw`.  It handles
-        important issues behind the scenes, particularly with clearing the window.
+        important issues behind the scenes, particularly with clearing the window and
+        with running the fixed simulation steps.
         
         :param dt: time in seconds since last update
         :type dt:  ``int`` or ``float``
         """
         self.view.clear()
-        self.update(dt)
+        if self._timestep is None:
+            self.update(dt)
+        else:
+            self._accumulator += dt*self._turbo
+            limit = max(1,int(self._maxsteps*self._turbo))
+            steps = 0
+            while self._accumulator >= self._timestep and steps < limit:
+                self.update(self._timestep)
+                self._accumulator -= self._timestep
+                steps += 1
+            if steps == limit:
+                # Drop the backlog we could not catch up on
+                self._accumulator %= self._timestep
         self.draw()
+        self.view._flush()
+    
+    @classmethod
+    def _load_atlas(cls):
+        """
+        Returns: The regions of the texture atlas, building the atlas if it is stale
+        
+        Only images with a file extension in ``ATLAS_FORMATS`` are packed.  The region 
+        of an image is named by its file name without the extension, so images that 
+        only differ in their extension are not packed.  Images that PIL cannot read are
+        skipped.
+        
+        Next to the atlas, a manifest records the modification time and size of every
+        image when the atlas was built, and which of them were packed.  The atlas is
+        built again whenever the images no longer match the manifest.
+        """
+        import json
+        from kivy.atlas import Atlas
+        
+        folder = cls.images
+        stems  = {}
+        for name in sorted(os.listdir(folder)):
+            (stem, ext) = os.path.splitext(name)
+            if ext.lower() in cls.ATLAS_FORMATS and os.path.isfile(os.path.join(folder,name)):
+                stems.setdefault(stem,[]).append(name)
+        names = dict((stem,files[0]) for (stem,files) in stems.items() if len(files) == 1)
+        if not names:
+            return {}
+        
+        outname  = os.path.join(cls._atlas_folder(),'images')
+        outfile  = outname+'.atlas'
+        manifest = outname+'.json'
+        sources  = cls._atlas_sources(names)
+        if not cls._atlas_fresh(outfile,manifest,sources):
+            cachedir = os.path.dirname(outname)
+            if not os.path.isdir(cachedir):
+                os.makedirs(cachedir)
+            for name in os.listdir(cachedir):
+                os.remove(os.path.join(cachedir,name))
+            packed = [stem for stem in sorted(names) 
+                      if cls._atlas_readable(os.path.join(folder,names[stem]))]
+            if packed:
+                files = [os.path.join(folder,names[stem]) for stem in packed]
+                size = 256
+                while True:
+                    (outfile, meta) = Atlas.create(outname,files,size)
+                    if len(meta) == 1 or size >= 4096:
+                        break
+                    for page in meta:
+                        os.remove(os.path.join(cachedir,page))
+                    size *= 2
+            with open(manifest,'w') as file:
+                json.dump({'sources':sources,'packed':packed},file)
+        
+        if not os.path.isfile(outfile):
+            return {}
+        atlas = Atlas(outfile)
+        return dict((names[stem],atlas[stem]) for stem in names if stem in atlas.textures)
+    
+    @classmethod
+    def _atlas_folder(cls):
+        """
+        Returns: The cache folder for the atlas of the **Images** folder
+        
+        Every **Images** folder gets its own subfolder of ``ATLAS_FOLDER``, named from a
+        hash of its absolute path, so that two games never share an atlas.
+        """
+        import hashlib
+        path = os.path.abspath(cls.images).encode('utf-8')
+        return os.path.join(cls.ATLAS_FOLDER,hashlib.sha1(path).hexdigest()[:16])
+    
+    @classmethod
+    def _atlas_sources(cls,names):
+        """
+        Returns: The modification time (in nanoseconds) and size of each image
+        
+        :param names: The images in the atlas, keyed by region name
+        :type names:  ``dict``
+        
+        :return: A pair [mtime, size] for each image, keyed by file name
+        :rtype:  ``dict``
+        """
+        sources = {}
+        for name in names.values():
+            stat = os.stat(os.path.join(cls.images,name))
+            sources[name] = [stat.st_mtime_ns,stat.st_size]
+        return sources
+    
+    @classmethod
+    def _atlas_readable(cls,path):
+        """
+        Returns: True if PIL can read the image at ``path``; False otherwise
+        
+        :param path: The image file
+        :type path:  ``str``
+        """
+        from PIL import Image
+        try:
+            with Image.open(path) as image:
+                image.load()
+            return True
+        except (OSError, ValueError):
+            return False
+    
+    @classmethod
+    def _atlas_fresh(cls,outfile,manifest,sources):
+        """
+        Returns: True if the atlas was built from exactly these images, and is complete
+        
+        The images match if the manifest records the same modification time and size 
+        for each of them.  Comparing the stored values, rather than checking that the 
+        atlas is newer than every image, also catches an image that was replaced by an
+        older copy.
+        
+        :param outfile: The atlas file
+        :type outfile:  ``str``
+        
+        :param manifest: The manifest file
+        :type manifest:  ``str``
+        
+        :param sources: The modification time and size of each image, keyed by file name
+        :type sources:  ``dict``
+        """
+        import json
+        if not os.path.isfile(manifest):
+            return False
+        
+        with open(manifest) as file:
+            record = json.load(file)
+        if record.get('sources') != sources:
+            return False
+        packed = set(record.get('packed',[]))
+        if not packed:
+            return True
+        if not os.path.isfile(outfile):
+            return False
+        
+        with open(outfile) as file:
+            meta = json.load(file)
+        regions = set()
+        folder = os.path.dirname(outfile)
+        for (page, contents) in meta.items():
+            if not os.path.isfile(os.path.join(folder,page)):
+                return False
+            regions.update(contents.keys())
+        return regions == packed
     
     def _setpaths(self):
         """
@@ -0,0 +1,335 @@
+"""
+A module to support drawing many copies of the same image.
+
+A :class:`GImage` owns its own graphics instructions (a transform, a color and a
+textured rectangle).  Drawing hundreds of them means hundreds of instructions on the
+canvas, and hundreds of Python objects to update.  A :class:`GSpriteBatch` instead
+draws any number of copies (sprites) of one image as a single Kivy mesh.  The sprite
+positions are stored in a NumPy array, and the vertices of the mesh are written from
+that array with a few vectorized operations, so the cost of a frame grows with the
+number of sprites, not with the number of Python objects.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from introcs.geom import Point2
+import numpy as np
+from .gobject import GObject
+
+# The corners of a sprite, in the order of the mesh vertices
+_CORNERS = np.array([[-0.5,-0.5],[0.5,-0.5],[0.5,0.5],[-0.5,0.5]],dtype=np.float32)
+# The two triangles of a sprite, as offsets into its four vertices
+_TRIANGLES = np.array([0,1,2,2,3,0],dtype=np.uint16)
+# The largest number of sprites in a batch (the mesh indices are 16 bits)
+_MAX_SPRITES = 65536//4
+
+
+# #mark -
+class GSpriteBatch(GObject):
+    """
+    A class representing many copies of the same image, drawn as one mesh.
+
+    The image is given by a JPEG, PNG, or GIF file whose name is stored in the attribute
+    `source`.  Every sprite in the batch is a rectangle of size ``sprite_width`` by
+    ``sprite_height`` showing this image.  The sprites are placed at the points in
+    ``positions``, which are the centers of the sprites.
+
+    Like :class:`GScene`, the batch is drawn as if (x,y) is the origin, so the
+    positions are relative to the batch.  Changing the attributes `x`, `y`, `angle`
+    or `scale` moves all of the sprites at once, without touching their vertices.
+    The attributes `width` and `height` are immutable; they are the size of the
+    smallest box centered on the batch that contains all of the sprites.
+
+    If you define ``fillcolor``, this object will tint every sprite by that color.
+    A batch cannot have a border, so ``linecolor`` is ignored.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def source(self):
+        """
+        The source file for the image of every sprite.
+
+        **invariant**. Value be a string refering to a valid file.
+        """
+        return self._source
+
+    @source.setter
+    def source(self,value):
+        from .app import GameApp
+        assert GameApp.is_image(value), '%s is not an image file' % repr(value)
+        self._source = value
+        if self._defined:
+            self._reset()
+
+    @property
+    def sprite_width(self):
+        """
+        The width of each sprite.
+
+        **invariant**: Value must be an ``int`` or ``float`` > 0
+        """
+        return self._spritew
+
+    @sprite_width.setter
+    def sprite_width(self,value):
+        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        assert value > 0, '%s is not positive' % repr(value)
+        self._spritew = float(value)
+        if self._defined:
+            self._write()
+
+    @property
+    def sprite_height(self):
+        """
+        The height of each sprite.
+
+        **invariant**: Value must be an ``int`` or ``float`` > 0
+        """
+        return self._spriteh
+
+    @sprite_height.setter
+    def sprite_height(self,value):
+        assert type(value) in [int,float], '%s is not a number' % repr(value)
+        assert value > 0, '%s is not positive' % repr(value)
+        self._spriteh = float(value)
+        if self._defined:
+            self._write()
+
+    @property
+    def positions(self):
+        """
+        The centers of the sprites, relative to the center of this batch.
+
+        The value read is a copy, so changing it does nothing.  To move the sprites,
+        assign a new array.  Assigning an array writes the vertices of every sprite
+        at once, and it is much cheaper than moving the same number of :class:`GImage`
+        objects.  There can be at most 16384 sprites.
+
+        **invariant**: Value must be a ``numpy.ndarray`` of shape (n,2) (possibly with
+        n = 0).  Any array-like of that shape may be assigned.
+        """
+        return self._positions.copy()
+
+    @positions.setter
+    def positions(self,value):
+        value = np.array(value,dtype=float)
+        if value.size == 0:
+            value = value.reshape(0,2)
+        assert value.ndim == 2 and value.shape[1] == 2, '%s is not an array of points' % repr(value)
+        assert len(value) <= _MAX_SPRITES, 'a batch cannot have %d sprites' % len(value)
+        self._positions = value
+        if self._defined:
+            self._write()
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def count(self):
+        """
+        The number of sprites in this batch.
+
+        **invariant**: Value is an ``int`` >= 0
+        """
+        return len(self._positions)
+
+    @property
+    def width(self):
+        """
+        The horizontal width of this batch.
+
+        The value is the width of the smallest bounding box that contains all of the
+        sprites in this batch (and the center).
+
+        **invariant**: Value must be an ``int`` or ``float`` >= 0
+        """
+        return self._size[0]
+
+    @property
+    def height(self):
+        """
+        The vertical height of this batch.
+
+        The value is the height of the smallest bounding box that contains all of the
+        sprites in this batch (and the center).
+
+        **invariant**: Value must be an ``int`` or ``float`` >= 0
+        """
+        return self._size[1]
+
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new batch of sprites.
+
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes. For example, to draw the
+        image ``alien1.png`` at three places, use the constructor::
+
+            GSpriteBatch(source='alien1.png',sprite_width=33,sprite_height=33,
+                         positions=[(0,0),(50,0),(100,0)])
+
+        This class supports the same keywords as :class:`GObject`, though `width`,
+        `height` and `linecolor` are unused.  The new keywords are ``source`` (which
+        is required), ``sprite_width``, ``sprite_height`` and ``positions``.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._defined = False
+        self._mesh = None
+        self._texture = None
+        self._buffer = np.zeros((0,4,4),dtype=np.float32)
+        self._indices = np.zeros((0,6),dtype=np.uint16)
+        self._drawn = -1
+        self._size = (0.0,0.0)
+        self.source = keywords['source'] if 'source' in keywords else None
+        self.sprite_width  = keywords['sprite_width']  if 'sprite_width'  in keywords else 1
+        self.sprite_height = keywords['sprite_height'] if 'sprite_height' in keywords else 1
+        self.positions = keywords['positions'] if 'positions' in keywords else []
+        GObject.__init__(self,**keywords)
+        self._reset()
+        self._defined = True
+
+
+    # PUBLIC METHODS
+    def contains(self,point):
+        """
+        Checks whether any sprite in this batch contains the point
+
+        The sprites are treated as rectangles, like :class:`GImage`.  All of the sprites
+        are tested at once with NumPy.
+
+        :param point: the point to check
+        :type point: :class:`Point2` or a pair of numbers
+
+        :return: True if a sprite contains this point
+        :rtype:  ``bool``
+        """
+        return not self.select(point) is None
+
+    def select(self,point):
+        """
+        Finds the sprite containing the point
+
+        The point is in the coordinate system of the parent of this batch (the same as
+        for :meth:`contains`).  If several sprites contain the point, the one drawn last
+        (the one on top) is selected.
+
+        :param point: the point to check
+        :type point: :class:`Point2` or a pair of numbers
+
+        :return: the position in :attr:`positions` of the sprite, or None if no sprite
+            contains the point
+        :rtype:  ``int`` or ``None``
+        """
+        if isinstance(point,Point2):
+            x = point.x
+            y = point.y
+        else:
+            (x,y) = point
+        if self._rotate.angle == 0.0 and self._scale.x == 1.0 and self._scale.y == 1.0:
+            x = x-self._trans.x
+            y = y-self._trans.y
+        else:
+            (x,y) = self._invert(x,y)
+        inside = ((np.abs(self._positions[:,0]-x)*2 < self._spritew) &
+                  (np.abs(self._positions[:,1]-y)*2 < self._spriteh))
+        found = np.flatnonzero(inside)
+        return int(found[-1]) if len(found) else None
+
+
+    # HIDDEN METHODS
+    def _write(self):
+        """
+        Writes the vertices of every sprite into the mesh.
+
+        The vertex buffer only grows (doubling in size), so after the largest batch
+        has been drawn once, writing the vertices allocates nothing.  The texture
+        coordinates and the indices are only written when the buffer grows.
+        """
+        n = len(self._positions)
+        if n > len(self._buffer):
+            self._grow(n)
+        buffer = self._buffer[:n]
+        buffer[:,:,0] = self._positions[:,0,None]+_CORNERS[:,0]*self._spritew
+        buffer[:,:,1] = self._positions[:,1,None]+_CORNERS[:,1]*self._spriteh
+
+        if n:
+            left   = float(self._positions[:,0].min())-self._spritew/2
+            right  = float(self._positions[:,0].max())+self._spritew/2
+            bottom = float(self._positions[:,1].min())-self._spriteh/2
+            top    = float(self._positions[:,1].max())+self._spriteh/2
+            self._size = (2*max(right,-left,0.0),2*max(top,-bottom,0.0))
+        else:
+            self._size = (0.0,0.0)
+
+        if not self._mesh is None:
+            # Kivy cannot read an empty buffer, so an empty batch needs lists
+            self._mesh.vertices = buffer.reshape(-1) if n else []
+            if n != self._drawn:
+                self._mesh.indices = self._indices[:n].reshape(-1) if n else []
+                self._drawn = n
+        self._changed()
+
+    def _grow(self,size):
+        """
+        Makes the vertex buffer large enough for ``size`` sprites.
+
+        :param size: the number of sprites
+        :type size:  ``int`` >= 0
+        """
+        capacity = max(size,2*len(self._buffer),16)
+        capacity = min(capacity,_MAX_SPRITES)
+        self._buffer = np.zeros((capacity,4,4),dtype=np.float32)
+        self._indices = (np.arange(capacity,dtype=np.uint16)[:,None]*4+_TRIANGLES)
+        self._drawn = -1
+        self._fill_uvs()
+
+    def _fill_uvs(self):
+        """
+        Writes the texture coordinates of every slot of the vertex buffer.
+        """
+        if self._texture is None:
+            return
+        uvs = np.array(self._texture.tex_coords,dtype=np.float32).reshape(4,2)
+        self._buffer[:,:,2:] = uvs
+
+    def _bounds(self):
+        """
+        :return: The bounding box of the sprites as (left, bottom, right, top)
+        :rtype:  4-element ``tuple`` of ``float``
+        """
+        x = self._trans.x
+        y = self._trans.y
+        if not len(self._positions):
+            return (x,y,x,y)
+        px = self._positions[:,0]
+        py = self._positions[:,1]
+        w = self._spritew/2
+        h = self._spriteh/2
+        local = np.array([[px.min()-w,py.min()-h],[px.max()+w,py.min()-h],
+                          [px.max()+w,py.max()+h],[px.min()-w,py.max()+h]])
+        if self._rotate.angle == 0.0 and self._scale.x == 1.0 and self._scale.y == 1.0:
+            c = local+[x,y]
+        else:
+            m = self.matrix._data
+            c = local.dot(m[:2,:2].T)+m[:2,3]
+        return (float(c[:,0].min()),float(c[:,1].min()),float(c[:,0].max()),float(c[:,1].max()))
+
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        from .app import GameApp
+        GObject._reset(self)
+        self._texture = GameApp.load_texture(self.source)
+        self._fill_uvs()
+        if not self._fillcolor is None:
+            self._cache.add(self._fillcolor)
+        else:
+            self._cache.add(Color(1,1,1))
+        self._mesh = Mesh(mode='triangles',texture=self._texture)
+        self._drawn = -1
+        self._write()
+        self._cache.add(self._mesh)
+        self._cache.add(PopMatrix())
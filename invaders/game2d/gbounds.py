@@ -0,0 +1,254 @@
+"""
+Bounding volume hierarchy for 2D game support.
+
+This module provides a bounding volume hierarchy (BVH) for the children of a
+:class:`GScene`.  It is a binary tree of axis-aligned boxes: every leaf holds one object
+and its bounding box, and every other node holds the smallest box containing both of its
+children.  A point or rectangle query only descends into the nodes whose boxes it
+touches, so on a scene with many children it visits a logarithmic number of nodes instead
+of every child.
+
+When an object moves, only its leaf and the ancestors of that leaf are refit.  The tree
+is not rebalanced, so after objects have moved very far it can be worth calling
+:meth:`GBoundsTree.rebuild`.
+
+This module is used internally by :class:`GScene`.  You should not need it directly.
+"""
+
+
+class _GBoundsNode(object):
+    """
+    A node of a :class:`GBoundsTree`.
+
+    A node is a leaf if ``item`` is not None.  Otherwise it has two children, ``first``
+    and ``second``.  The box of a node is (``left``, ``bottom``, ``right``, ``top``).
+    The value ``order`` of a leaf is the position of its object in the scene, so that
+    queries can report objects in drawing order.
+    """
+    __slots__ = ('left','bottom','right','top','item','order','first','second','parent')
+
+    def __init__(self,item=None,order=0,box=(0.0,0.0,0.0,0.0)):
+        """
+        Creates a new node with the given box.
+
+        :param item: the object stored in this node (None for an inner node)
+        :type item:  any
+
+        :param order: the position of the object in the scene
+        :type order:  ``int``
+
+        :param box: the box of this node as (left, bottom, right, top)
+        :type box:  4-element ``tuple`` of numbers
+        """
+        (self.left,self.bottom,self.right,self.top) = box
+        self.item   = item
+        self.order  = order
+        self.first  = None
+        self.second = None
+        self.parent = None
+
+    def refit(self):
+        """
+        Sets the box of an inner node to the union of the boxes of its children.
+
+        :return: True if the box changed
+        :rtype:  ``bool``
+        """
+        a = self.first
+        b = self.second
+        left   = a.left   if a.left   < b.left   else b.left
+        bottom = a.bottom if a.bottom < b.bottom else b.bottom
+        right  = a.right  if a.right  > b.right  else b.right
+        top    = a.top    if a.top    > b.top    else b.top
+        if left == self.left and bottom == self.bottom and right == self.right and top == self.top:
+            return False
+        self.left   = left
+        self.bottom = bottom
+        self.right  = right
+        self.top    = top
+        return True
+
+
+class GBoundsTree(object):
+    """
+    A class representing a bounding volume hierarchy of objects.
+
+    The objects may be anything; the tree only stores them with their boxes.  The boxes
+    are given as (left, bottom, right, top) tuples when the tree is built or refit.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def bounds(self):
+        """
+        The box containing every object in this tree.
+
+        **Immutable**: This value is computed from the objects in the tree.
+
+        **Invariant**: Either a 4-element tuple (left, bottom, right, top), or None if
+        the tree is empty.
+        """
+        root = self._root
+        if root is None:
+            return None
+        return (root.left,root.bottom,root.right,root.top)
+
+
+    # BUILT-IN METHODS
+    def __init__(self,items=(),boxes=()):
+        """
+        Creates a new tree for the given objects.
+
+        :param items: the objects to store, in order
+        :type items:  ``list`` or ``tuple``
+
+        :param boxes: the box of each object, as (left, bottom, right, top)
+        :type boxes:  ``list`` or ``tuple`` of the same length as ``items``
+        """
+        self.rebuild(items,boxes)
+
+    def __len__(self):
+        """
+        :return: The number of objects in this tree.
+        :rtype:  ``int`` >= 0
+        """
+        return len(self._leaves)
+
+    def __contains__(self,item):
+        """
+        :return: True if ``item`` is in this tree.
+        :rtype:  ``bool``
+        """
+        return item in self._leaves
+
+
+    # PUBLIC METHODS
+    def rebuild(self,items,boxes):
+        """
+        Replaces the contents of this tree, building a balanced tree from scratch.
+
+        The tree is built top-down: the objects are sorted by the center of their boxes
+        along the longer axis, and split in half.
+
+        :param items: the objects to store, in order
+        :type items:  ``list`` or ``tuple``
+
+        :param boxes: the box of each object, as (left, bottom, right, top)
+        :type boxes:  ``list`` or ``tuple`` of the same length as ``items``
+        """
+        assert len(items) == len(boxes), 'there are %d objects but %d boxes' % (len(items),len(boxes))
+        self._leaves = {}
+        leaves = []
+        for pos in range(len(items)):
+            leaf = _GBoundsNode(items[pos],pos,boxes[pos])
+            self._leaves[items[pos]] = leaf
+            leaves.append(leaf)
+        self._root = self._build(leaves) if leaves else None
+
+    def refit(self,item,box):
+        """
+        Updates the box of an object, and refits its ancestors.
+
+        The refit stops as soon as an ancestor box does not change, so moving an object
+        inside of its neighbors' boxes is cheap.
+
+        The value returned is True if the box of the whole tree (:attr:`bounds`) may have
+        changed.  The owner of the tree can use it to decide whether to pass the change
+        on.
+
+        :param item: the object that moved
+        :type item:  any object in this tree
+
+        :param box: the new box of the object, as (left, bottom, right, top)
+        :type box:  4-element ``tuple`` of numbers
+
+        :return: True if the box of the whole tree changed
+        :rtype:  ``bool``
+        """
+        node = self._leaves[item]
+        if box == (node.left,node.bottom,node.right,node.top):
+            return False
+        (node.left,node.bottom,node.right,node.top) = box
+        while not node.parent is None:
+            node = node.parent
+            if not node.refit():
+                return False
+        return True
+
+    def query_point(self,x,y):
+        """
+        Finds the objects whose boxes contain the point (x,y).
+
+        The objects are returned in the order they were given to :meth:`rebuild`.
+
+        :param x: the x-coordinate of the point
+        :type x:  ``int`` or ``float``
+
+        :param y: the y-coordinate of the point
+        :type y:  ``int`` or ``float``
+
+        :return: the objects whose boxes contain the point
+        :rtype:  ``list``
+        """
+        return self.query_rect(x,y,x,y)
+
+    def query_rect(self,left,bottom,right,top):
+        """
+        Finds the objects whose boxes overlap the given rectangle.
+
+        The objects are returned in the order they were given to :meth:`rebuild`.
+
+        :param left: the left edge of the rectangle
+        :type left:  ``int`` or ``float``
+
+        :param bottom: the bottom edge of the rectangle
+        :type bottom:  ``int`` or ``float``
+
+        :param right: the right edge of the rectangle
+        :type right:  ``int`` or ``float`` >= left
+
+        :param top: the top edge of the rectangle
+        :type top:  ``int`` or ``float`` >= bottom
+
+        :return: the objects overlapping the rectangle
+        :rtype:  ``list``
+        """
+        if self._root is None:
+            return []
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node.left <= right and node.right >= left and node.bottom <= top and node.top >= bottom:
+                if node.item is None:
+                    stack.append(node.first)
+                    stack.append(node.second)
+                else:
+                    found.append(node)
+        found.sort(key=lambda leaf: leaf.order)
+        return [leaf.item for leaf in found]
+
+
+    # HIDDEN METHODS
+    def _build(self,leaves):
+        """
+        :return: The root of a balanced tree over the given leaves
+        :rtype:  :class:`_GBoundsNode`
+        """
+        if len(leaves) == 1:
+            return leaves[0]
+        left   = min(leaf.left   for leaf in leaves)
+        bottom = min(leaf.bottom for leaf in leaves)
+        right  = max(leaf.right  for leaf in leaves)
+        top    = max(leaf.top    for leaf in leaves)
+        if right-left >= top-bottom:
+            leaves = sorted(leaves,key=lambda leaf: leaf.left+leaf.right)
+        else:
+            leaves = sorted(leaves,key=lambda leaf: leaf.bottom+leaf.top)
+        half = len(leaves)//2
+        node = _GBoundsNode(None,0,(left,bottom,right,top))
+        node.first  = self._build(leaves[:half])
+        node.second = self._build(leaves[half:])
+        node.first.parent  = node
+        node.second.parent = node
+        return node
@@ -12,6 +12,8 @@ from kivy.graphics import *
 from kivy.graphics.instructions import *
 from introcs.geom import Point2, Matrix
 import introcs
+import numpy as np
+from .gbounds import GBoundsTree
 
 def is_color(c):
     """
@@ -91,6 +93,12 @@ class GObject(object):
     :class:`GTriangle`, :class:`GPolygon`, or :class:`GPath`.
     """
 
+    # The scene containing this object, if any.  It is a class attribute so that it is
+    # defined before the subclass constructors set any properties.
+    _parent = None
+    # The spatial hashes containing this object (see GSpatialHash), for the same reason.
+    _indexes = ()
+
     # MUTABLE PROPERTIES
     @property
     def x(self):
@@ -106,6 +114,7 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         self._trans.x = float(value)
         self._mtrue = False
+        self._changed()
 
     @property
     def y(self):
@@ -121,6 +130,7 @@ class GObject(object):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
         self._trans.y = float(value)
         self._mtrue = False
+        self._changed()
 
     @property
     def width(self):
@@ -140,6 +150,7 @@ class GObject(object):
         self._width = float(value)
         if self._defined:
             self._reset()
+        self._changed()
 
     @property
     def height(self):
@@ -159,6 +170,7 @@ class GObject(object):
         self._height = float(value)
         if self._defined:
             self._reset()
+        self._changed()
 
     @property
     def scale(self):
@@ -189,6 +201,7 @@ class GObject(object):
             self._scale.x = float(value[0])
             self._scale.y = float(value[1])
         self._mtrue = False
+        self._changed()
 
     @property
     def angle(self):
@@ -209,6 +222,7 @@ class GObject(object):
         self._rotate.angle = float(value)
         if not diff:
             self._mtrue = False
+            self._changed()
 
     @property
     def linecolor(self):
@@ -322,11 +336,7 @@ class GObject(object):
         if self._rotate.angle == 0.0:
             return self.x-self.width/2.0
 
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[0]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[0]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[0]
-        return min(p0,p1,p2,p3)
+        return float(self._corners()[:,0].min())
 
     @left.setter
     def left(self,value):
@@ -352,11 +362,7 @@ class GObject(object):
         if self._rotate.angle == 0.0:
             return self.x+self.width/2.0
 
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[0]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[0]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[0]
-        return max(p0,p1,p2,p3)
+        return float(self._corners()[:,0].max())
 
     @right.setter
     def right(self,value):
@@ -382,11 +388,7 @@ class GObject(object):
         if self._rotate.angle == 0.0:
             return self.y+self.height/2.0
 
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[1]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[1]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[1]
-        return max(p0,p1,p2,p3)
+        return float(self._corners()[:,1].max())
 
     @top.setter
     def top(self,value):
@@ -413,11 +415,7 @@ class GObject(object):
         if self._rotate.angle == 0.0:
             return self.y-self.height/2.0
 
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[1]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[1]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[1]
-        return min(p0,p1,p2,p3)
+        return float(self._corners()[:,1].min())
 
 
     @bottom.setter
@@ -480,6 +478,9 @@ class GObject(object):
         """
         # Set the properties.
         self._defined = False
+        self._matrix = None
+        self._invrse = None
+        self._mtrue  = False
 
         # Create the Kivy transforms for position and size
         self._trans  = Translate(0,0,0)
@@ -546,7 +547,9 @@ class GObject(object):
 
         By default, this method just checks the bounding box of the shape.
 
-        **Warning**: Using this method on a rotated object may slow down your framerate.
+        For an unrotated shape, this is just two comparisons.  For a rotated shape, the
+        point is first moved to the local coordinate system with the cached inverse
+        matrix, which is only rebuilt when the position, angle or scale changes.
 
         :param point: the point to check
         :type point: :class:`Point2` or a pair of numbers
@@ -554,15 +557,75 @@ class GObject(object):
         :return: True if the shape contains this point
         :rtype:  ``bool``
         """
-        import numpy as np
         if isinstance(point,Point2):
-            point = (point.x,point.y)
-        assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
+            x = point.x
+            y = point.y
+        else:
+            (x,y) = point
+
+        if self._rotate.angle == 0.0:
+            return (abs(x-self._trans.x)*2 < self.width*abs(self._scale.x) and
+                    abs(y-self._trans.y)*2 < self.height*abs(self._scale.y))
+
+        (x,y) = self._invert(x,y)
+        return abs(x)*2 < self.width and abs(y)*2 < self.height
+
+    def contains_many(self,points):
+        """
+        Checks whether this shape contains each of the given points
+
+        This is the batch version of :meth:`contains`.  The points are tested all at
+        once with NumPy, so testing hundreds of points costs little more than testing
+        one.  By default, this method just checks the bounding box of the shape.
+
+        The points are transformed to the local coordinate system of this shape (with
+        the cached inverse matrix) before they are tested, so this method respects the
+        ``angle`` and ``scale`` of the shape.
+
+        :param points: the points to check
+        :type points: array-like of shape (n,2)
 
-        if self._rotate.angle != 0.0:
-            point = self.matrix.inverse()._transform(point[0],point[1])
+        :return: a mask that is True for each point inside of this shape
+        :rtype:  ``numpy.ndarray`` of ``bool`` with shape (n,)
+        """
+        (px,py) = self._local_many(points)
+        return (np.abs(px) < self.width/2.0) & (np.abs(py) < self.height/2.0)
+
+    def overlaps(self,other):
+        """
+        Checks whether this shape overlaps another shape
 
-        return abs(point[0]-self.x) < self.width/2.0 and abs(point[1]-self.y) < self.height/2.0
+        This method checks the bounding boxes of the two shapes (the boxes of size
+        ``width`` by ``height``, with the ``scale`` applied).  Points on the edge of a
+        box are not inside of it, just like :meth:`contains`.
+
+        If neither shape is rotated, this is just four comparisons of the centers and
+        sizes.  Otherwise, it falls back to a separating axis test on the two rotated
+        boxes, which is slower.
+
+        :param other: the shape to check
+        :type other: :class:`GObject`
+
+        :return: True if this shape overlaps ``other``
+        :rtype:  ``bool``
+        """
+        assert isinstance(other,GObject), '%s is not a GObject' % repr(other)
+        if self._rotate.angle == 0.0 and other._rotate.angle == 0.0:
+            return (abs(self._trans.x-other._trans.x)*2 <
+                    self.width*abs(self._scale.x)+other.width*abs(other._scale.x) and
+                    abs(self._trans.y-other._trans.y)*2 <
+                    self.height*abs(self._scale.y)+other.height*abs(other._scale.y))
+
+        mine = self._corners()
+        theirs = other._corners()
+        for box in (mine,theirs):
+            for edge in (box[1]-box[0],box[3]-box[0]):
+                axis = np.array([-edge[1],edge[0]])
+                p = mine.dot(axis)
+                q = theirs.dot(axis)
+                if p.max() <= q.min() or q.max() <= p.min():
+                    return False
+        return True
 
     def transform(self,point):
         """
@@ -611,18 +674,99 @@ class GObject(object):
         self._cache.add(self._rotate)
         self._cache.add(self._scale)
 
+    def _invert(self,x,y):
+        """
+        Transforms a point to the local coordinate system with the cached inverse.
+
+        :param x: the x-coordinate of the point
+        :type x:  ``int`` or ``float``
+
+        :param y: the y-coordinate of the point
+        :type y:  ``int`` or ``float``
+
+        :return: the point in the local coordinate system
+        :rtype:  pair of ``float``
+        """
+        if not self._mtrue or self._matrix is None:
+            self._build_matrix()
+        (a,b,c,d,e,f) = self._affine
+        return (a*x+b*y+c,d*x+e*y+f)
+
+    def _local_many(self,points):
+        """
+        Transforms an array of points to the local coordinate system.
+
+        If this object is not rotated or scaled, this is just a subtraction.  Otherwise
+        it uses the 2D part of the cached inverse matrix.
+
+        :param points: the points to transform
+        :type points: array-like of shape (n,2)
+
+        :return: the local x-coordinates and the local y-coordinates
+        :rtype:  pair of ``numpy.ndarray`` with shape (n,)
+        """
+        points = np.asarray(points,dtype=float)
+        assert points.ndim == 2 and points.shape[1] == 2, \
+            'array of shape %s is not an array of points' % repr(points.shape)
+        if self._rotate.angle == 0.0 and self._scale.x == 1.0 and self._scale.y == 1.0:
+            return (points[:,0]-self._trans.x,points[:,1]-self._trans.y)
+
+        m = self.inverse._data
+        px = m[0,0]*points[:,0]+m[0,1]*points[:,1]+m[0,3]
+        py = m[1,0]*points[:,0]+m[1,1]*points[:,1]+m[1,3]
+        return (px,py)
+
+    def _changed(self):
+        """
+        Notifies the scene and the spatial hashes containing this object that its
+        geometry changed.
+        """
+        if not self._parent is None:
+            self._parent._child_changed(self)
+        for index in self._indexes:
+            index.move(self)
+
+    def _bounds(self):
+        """
+        :return: The bounding box of this object as (left, bottom, right, top)
+        :rtype:  4-element ``tuple`` of ``float``
+        """
+        if self._rotate.angle == 0.0:
+            w = self.width*abs(self._scale.x)/2.0
+            h = self.height*abs(self._scale.y)/2.0
+            x = self._trans.x
+            y = self._trans.y
+            return (x-w,y-h,x+w,y+h)
+        c = self._corners()
+        return (float(c[:,0].min()),float(c[:,1].min()),float(c[:,0].max()),float(c[:,1].max()))
+
+    def _corners(self):
+        """
+        :return: The corners of the bounding box, in counter-clockwise order
+        :rtype:  ``numpy.ndarray`` with shape (4,2)
+        """
+        w = self.width/2.0
+        h = self.height/2.0
+        m = self.matrix._data
+        local = np.array([[-w,-h],[w,-h],[w,h],[-w,h]])
+        return local.dot(m[:2,:2].T)+m[:2,3]
+
     def _build_matrix(self):
         """
         Builds the transform matrices after a settings change.
         """
+        # Matrix operations premultiply, so the last operation is applied last
         self._matrix = Matrix()
-        self._matrix.translate(self._trans.x,self._trans.y)
-        self._matrix.rotate(self._rotate.angle)
         self._matrix.scale(self._scale.x,self._scale.y)
+        self._matrix.rotate(self._rotate.angle)
+        self._matrix.translate(self._trans.x,self._trans.y)
         self._invrse = Matrix()
-        self._invrse.scale(1.0/self._scale.x,1.0/self._scale.y)
-        self._invrse.rotate(-self._rotate.angle)
         self._invrse.translate(-self._trans.x,-self._trans.y)
+        self._invrse.rotate(-self._rotate.angle)
+        self._invrse.scale(1.0/self._scale.x,1.0/self._scale.y)
+        m = self._invrse._data
+        self._affine = (float(m[0,0]),float(m[0,1]),float(m[0,3]),
+                        float(m[1,0]),float(m[1,1]),float(m[1,3]))
         self._mtrue = True
 
 
@@ -643,6 +787,11 @@ class GScene(GObject):
     read-only.  These values are computed from the list of objects stored in the scene.
 
     All objects stored in a ``GScene`` are drawn as if the point (x,y) is the origin.
+
+    The scene keeps the bounding boxes of its children in a :class:`GBoundsTree`, so
+    that :meth:`select` and :meth:`query_rect` only test the children near the query.
+    Each child knows the scene it is in, and tells the scene when it moves, so the tree
+    is refit as you go.  An object should only be in one scene at a time.
     """
 
     # MUTABLE PROPERTIES
@@ -654,16 +803,28 @@ class GScene(GObject):
         The objects are drawn as if (x,y) is the origin.  Therefore, changing the
         attributes `x` and `y` will shift all of the children on the screen.
 
+        The value read is always the same tuple until a new list is assigned, so reading
+        it does not make a copy.  To add or remove a child, assign a new list.
+
         **invariant**: Value must be a list or tuple of :class:`GObject` (possibly empty)
         """
-        return tuple(self._children)
+        return self._children
 
     @children.setter
     def children(self,value):
         assert is_gobject_list(value), '%s is not a list of valid objects' % repr(value)
-        self._children = list(value)
+        if hasattr(self,'_children'):
+            for child in self._children:
+                if child._parent is self:
+                    child._parent = None
+        self._children = tuple(value)
+        for child in self._children:
+            child._parent = self
+        self._tree = GBoundsTree(self._children,[child._bounds() for child in self._children])
+        self._size = None
         if self._defined:
             self._reset()
+        self._changed()
 
 
     # IMMUTABLE PROPERTIES
@@ -675,14 +836,15 @@ class GScene(GObject):
         The value is the width of the smallest bounding box that contains all of the
         objects in this scene (and the center)
 
+        This value is cached.  It is only recomputed after a child has moved or changed
+        size, and then only from the root of the bounding volume tree, so reading it
+        takes constant time.
+
         **invariant**: Value must be an ``int`` or ``float`` > 0
         """
-        max = 0
-        for x in self.children:
-            w = x.x+x.width/2.0
-            if w > max:
-                max = w
-        return max*2
+        if self._size is None:
+            self._measure()
+        return self._size[0]
 
     @property
     def height(self):
@@ -692,14 +854,15 @@ class GScene(GObject):
         The value is the height of the smallest bounding box that contains all of the
         objects in this scene (and the center)
 
+        This value is cached.  It is only recomputed after a child has moved or changed
+        size, and then only from the root of the bounding volume tree, so reading it
+        takes constant time.
+
         **invariant**: Value must be an ``int`` or ``float`` > 0
         """
-        max = 0
-        for x in self.children:
-            h = x.y+x.height/2.0
-            if h > max:
-                max = h
-        return max*2
+        if self._size is None:
+            self._measure()
+        return self._size[1]
 
 
     # BUILT-IN METHODS
@@ -733,30 +896,132 @@ class GScene(GObject):
 
         This function recursively descends the scene graph.  It returns the first child
         it finds that contains ``point``.  If that child is also a ``GScene``, it
-        recursively calls this method.  If not child contains this point, it returns
-        either this object, or ``None`` if the point is completely out of bounds.
+        recursively calls this method.  If no child contains this point, it returns
+        ``None``.
 
-        **Warning**: Using this method on a rotated object may slow down your framerate.
+        The point is in the coordinate system of the parent of this scene (the same as
+        for :meth:`contains`).  Only the children whose bounding boxes contain the
+        point are tested, and they are found with the bounding volume tree.
 
         :param point: the point to check
         :type point: :class:`Point2`` or a pair of numbers
         """
-        if not self.contains(point):
-            return None
+        if isinstance(point,Point2):
+            x = point.x
+            y = point.y
+        else:
+            (x,y) = point
+        (x,y) = self._local(x,y)
 
-        for child in self._children:
-            result = None
+        for child in self._tree.query_point(x,y):
             if isinstance(child,GScene):
-                result = child.select(point)
-            elif child.contains(point):
+                result = child.select((x,y))
+            elif child.contains((x,y)):
                 result = child
-            if not child is None:
-                return child
+            else:
+                result = None
+            if not result is None:
+                return result
 
         return None
 
+    def query_rect(self,left,bottom,right,top):
+        """
+        Finds the objects in this scene whose bounding boxes overlap a rectangle.
+
+        This function recursively descends the scene graph.  The children that are
+        scenes are not returned themselves; instead the objects inside of them that
+        overlap the rectangle are.  The objects are returned in drawing order.
+
+        The rectangle is in the coordinate system of the parent of this scene (the same
+        as for :meth:`select`).  If this scene is rotated, the rectangle is replaced by
+        the bounding box of its corners in the scene.
+
+        :param left: the left edge of the rectangle
+        :type left:  ``int`` or ``float``
+
+        :param bottom: the bottom edge of the rectangle
+        :type bottom:  ``int`` or ``float``
+
+        :param right: the right edge of the rectangle
+        :type right:  ``int`` or ``float`` >= left
+
+        :param top: the top edge of the rectangle
+        :type top:  ``int`` or ``float`` >= bottom
+
+        :return: the objects overlapping the rectangle
+        :rtype:  ``list`` of :class:`GObject`
+        """
+        corners = [self._local(left,bottom),self._local(right,bottom),
+                   self._local(right,top),self._local(left,top)]
+        left   = min(p[0] for p in corners)
+        right  = max(p[0] for p in corners)
+        bottom = min(p[1] for p in corners)
+        top    = max(p[1] for p in corners)
+
+        result = []
+        for child in self._tree.query_rect(left,bottom,right,top):
+            if isinstance(child,GScene):
+                result.extend(child.query_rect(left,bottom,right,top))
+            else:
+                result.append(child)
+        return result
+
 
     # HIDDEN METHODS
+    def _local(self,x,y):
+        """
+        :return: The point (x,y) in the coordinate system of the children
+        :rtype:  pair of ``float``
+        """
+        if self._rotate.angle == 0.0 and self._scale.x == 1.0 and self._scale.y == 1.0:
+            return (x-self._trans.x,y-self._trans.y)
+        return self._invert(x,y)
+
+    def _bounds(self):
+        """
+        :return: The bounding box of the children as (left, bottom, right, top)
+        :rtype:  4-element ``tuple`` of ``float``
+        """
+        box = self._tree.bounds
+        if box is None:
+            return (self._trans.x,self._trans.y,self._trans.x,self._trans.y)
+        (left,bottom,right,top) = box
+        if self._rotate.angle == 0.0 and self._scale.x == 1.0 and self._scale.y == 1.0:
+            x = self._trans.x
+            y = self._trans.y
+            return (left+x,bottom+y,right+x,top+y)
+        local = np.array([[left,bottom],[right,bottom],[right,top],[left,top]])
+        m = self.matrix._data
+        c = local.dot(m[:2,:2].T)+m[:2,3]
+        return (float(c[:,0].min()),float(c[:,1].min()),float(c[:,0].max()),float(c[:,1].max()))
+
+    def _child_changed(self,child):
+        """
+        Refits the bounding volume tree after ``child`` moved or changed size.
+
+        If the bounds of the whole scene changed, the cached size is cleared and the
+        change is passed on to the scene containing this one.  Otherwise nothing else
+        is done.
+
+        :param child: the child that changed
+        :type child:  :class:`GObject` in this scene
+        """
+        if child in self._tree and self._tree.refit(child,child._bounds()):
+            self._size = None
+            self._changed()
+
+    def _measure(self):
+        """
+        Caches the width and height of this scene from the bounding volume tree.
+        """
+        box = self._tree.bounds
+        if box is None:
+            self._size = (0.0,0.0)
+        else:
+            (left,bottom,right,top) = box
+            self._size = (2*max(right,-left,0.0),2*max(top,-bottom,0.0))
+
     def _reset(self):
         """
         Resets the drawing cache
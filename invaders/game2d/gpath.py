@@ -11,50 +11,102 @@ Date:   August 1, 2017 (Python 3 version)
 from kivy.graphics import *
 from kivy.graphics.instructions import *
 from .gobject import GObject
+from introcs.geom import Point2
+import numpy as np
 
 
-def same_side(p1, p2, a, b):
+def triangulate(points):
     """
-    Checks whether two points are on the same side of a line segment.
+    Splits a polygon into triangles.
     
-    :param p1: A point represented as a 2-element sequence of numbers
-    :type p1:  ``list`` or ``tuple``
+    The polygon is the outline through the points in ``points``, in order.  It may be 
+    concave, as long as its edges do not cross.  It is split by ear clipping: any corner
+    of the polygon whose triangle contains no other vertex is cut off, until only one
+    triangle is left.
     
-    :param p2: A point represented as a 2-element sequence of numbers
-    :type p2:  ``list`` or ``tuple``
+    If the outline crosses itself (so there is no ear to cut), this function falls back
+    to the triangle fan from the origin (0,0) to each edge, which is how a 
+    :class:`GPolygon` was originally defined.
     
-    :param a: One end of a line segment, represented as a 2-element sequence of numbers
-    :type a:  ``list`` or ``tuple``
+    :param points: The polygon vertices as an even sequence of numbers
+    :type points:  ``list`` or ``tuple`` with at least 6 elements
     
-    :param b: Another end of a line segment, represented as a 2-element sequence of numbers
-    :type b:  ``list`` or ``tuple``
-    
-    :return: True if ``p1``, ``p2`` are on the same side of segment ``ba``; False otherwise
-    :rtype:  ``bool``
+    :return: The triangles, one (x0,y0,x1,y1,x2,y2) row each
+    :rtype:  ``numpy.ndarray`` of shape (k,6)
     """
-    import numpy as np
-    ba  = np.append(np.subtract(b,a),[0])
-    cp1 = np.cross(ba,np.subtract(p1,a))
-    cp2 = np.cross(ba,np.subtract(p2,a))
-    return np.dot(cp1,cp2) >= 0
+    verts = np.asarray(points,dtype=float).reshape(-1,2)
+    size  = len(verts)
+    nexts = np.roll(verts,-1,axis=0)
+    area  = (verts[:,0]*nexts[:,1]-nexts[:,0]*verts[:,1]).sum()
+    
+    # Walk the outline counter-clockwise
+    order = list(range(size)) if area >= 0 else list(range(size-1,-1,-1))
+    coords = verts.tolist()
+    triangles = []
+    while len(order) > 3:
+        ear = None
+        for pos in range(len(order)):
+            (a, b, c) = (order[pos-1], order[pos], order[(pos+1) % len(order)])
+            (ax, ay) = coords[a]
+            (bx, by) = coords[b]
+            (cx, cy) = coords[c]
+            if (bx-ax)*(cy-ay)-(by-ay)*(cx-ax) <= 0:
+                continue
+            # The ear is counter-clockwise, so a vertex on the left of (or on) all
+            # three edges is inside of it
+            inside = False
+            for other in order:
+                if not other in (a,b,c):
+                    (px, py) = coords[other]
+                    if ((bx-ax)*(py-ay)-(by-ay)*(px-ax) >= 0 and
+                        (cx-bx)*(py-by)-(cy-by)*(px-bx) >= 0 and
+                        (ax-cx)*(py-cy)-(ay-cy)*(px-cx) >= 0):
+                        inside = True
+                        break
+            if not inside:
+                ear = pos
+                break
+        if ear is None:
+            fan = np.zeros((size,6))
+            fan[:,2:4] = verts
+            fan[:,4:6] = nexts
+            return fan
+        triangles.append(verts[[order[ear-1],order[ear],order[(ear+1) % len(order)]]].ravel())
+        del order[ear]
+    
+    triangles.append(verts[order].ravel())
+    return np.array(triangles)
 
 
-def in_triangle(p, t):
+def half_planes(triangles):
     """
-    Checks whether a point is inside of a triangle
+    Computes the edge equations of a list of triangles.
     
-    :param p: A point in 2 dimensions
-    :type p:  2-element list of ``int`` or ``float``
+    Each edge of each triangle becomes a line a*x+b*y+c = 0, oriented so that a*x+b*y+c
+    is >= 0 on the inside of the triangle.  A point is in a triangle if it is on the
+    inside of all three of its edges, so once these coefficients are computed, a 
+    containment test is only multiplications and comparisons.  Triangles with no area
+    are dropped, as they contain no points.
     
-    :param t: A triangle defined by 3 points
-    :type t:  6-element list of ``int`` or ``float``
+    :param triangles: The triangles, one (x0,y0,x1,y1,x2,y2) row each
+    :type triangles:  array-like of shape (k,6)
     
-    :return: True if ``p`` is in triangle ``t``; False otherwise
-    :rtype:  ``bool``
+    :return: The coefficients a, b and c, one row per triangle and one column per edge
+    :rtype:  ``tuple`` of three ``numpy.ndarray`` of shape (k,3)
     """
-    return (same_side(p, t[0:2], t[2:4], t[4:6]) and
-            same_side(p, t[2:4], t[0:2], t[4:6]) and
-            same_side(p, t[4:6], t[0:2], t[2:4]))
+    t = np.asarray(triangles,dtype=float).reshape(-1,6)
+    area = (t[:,2]-t[:,0])*(t[:,5]-t[:,1])-(t[:,3]-t[:,1])*(t[:,4]-t[:,0])
+    t = t[area != 0]
+    sign = np.sign(area[area != 0])[:,None]
+    
+    px = t[:,0::2]
+    py = t[:,1::2]
+    qx = np.roll(px,-1,axis=1)
+    qy = np.roll(py,-1,axis=1)
+    a = (py-qy)*sign
+    b = (qx-px)*sign
+    c = -(a*px+b*py)
+    return (a,b,c)
 
 
 def is_point_tuple(t,minsize):
@@ -119,8 +171,10 @@ class GPath(GObject):
     def points(self,value):
         assert is_point_tuple(value,2),'value %s is not a valid list of points' %  repr(value)
         self._points = tuple(value)
+        self._set_segments(False)
         if self._defined:
             self._reset()
+        self._changed()
     
     @property
     def linewidth(self):
@@ -213,40 +267,90 @@ class GPath(GObject):
         """
         return False
     
-    def near(self,point):
+    def contains_many(self,points):
+        """
+        Checks whether this shape contains each of the given points
+        
+        This method always returns a mask of `False` as a ``GPath`` has no interior.
+        
+        :param points: the points to check
+        :type points: array-like of shape (n,2)
+        
+        :return: a mask that is False for every point
+        :rtype:  ``numpy.ndarray`` of ``bool`` with shape (n,)
+        """
+        (px,py) = self._local_many(points)
+        return np.zeros(px.shape,dtype=bool)
+    
+    def near(self,point,tolerance=1e-6):
         """
         Checks whether this path is near the given point
         
-        To determine if (x,y) is near the path, we compute the minimum distances
-        from (x,y) to the path.  If this distance is less than e-6, we return True.
+        To determine if (x,y) is near the path, we compute the minimum distance from 
+        (x,y) to the segments of the path.  If this distance is at most ``tolerance``, we
+        return True.  For a solid shape (like :class:`GTriangle`), a point inside of the
+        shape is also near it.
+        
+        The distance is measured in the local coordinate system of the path (so it is
+        not affected by ``x``, ``y`` or ``angle``).  To hit-test a thick line, use half
+        of the ``linewidth`` as the tolerance.
         
         :param point: the point to check
         :type point: :class:`Point2`` or a pair of numbers
         
+        :param tolerance: the maximum distance from the path
+        :type tolerance: ``int`` or ``float`` >= 0
+        
         :return: True if this path is near the give point; False otherwise.
         :rtype:  ``bool``
         """
         if isinstance(point,Point2):
             point = (point.x,point.y)
-        assert is_point_tuple(point,1),'value %s is not a valid point' %  repr(point)
-        x = point[0]
-        y = point[1]
-        
-        size = len(self.points)/2
-        epsilon = 1e-6
-        for ii in range(size-1):
-            p = self.points[2*ii  :2*ii+2]
-            q = self.points[2*ii+2:2*ii+4]
-            if p == q:
-                test = np.sqrt((q[0]-x)*(q[0]-x)+(q[1]-y)*(q[1]-y)) < epsilon
-            else:
-                num = abs((q[0]-p[0])*x-(q[1]-p[1])*y+q[0]*p[1]-p[0]*q[1])
-                den = np.sqrt((q[0]-p[0])*(q[0]-p[0])+(q[1]-p[1])*(q[1]-p[1]))
-                test = num/den
-            if test:
-                return True
+        return bool(self.near_many([point],tolerance)[0])
+    
+    def near_many(self,points,tolerance=1e-6):
+        """
+        Checks whether this path is near each of the given points
+        
+        This is the batch version of :meth:`near`.  The distance from every point to 
+        every segment of the path is computed at once with NumPy, using the segment 
+        vectors that are precomputed whenever ``points`` is set.
+        
+        :param points: the points to check
+        :type points: array-like of shape (n,2)
+        
+        :param tolerance: the maximum distance from the path
+        :type tolerance: ``int`` or ``float`` >= 0
         
-        return self.contains(point)
+        :return: a mask that is True for each point near this path
+        :rtype:  ``numpy.ndarray`` of ``bool`` with shape (n,)
+        """
+        assert type(tolerance) in [int,float], 'value %s is not a number' % repr(tolerance)
+        assert tolerance >= 0, 'value %s is negative' % repr(tolerance)
+        return (self.distance_many(points) <= tolerance) | self.contains_many(points)
+    
+    def distance_many(self,points):
+        """
+        Computes the distance from each of the given points to this path
+        
+        Each point is projected onto every segment of the path (clamped to the ends of
+        the segment), and the distance to the closest projection is returned.  The 
+        distances are in the local coordinate system of the path.
+        
+        :param points: the points to measure
+        :type points: array-like of shape (n,2)
+        
+        :return: the distance from each point to the nearest segment
+        :rtype:  ``numpy.ndarray`` of ``float`` with shape (n,)
+        """
+        (px,py) = self._local_many(points)
+        (ax,ay,dx,dy,inv) = self._segments
+        rx = px[:,None]-ax
+        ry = py[:,None]-ay
+        t = np.clip((rx*dx+ry*dy)*inv,0.0,1.0)
+        ex = rx-t*dx
+        ey = ry-t*dy
+        return np.sqrt((ex*ex+ey*ey).min(axis=1))
     
     
     # HIDDEN METHODS
@@ -260,6 +364,100 @@ class GPath(GObject):
             line = Line(points=self.points,cap='round',joint='round',width=self.linewidth)
             self._cache.add(line)
         self._cache.add(PopMatrix())
+    
+    def _set_segments(self,closed):
+        """
+        Precomputes the segments of this path for :meth:`distance_many`.
+        
+        Each segment is stored as its start point, its direction vector and the inverse
+        of its squared length (0 for a segment of length 0).  These are computed when
+        the points change, so the distance queries never loop over the points.
+        
+        :param closed: whether to add a segment from the last point back to the first
+        :type closed:  ``bool``
+        """
+        verts = np.asarray(self._points,dtype=float).reshape(-1,2)
+        ends  = np.roll(verts,-1,axis=0)
+        if not closed:
+            verts = verts[:-1]
+            ends  = ends[:-1]
+        dx = ends[:,0]-verts[:,0]
+        dy = ends[:,1]-verts[:,1]
+        size = dx*dx+dy*dy
+        inv  = np.divide(1.0,size,out=np.zeros_like(size),where=size > 0)
+        self._segments = (verts[:,0],verts[:,1],dx,dy,inv)
+    
+    def _set_triangles(self,triangles):
+        """
+        Precomputes the edge equations of the interior of a solid subclass.
+        
+        The interior is the union of the given triangles (in local coordinates).  This
+        method stores the edge coefficients from :func:`half_planes` both as arrays (for
+        :meth:`_fill_contains_many`) and as tuples of floats (for :meth:`_fill_contains`),
+        together with the bounding box of the points.  It is called whenever the points 
+        change, so the containment tests never recompute them.
+        
+        :param triangles: The triangles, one (x0,y0,x1,y1,x2,y2) row each
+        :type triangles:  ``numpy.ndarray`` of shape (k,6)
+        """
+        self._triangles = triangles
+        self._planes = half_planes(triangles)
+        (a,b,c) = self._planes
+        self._edges = [tuple(float(v) for v in row) for row in np.hstack((a,b,c))]
+        px = self._points[::2]
+        py = self._points[1::2]
+        self._extent = (min(px),min(py),max(px),max(py))
+    
+    def _fill_contains(self,point):
+        """
+        Checks whether the interior of a solid subclass contains the point.
+        
+        The point is moved to local coordinates (a subtraction if this shape is not 
+        rotated or scaled), rejected if it is outside of the bounding box, and then 
+        tested against the edges of each triangle with plain float arithmetic.
+        
+        :param point: the point to check
+        :type point: :class:`Point2` or a pair of numbers
+        
+        :return: True if the interior contains this point
+        :rtype:  ``bool``
+        """
+        if isinstance(point,Point2):
+            x = point.x
+            y = point.y
+        else:
+            (x,y) = point
+        
+        if self._rotate.angle == 0.0 and self._scale.x == 1.0 and self._scale.y == 1.0:
+            x -= self._trans.x
+            y -= self._trans.y
+        else:
+            (x,y) = self._invert(x,y)
+        
+        (left,bottom,right,top) = self._extent
+        if x < left or x > right or y < bottom or y > top:
+            return False
+        
+        for (a0,a1,a2,b0,b1,b2,c0,c1,c2) in self._edges:
+            if a0*x+b0*y+c0 >= 0 and a1*x+b1*y+c1 >= 0 and a2*x+b2*y+c2 >= 0:
+                return True
+        return False
+    
+    def _fill_contains_many(self,points):
+        """
+        Checks whether the interior of a solid subclass contains each of the points.
+        
+        Every point is tested against every edge of every triangle at once with NumPy.
+        
+        :param points: the points to check
+        :type points: array-like of shape (n,2)
+        
+        :return: a mask that is True for each point inside of the interior
+        :rtype:  ``numpy.ndarray`` of ``bool`` with shape (n,)
+        """
+        (px,py) = self._local_many(points)
+        (a,b,c) = self._planes
+        return (a*px[:,None,None]+b*py[:,None,None]+c >= 0).all(axis=2).any(axis=1)
 
 
 # #mark -
@@ -297,8 +495,11 @@ class GTriangle(GPath):
         assert is_point_tuple(value,3),'value %s is not a valid list of points' %  repr(value)
         assert len(value) == 6, 'value %s does not have the right length'  %  repr(value)
         self._points = tuple(value)
+        self._set_triangles(np.array([self._points],dtype=float))
+        self._set_segments(True)
         if self._defined:
             self._reset()
+        self._changed()
     
     
     # BUILT-IN METHODS
@@ -331,9 +532,9 @@ class GTriangle(GPath):
         """
         Checks whether this shape contains the point
         
-        By default, this method just checks the bounding box of the shape.
-        
-        **Warning**: Using this method on a rotated object may slow down your framerate.
+        The edge equations of the triangle are computed when ``points`` is set, so this
+        is just a bounding box check and three multiply-adds.  Points on an edge are 
+        inside the triangle.
         
         :param point: the point to check
         :type point: :class:`Point2`` or a pair of numbers
@@ -341,11 +542,23 @@ class GTriangle(GPath):
         :return: True if the shape contains this point
         :rtype:  ``bool``
         """
-        if isinstance(point,Point2):
-            point = (point.x,point.y)
-        assert is_point_tuple(point,1), "%s is not a valid point" % repr(point)
+        return self._fill_contains(point)
+    
+    def contains_many(self,points):
+        """
+        Checks whether this triangle contains each of the given points
         
-        return in_triangle(points,self._points)
+        This is the batch version of :meth:`contains`.  The points are transformed to
+        the local coordinate system of this shape, and then tested against the three
+        edges of the triangle all at once with NumPy.
+        
+        :param points: the points to check
+        :type points: array-like of shape (n,2)
+        
+        :return: a mask that is True for each point inside of this triangle
+        :rtype:  ``numpy.ndarray`` of ``bool`` with shape (n,)
+        """
+        return self._fill_contains_many(points)
     
     
     # HIDDEN METHODS
@@ -376,12 +589,12 @@ class GPolygon(GPath):
     """
     A class representing a solid polygon.  
     
-    The polygon is a triangle fan from the center of the polyon to the vertices in the
-    attribute ``points``. The center of the polygon is always the point (0,0), unless 
-    you reassign the attributes ``x`` and ``y``.  However, as with :class:`GPath`, if you
-    assign the attributes ``x`` and ``y``, then Python will shift all of the vertices by 
-    that same amount. Hence the polygon vertices must be defined as triangle fan centered 
-    at the origin.
+    The polygon is the outline through the vertices in the attribute ``points``.  It may
+    be concave, as long as the outline does not cross itself; the polygon is split into
+    triangles (see :func:`triangulate`) once, whenever ``points`` is set.  The center of 
+    the polygon is always the point (0,0), unless you reassign the attributes ``x`` and 
+    ``y``.  However, as with :class:`GPath`, if you assign the attributes ``x`` and 
+    ``y``, then Python will shift all of the vertices by that same amount.
     
     The interior (fill) color of this polygon is ``fillcolor``, while ``linecolor``
     is the color of the border.  If ``linewidth`` is set to 0, then the border is 
@@ -413,8 +626,11 @@ class GPolygon(GPath):
     def points(self,value):
         assert is_point_tuple(value,3),'value %s is not a valid list of points' %  repr(value)
         self._points = tuple(value)
+        self._set_triangles(triangulate(self._points))
+        self._set_segments(True)
         if self._defined:
             self._reset()
+        self._changed()
     
     @property
     def source(self):
@@ -517,9 +733,9 @@ class GPolygon(GPath):
         """
         Checks whether this shape contains the point
         
-        By default, this method just checks the bounding box of the shape.
-        
-        **Warning**: Using this method on a rotated object may slow down your framerate.
+        The polygon is triangulated, and the edge equations of the triangles computed, 
+        when ``points`` is set.  So this is a bounding box check followed by a few 
+        multiply-adds for each triangle.  Points on an edge are inside the polygon.
         
         :param point: the point to check
         :type point: :class:`Point2`` or a pair of numbers
@@ -527,49 +743,49 @@ class GPolygon(GPath):
         :return: True if the shape contains this point
         :rtype:  ``bool``
         """
-        if isinstance(point,Point2):
-            point = (point.x,point.y)
-        assert is_point_tuple(point,1), "%s is not a valid point" % repr(point)
+        return self._fill_contains(point)
+    
+    def contains_many(self,points):
+        """
+        Checks whether this polygon contains each of the given points
         
-        found = False
-        for i in xrange(4,len(self._points),2):
-            t = (0,0)+self.points[i-4:i]
-            found = found or in_triangle(point,t)
+        This is the batch version of :meth:`contains`.  Every point is tested against 
+        every triangle of the cached triangulation at once with NumPy.  A point is 
+        inside if it is inside any of them.
         
-        return found
+        :param points: the points to check
+        :type points: array-like of shape (n,2)
+        
+        :return: a mask that is True for each point inside of this polygon
+        :rtype:  ``numpy.ndarray`` of ``bool`` with shape (n,)
+        """
+        return self._fill_contains_many(points)
     
     
     # HIDDEN METHODS
     def _make_mesh(self):
         """
-        Creates the mesh for this polygon
+        Creates the mesh for this polygon from its cached triangulation
         """
-        size = len(self.points)/2
+        corners = [(float(x),float(y)) for (x,y) in self._triangles.reshape(-1,2)]
+        size = len(corners)
         try:
             texture = Image(source=self.source).texture
             texture.wrap = 'repeat'
             tw = float(texture.width)  if self.source_width is None else self.source_width
             th = float(texture.height) if self.source_height is None else self.source_height
             
-            # Centroid at 0, with texture centered
-            verts = (0,0,0.5,0.5) 
-            
-            # Create the fan.
-            for x in range(size):
-                pt = self.points[2*x:2*x+2]
-                self._verts += pt+(pt[0]/tw+0.5,pt[1]/th+0.5)
-            
-            # Come back to the beginning
-            pt = self.points[0:2]
-            verts += pt+(pt[0]/tw+0.5,pt[1]/th+0.5)
-            self._mesh = Mesh(vertices=verts, indices=range(size+2), mode='triangle_fan', texture=texture)
+            # Texture centered at the origin
+            verts = ()
+            for (x,y) in corners:
+                verts += (x,y,x/tw+0.5,y/th+0.5)
+            self._mesh = Mesh(vertices=verts, indices=range(size), mode='triangles', texture=texture)
         except BaseException as e:
             # Make all texture coordinates degnerate
-            verts = (0,0,0,0) 
-            for x in range(size):
-                verts += self.points[2*x:2*x+2]+(0,0)
-            verts += self.points[0:2]+(0,0)
-            self._mesh = Mesh(vertices=verts, indices=range(size+2), mode='triangle_fan')
+            verts = ()
+            for (x,y) in corners:
+                verts += (x,y,0,0)
+            self._mesh = Mesh(vertices=verts, indices=range(size), mode='triangles')
     
     def _reset(self):
         """
@@ -0,0 +1,189 @@
+"""
+Object pool for 2D game support.
+
+This module provides a pool of reusable :class:`GObject` instances.  Creating a
+graphics object is expensive: the initializer processes every keyword, converts the
+colors, and builds new Kivy graphics instructions.  Games with short-lived objects,
+like laser bolts, should not pay that cost on every shot.  A pool keeps the objects
+that are no longer in use on a free list, and hands them out again when a new object
+is needed.  Once the pool has grown to the largest number of objects in use at once,
+activating an object allocates nothing.
+"""
+from .gobject import GObject
+
+
+class GPool(object):
+    """
+    A class representing a pool of reusable :class:`GObject` instances.
+
+    The objects are made by a factory, which is any function with no arguments that
+    returns a new :class:`GObject` (such as a class whose initializer has defaults, or
+    a ``lambda``).  Every object in the pool is either active or free.  The method
+    :meth:`activate` takes a free object (calling the factory only if there is none)
+    and :meth:`deactivate` returns it to the free list.
+
+    The active objects can be accessed like a list, with ``len``, indexing and ``for``.
+    Their order is not preserved: deactivating an object moves the last active object
+    into its place.  A pool does not reset the attributes of an object it reuses, other
+    than the ones given to :meth:`activate`.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def factory(self):
+        """
+        The function that creates new objects for this pool.
+
+        **Immutable**: This value cannot be altered after the pool is created.
+
+        **Invariant**: Must be a callable with no arguments returning a :class:`GObject`.
+        """
+        return self._factory
+
+    @property
+    def free(self):
+        """
+        The number of objects in this pool that are not active.
+
+        **Immutable**: This value is computed from the pool.
+
+        **Invariant**: Must be an ``int`` >= 0.
+        """
+        return len(self._free)
+
+
+    # BUILT-IN METHODS
+    def __init__(self,factory,capacity=0):
+        """
+        Creates a new pool, with ``capacity`` free objects already made.
+
+        :param factory: the function that creates new objects
+        :type factory:  callable with no arguments returning a :class:`GObject`
+
+        :param capacity: the number of objects to create right away
+        :type capacity:  ``int`` >= 0
+        """
+        assert callable(factory), '%s is not callable' % repr(factory)
+        assert type(capacity) == int and capacity >= 0, '%s is not a valid capacity' % repr(capacity)
+        self._factory = factory
+        self._active = []
+        self._index  = {}
+        self._free   = []
+        for pos in range(capacity):
+            self._free.append(self._make())
+
+    def __len__(self):
+        """
+        :return: The number of active objects in this pool.
+        :rtype:  ``int`` >= 0
+        """
+        return len(self._active)
+
+    def __getitem__(self,pos):
+        """
+        :return: The active object at position ``pos``.
+        :rtype:  :class:`GObject`
+        """
+        return self._active[pos]
+
+    def __iter__(self):
+        """
+        :return: The iterator over the active objects in this pool.
+        :rtype:  ``iterable``
+        """
+        return iter(self._active)
+
+    def __contains__(self,obj):
+        """
+        :return: True if ``obj`` is an active object of this pool.
+        :rtype:  ``bool``
+        """
+        return obj in self._index
+
+
+    # PUBLIC METHODS
+    def activate(self,**keywords):
+        """
+        Returns a free object, after marking it as active.
+
+        The object comes from the free list if it is not empty, and from the factory
+        otherwise.  Each keyword argument is assigned to the attribute of the same name,
+        but only if the value differs, so that reusing an object in place does not
+        rebuild its drawing cache.  For example::
+
+            bolt = pool.activate(x=100,y=20)
+
+        :param keywords: dictionary of attribute values to assign
+        :type keywords:  keys are attribute names
+
+        :return: the activated object
+        :rtype:  :class:`GObject`
+        """
+        obj = self._free.pop() if self._free else self._make()
+        for (key,value) in keywords.items():
+            if getattr(obj,key) != value:
+                setattr(obj,key,value)
+        self._index[obj] = len(self._active)
+        self._active.append(obj)
+        return obj
+
+    def deactivate(self,obj):
+        """
+        Returns an active object to the free list.
+
+        The last active object takes the place of ``obj``, so this takes constant time.
+
+        :param obj: the object to deactivate
+        :type obj:  :class:`GObject` active in this pool
+        """
+        assert obj in self._index, '%s is not active in this pool' % repr(obj)
+        pos  = self._index.pop(obj)
+        last = self._active.pop()
+        if not last is obj:
+            self._active[pos] = last
+            self._index[last] = pos
+        self._free.append(obj)
+
+    def resize(self,size):
+        """
+        Activates or deactivates objects until exactly ``size`` are active.
+
+        Objects are deactivated from the end.  This is the simplest way to mirror a
+        list of records that is owned by some other object (copy the attributes of
+        the records into the active objects after the call).
+
+        :param size: the number of active objects
+        :type size:  ``int`` >= 0
+        """
+        assert type(size) == int and size >= 0, '%s is not a valid size' % repr(size)
+        while len(self._active) < size:
+            self.activate()
+        while len(self._active) > size:
+            self.deactivate(self._active[-1])
+
+    def clear(self):
+        """
+        Deactivates every active object.
+        """
+        self.resize(0)
+
+    def draw(self,view):
+        """
+        Draws every active object to the given view.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        for obj in self._active:
+            obj.draw(view)
+
+
+    # HIDDEN METHODS
+    def _make(self):
+        """
+        :return: A new object from the factory
+        :rtype:  :class:`GObject`
+        """
+        obj = self._factory()
+        assert isinstance(obj,GObject), '%s is not a GObject' % repr(obj)
+        return obj
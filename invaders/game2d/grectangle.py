@@ -12,7 +12,10 @@ from kivy.graphics import *
 from kivy.graphics.instructions import *
 from kivy.uix.label import Label
 from kivy.uix.image import Image
+from collections import OrderedDict
 from .gobject import GObject
+from introcs.geom import Point2
+import numpy as np
 from .app import GameApp
 
 class GRectangle(GObject):
@@ -139,26 +142,43 @@ class GEllipse(GRectangle):
         This method is better than simple rectangle inclusion.  It checks that the point 
         is within the proper radius as well.
         
-        **Warning**: Using this method on a rotated object may slow down your framerate.
-        
         :param point: the point to check
-        :type point: :class:`GPoint`` or a pair of numbers
+        :type point: :class:`Point2` or a pair of numbers
         """
-        if isinstance(point,GPoint):
-            point = (point.x,point.y)
-        assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
+        if isinstance(point,Point2):
+            x = point.x
+            y = point.y
+        else:
+            (x,y) = point
         
         rx = self.width/2.0
         ry = self.height/2.0
-        if self._rotate.angle == 0.0:
-            dx = (point[0]-self.x)*(point[0]-self.x)/(rx*rx)
-            dy = (point[1]-self.y)*(point[1]-self.y)/(ry*ry)
+        if self._rotate.angle == 0.0 and self._scale.x == 1.0 and self._scale.y == 1.0:
+            x -= self._trans.x
+            y -= self._trans.y
         else:
-            p = self.matrix.inverse()._transform(point[0],point[1])
-            dx = p[0]*p[0]/(rx*rx)
-            dy = p[1]*p[1]/(ry*ry)
+            (x,y) = self._invert(x,y)
+        
+        return x*x/(rx*rx)+y*y/(ry*ry) <= 1.0
+    
+    def contains_many(self,points):
+        """
+        Checks whether this ellipse contains each of the given points
         
-        return (dx+dy) <= 1.0
+        This is the batch version of :meth:`contains`.  The points are tested all at
+        once with NumPy against the equation of the ellipse, after they are transformed
+        to the local coordinate system of this shape.
+        
+        :param points: the points to check
+        :type points: array-like of shape (n,2)
+        
+        :return: a mask that is True for each point inside of this ellipse
+        :rtype:  ``numpy.ndarray`` of ``bool`` with shape (n,)
+        """
+        (px,py) = self._local_many(points)
+        rx = self.width/2.0
+        ry = self.height/2.0
+        return px*px/(rx*rx)+py*py/(ry*ry) <= 1.0
     
     
     # HIDDEN METHODS
@@ -273,6 +293,71 @@ class GImage(GRectangle):
         self._cache.add(PopMatrix())
 
 
+# #mark -
+class _GLabelText(Label):
+    """
+    A Kivy label that shares its rendered text through :attr:`GLabel.TEXT_CACHE`.
+    
+    A Kivy label rasterizes its text to a texture every time a font property changes.
+    This label first looks for a texture rendered earlier with the same values of the 
+    properties that :class:`GLabel` sets (listed in ``TEXT_KEYS``), and only renders the 
+    text if there is none.  The cache is LRU, and it holds at most 
+    :attr:`GLabel.TEXT_CACHE_SIZE` textures.
+    
+    A label created with any other Kivy label keyword (like ``italic``) is not cached 
+    (``cached`` is False), as the key would not describe its raster.
+    
+    This class is used internally by :class:`GLabel`.  You should not need it directly.
+    """
+    # The label properties that make up the cache key
+    TEXT_KEYS = ('text','font_name','font_size','bold','halign','valign','color')
+    # Whether this label uses the cache
+    cached = True
+    
+    def texture_update(self,*largs):
+        """
+        Sets the texture of this label, rendering the text only on a cache miss.
+        
+        Markup text is never cached, as the label must also compute its refs and anchors.
+        """
+        if self.markup or not self.cached:
+            Label.texture_update(self,*largs)
+            return
+        
+        key = self._text_key()
+        cache = GLabel.TEXT_CACHE
+        if key in cache:
+            cache.move_to_end(key)
+            self.texture = cache[key]
+            self.texture_size = list(self.texture.size)
+            return
+        
+        Label.texture_update(self,*largs)
+        texture = self.texture
+        if texture is None or texture is self._label.texture_1px:
+            return
+        
+        # Render now, and make the core label use a new texture for its next text
+        texture.bind()
+        self._label.texture = None
+        cache[key] = texture
+        while len(cache) > GLabel.TEXT_CACHE_SIZE:
+            cache.popitem(last=False)
+    
+    def _text_key(self):
+        """
+        :return: The cache key for the current font properties of this label
+        :rtype:  ``tuple``
+        """
+        key = []
+        for name in self.TEXT_KEYS:
+            value = getattr(self,name)
+            if isinstance(value,list):
+                value = tuple(value)
+            key.append(value)
+        return tuple(key)
+
+
 # #mark -
 class GLabel(GRectangle):
     """
@@ -296,7 +381,16 @@ class GLabel(GRectangle):
     to the font by filename, including the .ttf. If you give no name, it will use the 
     default Kivy font.  The `bold` attribute only works for the default Kivy font; for 
     other fonts you will need the .ttf file for the bold version of that font.  See the
-    provided `ComicSans.ttf` and `ComicSansBold.ttf` for an example."""
+    provided `ComicSans.ttf` and `ComicSansBold.ttf` for an example.
+    
+    Rendering text is slow, so the rendered text is cached.  Labels with the same text 
+    and font properties share one texture, even if they are not created at the same 
+    time, so creating a label that has been shown before does not render text again.
+    The cache keeps the most recently used textures, up to ``TEXT_CACHE_SIZE``."""
+    # Class attribute for the rendered text textures (least recently used first)
+    TEXT_CACHE = OrderedDict()
+    # The maximum number of textures in TEXT_CACHE
+    TEXT_CACHE_SIZE = 64
     
     # MUTABLE PROPERTIES
     @property
@@ -430,6 +524,7 @@ class GLabel(GRectangle):
         self._mtrue = False
         self._hanchor = 'center'
         self._ha = value
+        self._changed()
     
     @property
     def y(self):
@@ -446,6 +541,7 @@ class GLabel(GRectangle):
         self._mtrue = False
         self._vanchor = 'center'
         self._hv = value
+        self._changed()
     
     @property
     def left(self):
@@ -465,11 +561,7 @@ class GLabel(GRectangle):
         if self._rotate.angle == 0.0:
             return self.x-self.width/2.0
         
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[0]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[0]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[0]
-        return min(p0,p1,p2,p3)
+        return float(self._corners()[:,0].min())
     
     @left.setter
     def left(self,value):
@@ -497,11 +589,7 @@ class GLabel(GRectangle):
         if self._rotate.angle == 0.0:
             return self.x+self.width/2.0
         
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[0]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[0]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[0]
-        return max(p0,p1,p2,p3)
+        return float(self._corners()[:,0].max())
     
     @right.setter
     def right(self,value):
@@ -529,11 +617,7 @@ class GLabel(GRectangle):
         if self._rotate.angle == 0.0:
             return self.y+self.height/2.0
         
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[1]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[1]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[1]
-        return max(p0,p1,p2,p3)
+        return float(self._corners()[:,1].max())
     
     @top.setter
     def top(self,value):
@@ -560,11 +644,7 @@ class GLabel(GRectangle):
         if self._rotate.angle == 0.0:
             return self.y-self.height/2.0
         
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[1]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[1]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[1]
-        return min(p0,p1,p2,p3)
+        return float(self._corners()[:,1].min())
     
     
     @bottom.setter
@@ -600,8 +680,11 @@ class GLabel(GRectangle):
             if not key in excludes:
                 sanitized[key] = keywords[key]
         
-        self._label = Label(**sanitized)
+        self._label = _GLabelText(**sanitized)
         self._label.size_hint = (None,None)
+        for key in sanitized:
+            if not hasattr(GLabel,key):
+                self._label.cached = False
         
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
         self.halign = keywords['halign'] if 'halign' in keywords else 'center'
@@ -651,6 +734,7 @@ class GLabel(GRectangle):
         self._defined = True
         
         # Reset the absolute anchor
+        self._mtrue = False
         if self._hanchor == 'left':
             self._trans.x = self._ha+self.width/2.0
         elif self._hanchor == 'right':
@@ -661,6 +745,7 @@ class GLabel(GRectangle):
             self._trans.y = self._hv-self.height/2.0
         elif self._vanchor == 'bottom':
             self._trans.y = self._hv+self.height/2.0
+        self._changed()
         
         # Reset the label anchor.
         if self.halign == 'left':
@@ -0,0 +1,269 @@
+"""
+Spatial index for 2D game support.
+
+This module provides a uniform-grid spatial hash for :class:`GObject` instances.  It
+is a broad-phase structure: it quickly finds the few objects whose bounding boxes
+might touch a point or rectangle, so that the precise (and slow) tests like
+:meth:`GObject.contains` only run on those objects.
+"""
+import math
+from .gobject import GObject, is_num_tuple
+from introcs.geom import Point2
+
+
+class GSpatialHash(object):
+    """
+    A class representing a uniform-grid spatial hash of :class:`GObject` bounding boxes.
+
+    The plane is divided into square cells of size ``cellsize``.  Every object is
+    stored in each cell its bounding box (``left``, ``right``, ``bottom`` and ``top``)
+    overlaps.  A query only looks at the cells the query touches, so its cost depends
+    on the number of nearby objects, not on the total number of objects.
+
+    The hash watches its objects.  Whenever the position, size, angle or scale of an
+    object is changed through its attributes, the object notifies every hash that
+    contains it, and its cells are updated right away (the same notification keeps
+    the bounds of a :class:`GScene` current).  Moving an object within its current
+    cells does no work beyond computing its bounding box.  You only need to call
+    :meth:`move` (or :meth:`refresh`) if you change the geometry some other way, such
+    as through the hidden attributes of an object.
+
+    The hash keeps its objects alive until they are removed.
+
+    The best cell size is a little larger than a typical object.  Cells that are too
+    small store each object many times; cells that are too large put many objects in
+    the same cell.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def cellsize(self):
+        """
+        The width and height of a grid cell.
+
+        **Immutable**: This value cannot be altered after the hash is created.
+
+        **Invariant**: Must be an ``int`` or ``float`` > 0.
+        """
+        return self._cellsize
+
+
+    # BUILT-IN METHODS
+    def __init__(self,cellsize=64):
+        """
+        Creates a new, empty spatial hash.
+
+        :param cellsize: the width and height of a grid cell
+        :type cellsize:  ``int`` or ``float`` > 0
+        """
+        assert type(cellsize) in [int,float], '%s is not a number' % repr(cellsize)
+        assert cellsize > 0, '%s is not positive' % repr(cellsize)
+        self._cellsize = float(cellsize)
+        self._cells = {}
+        self._ranges = {}
+
+    def __len__(self):
+        """
+        :return: The number of objects in this hash.
+        :rtype:  ``int`` >= 0
+        """
+        return len(self._ranges)
+
+    def __contains__(self,obj):
+        """
+        :return: True if ``obj`` is in this hash.
+        :rtype:  ``bool``
+        """
+        return obj in self._ranges
+
+    def __iter__(self):
+        """
+        :return: The iterator over the objects in this hash.
+        :rtype:  ``iterable``
+        """
+        return iter(self._ranges.keys())
+
+
+    # PUBLIC METHODS
+    def insert(self,obj):
+        """
+        Adds an object to this hash.
+
+        If the object is already in the hash, this is the same as :meth:`move`.
+
+        :param obj: the object to add
+        :type obj:  :class:`GObject`
+        """
+        assert isinstance(obj,GObject), '%s is not a GObject' % repr(obj)
+        if obj in self._ranges:
+            self.move(obj)
+            return
+        cells = self._range(obj.left,obj.bottom,obj.right,obj.top)
+        self._ranges[obj] = cells
+        self._add(obj,cells)
+        obj._indexes = obj._indexes+(self,)
+
+    def move(self,obj):
+        """
+        Updates the cells of an object after its position or size changed.
+
+        This is called automatically when the attributes of the object change, so you
+        only need it after changing the geometry some other way.
+
+        :param obj: the object that moved
+        :type obj:  :class:`GObject` in this hash
+        """
+        old = self._ranges[obj]
+        cells = self._range(obj.left,obj.bottom,obj.right,obj.top)
+        if cells != old:
+            self._discard(obj,old)
+            self._ranges[obj] = cells
+            self._add(obj,cells)
+
+    def remove(self,obj):
+        """
+        Removes an object from this hash.
+
+        :param obj: the object to remove
+        :type obj:  :class:`GObject` in this hash
+        """
+        self._discard(obj,self._ranges.pop(obj))
+        obj._indexes = tuple(index for index in obj._indexes if not index is self)
+
+    def refresh(self):
+        """
+        Updates the cells of every object in this hash.
+
+        This is the same as calling :meth:`move` on every object.  Objects that did not
+        leave their cells are not rehashed.
+        """
+        for obj in list(self._ranges):
+            self.move(obj)
+
+    def clear(self):
+        """
+        Removes every object from this hash.
+        """
+        for obj in self._ranges:
+            obj._indexes = tuple(index for index in obj._indexes if not index is self)
+        self._cells.clear()
+        self._ranges.clear()
+
+    def query_rect(self,left,bottom,right,top):
+        """
+        Finds the objects whose bounding boxes overlap the given rectangle.
+
+        The objects are returned at most once each.  Only the bounding boxes are
+        tested; use a precise test (like :meth:`GObject.contains`) on the result if you
+        need one.
+
+        :param left: the left edge of the rectangle
+        :type left:  ``int`` or ``float``
+
+        :param bottom: the bottom edge of the rectangle
+        :type bottom:  ``int`` or ``float``
+
+        :param right: the right edge of the rectangle
+        :type right:  ``int`` or ``float`` >= left
+
+        :param top: the top edge of the rectangle
+        :type top:  ``int`` or ``float`` >= bottom
+
+        :return: the objects overlapping the rectangle
+        :rtype:  ``list`` of :class:`GObject`
+        """
+        found = {}
+        (c0,r0,c1,r1) = self._range(left,bottom,right,top)
+        for col in range(c0,c1+1):
+            for row in range(r0,r1+1):
+                cell = self._cells.get((col,row))
+                if cell:
+                    for obj in cell:
+                        if not obj in found and obj.left <= right and obj.right >= left \
+                            and obj.bottom <= top and obj.top >= bottom:
+                            found[obj] = True
+        return list(found)
+
+    def query_point(self,point):
+        """
+        Finds the objects whose bounding boxes contain the given point.
+
+        Only the bounding boxes are tested; use :meth:`GObject.contains` on the result
+        if you need a precise test.
+
+        :param point: the point to check
+        :type point: :class:`Point2` or a pair of numbers
+
+        :return: the objects whose bounding boxes contain the point
+        :rtype:  ``list`` of :class:`GObject`
+        """
+        if isinstance(point,Point2):
+            point = (point.x,point.y)
+        assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
+
+        x = point[0]
+        y = point[1]
+        cell = self._cells.get(self._cell(x,y))
+        if not cell:
+            return []
+        return [obj for obj in cell
+                if obj.left <= x <= obj.right and obj.bottom <= y <= obj.top]
+
+    def query_object(self,obj):
+        """
+        Finds the other objects whose bounding boxes overlap that of ``obj``.
+
+        The object itself is never in the result, even if it is in this hash.
+
+        :param obj: the object to check
+        :type obj:  :class:`GObject`
+
+        :return: the objects overlapping ``obj``
+        :rtype:  ``list`` of :class:`GObject`
+        """
+        result = self.query_rect(obj.left,obj.bottom,obj.right,obj.top)
+        return [other for other in result if not other is obj]
+
+
+    # HIDDEN METHODS
+    def _cell(self,x,y):
+        """
+        :return: The (column, row) of the cell containing the point (x,y)
+        :rtype:  pair of ``int``
+        """
+        return (int(math.floor(x/self._cellsize)),int(math.floor(y/self._cellsize)))
+
+    def _range(self,left,bottom,right,top):
+        """
+        :return: The cells overlapping a rectangle, as (col0, row0, col1, row1)
+        :rtype:  4-element ``tuple`` of ``int``
+        """
+        (c0,r0) = self._cell(left,bottom)
+        (c1,r1) = self._cell(right,top)
+        return (c0,r0,c1,r1)
+
+    def _add(self,obj,cells):
+        """
+        Adds ``obj`` to every cell in the given range.
+        """
+        (c0,r0,c1,r1) = cells
+        for col in range(c0,c1+1):
+            for row in range(r0,r1+1):
+                key = (col,row)
+                if key in self._cells:
+                    self._cells[key][obj] = True
+                else:
+                    self._cells[key] = {obj: True}
+
+    def _discard(self,obj,cells):
+        """
+        Removes ``obj`` from every cell in the given range.
+        """
+        (c0,r0,c1,r1) = cells
+        for col in range(c0,c1+1):
+            for row in range(r0,r1+1):
+                key = (col,row)
+                cell = self._cells[key]
+                del cell[obj]
+                if not cell:
+                    del self._cells[key]
@@ -11,6 +11,7 @@ Date:   November 1, 2017 (Python 3 version)
 """
 from kivy.graphics import *
 from kivy.graphics.instructions import *
+from collections import OrderedDict
 from .grectangle import GRectangle, GObject
 from .app import GameApp
 
@@ -33,7 +34,17 @@ class GSprite(GRectangle):
     
     If the image supports transparency, then this object can be used to represent irregular 
     shapes.  However, the :meth:`contains` method still treats this shape as a  rectangle.
+    
+    The frames of a filmstrip are computed once for each source file and grid size, and
+    shared by every sprite that uses them.  So changing the frame only swaps the texture
+    region of the sprite, and creating many sprites from the same file is cheap.  The
+    cache keeps the frames of the most recently used filmstrips, up to 
+    ``FRAME_CACHE_SIZE``.
     """
+    # Class attribute for the frames of each (source, format), least recently used first
+    FRAME_CACHE = OrderedDict()
+    # The maximum number of filmstrips in FRAME_CACHE
+    FRAME_CACHE_SIZE = 64
     
     # MUTABLE PROPERTIES
     @property
@@ -75,9 +86,9 @@ class GSprite(GRectangle):
         assert type(value) == int, '%s is not an int' % repr(value)
         assert value >= 0 and value < self.count, '%s is out of range' % repr(value)
         self._frame = value
-        if self._bounds:
+        if self._rect:
             self._texture = self._images[self._frame]
-            self._bounds.texture = self._texture
+            self._rect.texture = self._texture
     
     
     # BUILT-IN METHODS
@@ -103,8 +114,8 @@ class GSprite(GRectangle):
         self.source  = keywords['source'] if 'source' in keywords else None
         self._setFormat(keywords['format'] if 'format' in keywords else (1,1))
         self._frame  = 0
-        self._images = [None]*self.count
-        self._bounds = None
+        self._images = (None,)*self.count
+        self._rect = None
         self._texture = None
         GRectangle.__init__(self,**keywords)
         self._defined = True
@@ -132,26 +143,18 @@ class GSprite(GRectangle):
         
         texture = GameApp.load_texture(self.source)
         if texture:
-            width  = texture.width/self._format[1]
-            height = texture.height/self._format[0]
-            
-            ty = 0
-            for row in range(self._format[0]):
-                tx = 0
-                for col in range(self._format[1]):
-                    self._images[row*self._format[1]+col] = texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height))
-                    tx += width
-                ty += width
+            self._images = self._frames(texture)
         else:
             print('Failed to load',repr(self.source))
+            self._images = (None,)*self.count
         
         self._texture = self._images[self._frame]
-        self._bounds = Rectangle(pos=(x,y), size=(self.width, self.height),texture=self._texture)
+        self._rect = Rectangle(pos=(x,y), size=(self.width, self.height),texture=self._texture)
         if not self._fillcolor is None:
             self._cache.add(self._fillcolor)
         else:
             self._cache.add(Color(1,1,1))
-        self._cache.add(self._bounds)
+        self._cache.add(self._rect)
         
         if not self._linecolor is None and self.linewidth > 0:
             line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
@@ -159,4 +162,45 @@ class GSprite(GRectangle):
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
-
+    
+    def _frames(self,texture):
+        """
+        Computes the frame regions of ``texture`` for this filmstrip.
+        
+        The frames are taken left-to-right, top-to-bottom.  They are cached in 
+        ``FRAME_CACHE``, so they are only computed for the first sprite with this source 
+        and format.  If the texture of the source was reloaded since, they are computed 
+        again.  Once the cache holds more than ``FRAME_CACHE_SIZE`` filmstrips, the least
+        recently used one is dropped.
+        
+        :param texture: the texture of the source file
+        :type texture:  Kivy ``Texture`` (or texture region) for ``source``
+        
+        :return: the frame regions, in order
+        :rtype:  ``tuple`` of Kivy ``TextureRegion``
+        """
+        key = (self.source,self._format)
+        cache = GSprite.FRAME_CACHE
+        if key in cache:
+            (owner, images) = cache[key]
+            if owner is texture:
+                cache.move_to_end(key)
+                return images
+        
+        width  = texture.width/self._format[1]
+        height = texture.height/self._format[0]
+        
+        images = []
+        ty = 0
+        for row in range(self._format[0]):
+            tx = 0
+            for col in range(self._format[1]):
+                images.append(texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height)))
+                tx += width
+            ty += height
+        images = tuple(images)
+        cache[key] = (texture,images)
+        cache.move_to_end(key)
+        while len(cache) > GSprite.FRAME_CACHE_SIZE:
+            cache.popitem(last=False)
+        return images
@@ -15,6 +15,7 @@ from kivy.uix.floatlayout import FloatLayout
 from kivy.metrics import dp
 
 from introcs.geom import Point2
+from .gobject import GObject
 
 
 class GInput(object):
@@ -315,9 +316,21 @@ class GView(FloatLayout):
     """
     A class representing a drawing window for a :class:`GameApp` application.
 
-    This is the class that you will use to draw shapes to the screen.  Simply pass your
-    :class:`GObject` instances to the :meth:`draw` method.  You must do this every
-    animation frame, as the game is constantly clearing the window.
+    This is the class that you will use to draw shapes to the screen.  There are two
+    ways to put a :class:`GObject` on the screen.
+
+    The first is immediate mode: pass the object to the :meth:`draw` method of
+    :class:`GObject` (which calls the :meth:`draw` method of this class).  You must do
+    this every animation frame, as the view starts a new frame every time.
+
+    The second is retained mode: :meth:`attach` the object once, and it is drawn every
+    frame until you :meth:`detach` it.  Attached objects are drawn before (so under)
+    the objects drawn in immediate mode, in the order they were attached.
+
+    In either case, the view keeps the graphics commands from the last frame on the
+    Kivy canvas (the display list).  Each frame it compares the new commands with the
+    old ones, and only changes the canvas after the first command that differs.  So a
+    frame that draws the same objects as the last one does not touch the canvas.
 
     **You should never construct an object of this class**.  Creating a new instance
     of this class will not properly display it on the screen.  Instead, you should
@@ -340,7 +353,10 @@ class GView(FloatLayout):
         self.bind(pos=self._reset)
         self.bind(size=self._reset)
         self._reset()
-        self._contents = set()
+        self._contents = []
+        self._drawn = set()
+        self._cursor = 0
+        self._retained = []
 
 
     # PUBLIC METHODS
@@ -351,22 +367,76 @@ class GView(FloatLayout):
         You should never call this method, since you do not understand raw Kivy graphics
         commands.  Instead, you should use the `draw` method in :class:`GObject` instead.
 
+        If the command is the next one in the display list of the last frame, this does
+        nothing to the canvas.  Otherwise, the rest of that display list is removed and
+        the command is added in its place.  Drawing a command twice in the same frame
+        has no effect.
+
         :param cmd: the command to draw
         :type cmd:  A Kivy graphics command
         """
-        if not cmd in self._contents:
-            self._frame.add(cmd)
-            self._contents.add(cmd)
+        if cmd in self._drawn:
+            return
+        self._drawn.add(cmd)
+        pos = self._cursor
+        if pos < len(self._contents) and self._contents[pos] is cmd:
+            self._cursor = pos+1
+            return
+        self._trim()
+        self._frame.add(cmd)
+        self._contents.append(cmd)
+        self._cursor = pos+1
 
     def clear(self):
         """
-        Clears the contents of the view.
+        Starts a new frame in this view.
 
         This method is called for you automatically at the start of the animation
-        frame.  That way, you are not drawing images on top of one another.
+        frame.  That way, you are not drawing images on top of one another.  The objects
+        drawn in the last frame stay on the canvas until they are replaced, so that the
+        ones that are drawn again cost nothing.  The attached objects are drawn first.
+        """
+        self._trim()
+        self._cursor = 0
+        self._drawn.clear()
+        for obj in self._retained:
+            obj.draw(self)
+
+    def attach(self,obj):
         """
-        self._frame.clear()
-        self._contents.clear()
+        Adds an object to the objects drawn every frame.
+
+        The object stays on the screen until it is detached, so you do not need to draw
+        it again.  Changes to the object show up on the next frame.  Attaching an object
+        that is already attached does nothing.
+
+        :param obj: the object to attach
+        :type obj:  :class:`GObject`
+        """
+        assert isinstance(obj,GObject), '%s is not a GObject' % repr(obj)
+        if not obj in self._retained:
+            self._retained.append(obj)
+
+    def detach(self,obj):
+        """
+        Removes an object from the objects drawn every frame.
+
+        The object leaves the screen on the next frame.  Detaching an object that is not
+        attached does nothing.
+
+        :param obj: the object to detach
+        :type obj:  :class:`GObject`
+        """
+        if obj in self._retained:
+            self._retained.remove(obj)
+
+    def is_attached(self,obj):
+        """
+        :return: True if ``obj`` is attached to this view.
+        :rtype:  ``bool``
+        """
+        return obj in self._retained
+
 
     # HIDDEN METHODS
     def _reset(self,obj=None,value=None):
@@ -379,3 +449,26 @@ class GView(FloatLayout):
         # Work-around for Retina Macs
         self.canvas.add(Scale(dp(1),dp(1),dp(1)))
         self.canvas.add(self._frame)
+
+    def _trim(self):
+        """
+        Removes the commands after the cursor from the display list and the canvas.
+
+        These are the commands of the last frame that have not been drawn again (yet).
+        """
+        pos = self._cursor
+        if pos == 0:
+            self._frame.clear()
+        else:
+            for cmd in self._contents[pos:]:
+                self._frame.remove(cmd)
+        del self._contents[pos:]
+
+    def _flush(self):
+        """
+        Finishes the current frame.
+
+        This removes the commands of the last frame that were not drawn in this one.
+        :class:`GameApp` calls this method after :meth:`GameApp.draw`.
+        """
+        self._trim()
@@ -0,0 +1,262 @@
+"""
+Rollout module for Alien Invaders
+
+This module plays large numbers of seeded, headless games of Alien Invaders
+in parallel.  Each game is a WaveSim driven by an input policy, and the games
+are spread over all of the cores with a ProcessPoolExecutor.
+
+Results are streamed back as the games finish.  Only a bounded number of games
+are in flight at any time, so a sweep of 100,000 games never holds more than a
+few hundred results in memory.  For example::
+
+    for result in runGames(range(100000),RandomPolicy()):
+        print(result.seed,result.outcome,result.frames,result.shots)
+
+Like simulation.py, this module must never import game2d.
+"""
+from consts import *
+from simulation import *
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import os
+import random
+
+
+class RandomPolicy(object):
+    """
+    An input policy that holds down each key at random.
+
+    Every frame, each of the keys 'left', 'right' and 'spacebar' is held down
+    with the given probability.  The policy is seeded from the game seed, so a
+    game is reproducible.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _chance: the probability that a key is held down in a frame
+    # Invariant: _chance is a float in 0..1
+
+    def __init__(self, chance=0.3):
+        """
+        The initializer for the RandomPolicy class
+
+        Parameter chance: the probability that a key is held down in a frame
+        Precondition: chance is a number in 0..1
+        """
+        assert 0 <= chance <= 1, '%s is not a probability' % repr(chance)
+        self._chance = chance
+
+    def start(self, seed):
+        """
+        Returns the per-game state of this policy (a random generator)
+
+        Parameter seed: the seed of the game
+        Precondition: seed is a value accepted by random.Random
+        """
+        return random.Random(seed)
+
+    def keys(self, state, wave, frame):
+        """
+        Returns the keys to hold down this frame
+
+        Parameter state: the value returned by start for this game
+        Precondition: state is a random.Random object
+
+        Parameter wave: the wave being played
+        Precondition: wave is a WaveSim object
+
+        Parameter frame: the number of frames played so far
+        Precondition: frame is an int >= 0
+        """
+        return [key for key in ('left','right','spacebar') if state.random() < self._chance]
+
+
+class ScriptedPolicy(object):
+    """
+    An input policy that replays a fixed script of key presses.
+
+    The script is a sequence with one entry per frame; each entry is the
+    sequence of keys held down in that frame.  The script repeats when it
+    runs out.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _script: the keys held down in each frame
+    # Invariant: _script is a nonempty tuple of tuples of strings
+
+    def __init__(self, script):
+        """
+        The initializer for the ScriptedPolicy class
+
+        Parameter script: the keys held down in each frame
+        Precondition: script is a nonempty sequence of sequences of strings
+        """
+        assert len(script) > 0, 'the script is empty'
+        self._script = tuple(tuple(keys) for keys in script)
+
+    def start(self, seed):
+        """
+        Returns the per-game state of this policy (always None)
+
+        Parameter seed: the seed of the game
+        Precondition: seed is a value accepted by random.Random
+        """
+        return None
+
+    def keys(self, state, wave, frame):
+        """
+        Returns the keys to hold down this frame
+
+        Parameter state: the value returned by start for this game
+        Precondition: state is None
+
+        Parameter wave: the wave being played
+        Precondition: wave is a WaveSim object
+
+        Parameter frame: the number of frames played so far
+        Precondition: frame is an int >= 0
+        """
+        return self._script[frame % len(self._script)]
+
+
+class GameResult(object):
+    """
+    A class representing the result of a single headless game.
+    """
+    # INSTANCE ATTRIBUTES:
+    # Attribute seed: the seed of the game
+    # Invariant: seed is the value passed to playGame
+    #
+    # Attribute outcome: how the game ended
+    # Invariant: outcome is 'win', 'lose' or 'timeout'
+    #
+    # Attribute frames: the number of frames the player survived
+    # Invariant: frames is an int >= 0
+    #
+    # Attribute shots: the number of bolts fired by the player
+    # Invariant: shots is an int >= 0
+    #
+    # Attribute lives: the number of lives left at the end of the game
+    # Invariant: lives is an int
+
+    def __init__(self, seed, outcome, frames, shots, lives):
+        """The initializer for the GameResult class"""
+        self.seed = seed
+        self.outcome = outcome
+        self.frames = frames
+        self.shots = shots
+        self.lives = lives
+
+    def __repr__(self):
+        """Returns an unambiguous string representation of this result"""
+        return 'GameResult(seed=%s,outcome=%s,frames=%s,shots=%s,lives=%s)' % \
+            (repr(self.seed),repr(self.outcome),self.frames,self.shots,self.lives)
+
+
+def playGame(seed, policy, maxFrames=36000, dt=1/60):
+    """
+    Returns the GameResult of a single headless game.
+
+    The game follows Invaders: it is won when the wave is empty, and lost
+    when the aliens reach the defense line or the lives run out.  A destroyed
+    ship is restored immediately (as if the player pressed 'S').
+
+    Parameter seed: the seed for the game
+    Precondition: seed is a value accepted by random.Random
+
+    Parameter policy: the input policy
+    Precondition: policy has methods start and keys (e.g. RandomPolicy)
+
+    Parameter maxFrames: the number of frames before the game times out
+    Precondition: maxFrames is an int > 0
+
+    Parameter dt: the time in seconds of each frame
+    Precondition: dt is a number > 0
+    """
+    wave = WaveSim(seed)
+    input = SimInput()
+    state = policy.start(seed)
+    frame = 0
+    while frame < maxFrames:
+        if wave.getWaveEmpty() or wave.getContactLine() or wave.getLives() <= 0:
+            break
+        if wave.getShip() is None:
+            wave.setShip()
+            wave.setShipCol()
+        input.clear()
+        for key in policy.keys(state,wave,frame):
+            input.press(key)
+        wave.update(input,dt)
+        frame += 1
+
+    if wave.getWaveEmpty():
+        outcome = 'win'
+    elif wave.getContactLine() or wave.getLives() <= 0:
+        outcome = 'lose'
+    else:
+        outcome = 'timeout'
+    return GameResult(seed,outcome,frame,wave.getShots(),wave.getLives())
+
+
+def _playChunk(seeds, policy, maxFrames, dt):
+    """
+    Returns the list of GameResults for the given seeds.
+
+    This is the task sent to each worker process.  Playing several games per
+    task keeps the cost of pickling small compared to the cost of the games.
+    """
+    return [playGame(seed,policy,maxFrames,dt) for seed in seeds]
+
+
+def runGames(seeds, policy, workers=None, chunk=16, maxFrames=36000, dt=1/60):
+    """
+    Generates the GameResults of many headless games, played in parallel.
+
+    Results are yielded as soon as their games finish, so they are not in
+    the order of seeds.  At most 2*workers chunks are in flight at once, and
+    seeds is only consumed as chunks are submitted, so seeds may be a
+    generator of any length.
+
+    Parameter seeds: the seeds of the games to play
+    Precondition: seeds is an iterable of values accepted by random.Random
+
+    Parameter policy: the input policy (it is pickled to every worker)
+    Precondition: policy has methods start and keys (e.g. RandomPolicy)
+
+    Parameter workers: the number of worker processes (None for every core)
+    Precondition: workers is None or an int > 0
+
+    Parameter chunk: the number of games in each task
+    Precondition: chunk is an int > 0
+
+    Parameter maxFrames: the number of frames before a game times out
+    Precondition: maxFrames is an int > 0
+
+    Parameter dt: the time in seconds of each frame
+    Precondition: dt is a number > 0
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    seeds = iter(seeds)
+
+    def chunks():
+        batch = []
+        for seed in seeds:
+            batch.append(seed)
+            if len(batch) == chunk:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    pending = set()
+    tasks = chunks()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for seedlist in tasks:
+            pending.add(pool.submit(_playChunk,seedlist,policy,maxFrames,dt))
+            if len(pending) >= 2*workers:
+                break
+        while pending:
+            done, pending = wait(pending,return_when=FIRST_COMPLETED)
+            for future in done:
+                for seedlist in tasks:
+                    pending.add(pool.submit(_playChunk,seedlist,policy,maxFrames,dt))
+                    break
+                for result in future.result():
+                    yield result
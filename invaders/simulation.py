@@ -0,0 +1,760 @@
+"""
+Headless simulation module for Alien Invaders
+
+This module contains the simulation core for a single wave of Alien Invaders.
+Unlike the subcontroller Wave, nothing in this module depends on game2d (and
+hence on Kivy).  The ship and the laser bolts are plain Python records, and
+the aliens are a Formation of NumPy arrays (see formation.py), so a wave can
+be stepped thousands of times a second without ever opening a window.  This
+is what we use for bots, balancing and CI.  Runs with many bolts in play can
+use ArrayWaveSim, which stores the bolts in a SimBolts structure of NumPy
+arrays instead.
+
+The subcontroller Wave is now a thin rendering adapter on top of WaveSim.  It
+forwards the input to WaveSim.update, and then positions its GImage/GSprite
+models from the state in this module when it is time to draw.
+"""
+from consts import *
+from formation import *
+import numpy as np
+import random
+
+# PRIMARY RULE: This module is not allowed to import game2d (or anything that
+# imports it, like models.py or wave.py).  It must run on a headless server.
+
+
+class SimShip(object):
+    """
+    A class representing the state of the player ship.
+
+    The ship has no image.  It is just a position plus the current frame of
+    the explosion animation (which Wave uses to pick the sprite frame).
+    """
+    # INSTANCE ATTRIBUTES:
+    # Attribute x: the horizontal coordinate of the ship center
+    # Invariant: x is a float
+    #
+    # Attribute y: the vertical coordinate of the ship center
+    # Invariant: y is a float
+    #
+    # Attribute frame: the current frame of the explosion animation
+    # Invariant: frame is an int >= 0
+
+    def __init__(self):
+        """The initializer for the SimShip class"""
+        self.x = GAME_WIDTH/2
+        self.y = SHIP_BOTTOM
+        self.frame = 0
+
+
+class SimBolt(object):
+    """
+    A class representing the state of a single laser bolt.
+    """
+    # INSTANCE ATTRIBUTES:
+    # Attribute x: the horizontal coordinate of the bolt center
+    # Invariant: x is a float
+    #
+    # Attribute y: the vertical coordinate of the bolt center
+    # Invariant: y is a float
+    #
+    # Attribute velocity: the velocity in y direction
+    # Invariant: velocity is an int or float
+
+    def __init__(self, x, y, velocity):
+        """The initializer for the SimBolt class"""
+        self.x = x
+        self.y = y
+        self.velocity = velocity
+
+    def isPlayerBolt(self):
+        """
+        Returns True if this bolt was fired by the player, False if it was
+        fired by an alien.
+        """
+        return self.velocity > 0
+
+
+class SimBolts(object):
+    """
+    A class representing the laser bolts in play as a structure of NumPy arrays.
+
+    This is the bolt storage of ArrayWaveSim, for headless runs with many
+    bolts in play (the bullet-heavy modes).  With a handful of bolts, the
+    fixed cost of each NumPy call makes it slower than the list of SimBolt
+    records in WaveSim, so a normal game does not use it.
+
+    The bolts are stored in arrays with a fixed capacity, one array each for
+    the x-coordinates, the y-coordinates, the velocities and the owners.  The
+    bolts in play are always the first count() slots of the arrays, so there
+    are never any holes to skip.  The methods move, removeMany and
+    removeTouching keep the order of the bolts: they pack the bolts they keep
+    into the front of the arrays in the order they were in.  The method
+    remove does not: it moves the last bolt in play into the slot it empties.
+
+    Moving the bolts and removing the ones that have left the window is a
+    single vectorized step, no matter how many bolts are in play.  Like the
+    bolt slots of WaveBatch, a bolt fired when every slot is in use is lost.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _x: the horizontal coordinate of each bolt center
+    # Invariant: _x is a float array of shape (capacity,)
+    #
+    # Attribute _y: the vertical coordinate of each bolt center
+    # Invariant: _y is a float array of shape (capacity,)
+    #
+    # Attribute _v: the velocity in y direction of each bolt
+    # Invariant: _v is a float array of shape (capacity,)
+    #
+    # Attribute _player: whether each bolt was fired by the player
+    # Invariant: _player is a bool array of shape (capacity,)
+    #
+    # Attribute _count: the number of bolts in play
+    # Invariant: _count is an int between 0 and capacity; the slots from
+    # _count on are not in play, and their values are meaningless
+    #
+    # Attribute _players: the number of bolts in play fired by the player
+    # Invariant: _players is an int between 0 and _count, equal to the
+    # number of True in the first _count slots of _player
+
+    # GETTERS
+    def getX(self):
+        """Returns the array of x-coordinates of the bolts in play (a view)"""
+        return self._x[:self._count]
+
+    def getY(self):
+        """Returns the array of y-coordinates of the bolts in play (a view)"""
+        return self._y[:self._count]
+
+    def getVelocity(self):
+        """Returns the array of velocities of the bolts in play (a view)"""
+        return self._v[:self._count]
+
+    def getPlayer(self):
+        """Returns the array of player-fired flags of the bolts in play (a view)"""
+        return self._player[:self._count]
+
+    def getBolt(self, i):
+        """
+        Returns the tuple (x, y, velocity) of the bolt in slot i, as floats
+
+        Parameter i: the slot of the bolt
+        Precondition: i is an int with 0 <= i < count()
+        """
+        return (self._x.item(i), self._y.item(i), self._v.item(i))
+
+    def getPositions(self):
+        """Returns the list of (x, y) centers of the bolts in play, in slot order"""
+        n = self._count
+        return list(zip(self._x[:n].tolist(),self._y[:n].tolist()))
+
+    def getPlayerSlots(self):
+        """Returns the list of slots holding a bolt fired by the player, last slot first"""
+        if self._players == 0:
+            return []
+        return self._player[:self._count].nonzero()[0].tolist()[::-1]
+
+    def getCapacity(self):
+        """Returns the maximum number of bolts in play"""
+        return len(self._x)
+
+    def count(self):
+        """Returns the number of bolts in play"""
+        return self._count
+
+    def countPlayer(self):
+        """Returns the number of bolts in play fired by the player"""
+        return self._players
+
+    def __len__(self):
+        """Returns the number of bolts in play"""
+        return self._count
+
+    # INITIALIZER
+    def __init__(self, capacity=BOLT_CAPACITY):
+        """
+        The initializer for the SimBolts class.
+
+        Parameter capacity: the maximum number of bolts in play
+        Precondition: capacity is an int > 0
+        """
+        assert type(capacity) == int and capacity > 0, '%s is not a valid capacity' % repr(capacity)
+        self._x = np.zeros(capacity)
+        self._y = np.zeros(capacity)
+        self._v = np.zeros(capacity)
+        self._player = np.zeros(capacity,dtype=bool)
+        self._count = 0
+        self._players = 0
+
+    # METHODS TO ADD AND REMOVE BOLTS
+    def add(self, x, y, velocity):
+        """
+        Puts a new bolt in play, and returns True if there was room for it.
+
+        A bolt with a positive velocity belongs to the player, and any other
+        bolt belongs to the aliens.
+
+        Parameter x, y: the center of the bolt
+        Precondition: x and y are numbers
+
+        Parameter velocity: the velocity in y direction
+        Precondition: velocity is an int or float
+        """
+        i = self._count
+        if i == len(self._x):
+            return False
+        self._x[i] = x
+        self._y[i] = y
+        self._v[i] = velocity
+        self._player[i] = velocity > 0
+        self._players += velocity > 0
+        self._count = i+1
+        return True
+
+    def remove(self, i):
+        """
+        Removes the bolt in slot i, moving the last bolt in play into its place.
+
+        Parameter i: the slot of the bolt to remove
+        Precondition: i is an int with 0 <= i < count()
+        """
+        last = self._count-1
+        self._players -= bool(self._player[i])
+        if i != last:
+            self._x[i] = self._x[last]
+            self._y[i] = self._y[last]
+            self._v[i] = self._v[last]
+            self._player[i] = self._player[last]
+        self._count = last
+
+    def removeMany(self, mask):
+        """
+        Removes every bolt whose flag in mask is True.
+
+        The bolts that are kept are packed into the front of the arrays, in
+        order, with one vectorized copy per array instead of one swap per bolt.
+
+        Parameter mask: the bolts to remove
+        Precondition: mask is a bool array of shape (count(),)
+        """
+        if not mask.any():
+            return
+        keep = np.flatnonzero(~mask)
+        n = len(keep)
+        self._x[:n] = self._x[keep]
+        self._y[:n] = self._y[keep]
+        self._v[:n] = self._v[keep]
+        self._player[:n] = self._player[keep]
+        self._count = n
+        self._players = int(self._player[:n].sum())
+
+    def clear(self):
+        """Removes every bolt"""
+        self._count = 0
+        self._players = 0
+
+    # METHODS TO MOVE AND TEST THE BOLTS
+    def move(self):
+        """Moves every bolt by its velocity, removing those that have left the window"""
+        n = self._count
+        if n == 0:
+            return
+        y = self._y[:n]
+        y += self._v[:n]
+        # Most frames no bolt leaves, and two reductions are cheaper than a mask
+        if np.minimum.reduce(y) < 0 or np.maximum.reduce(y) > GAME_HEIGHT:
+            self.removeMany((y < 0) | (y > GAME_HEIGHT))
+
+    def hasPlayerBolt(self):
+        """Returns True if a bolt fired by the player is in play"""
+        return self._players > 0
+
+    def touching(self, x, y, width, height):
+        """
+        Returns the bool array of the bolts that touched a box during the
+        last frame.
+
+        The test is swept: each bolt moved from y-velocity to y in its last
+        frame, and this checks the whole of that motion, so a bolt can never
+        pass through the box between frames.  Bolts only move vertically, so
+        a bolt touched the box if it is lined up with the box horizontally,
+        and its span overlaps the box vertically.  This is the same test as
+        sweepBox on the bolt (a BOLT_WIDTH x BOLT_HEIGHT box) and the box.
+
+        Parameter x, y: The center of the box
+        Precondition: x and y are numbers
+
+        Parameter width, height: The size of the box
+        Precondition: width and height are numbers > 0
+        """
+        n = self._count
+        by = self._y[:n]
+        start = by-self._v[:n]
+        halfH = (height+BOLT_HEIGHT)/2
+        return ((np.abs(self._x[:n]-x) < (width+BOLT_WIDTH)/2) &
+                (np.minimum(start,by) < y+halfH) & (np.maximum(start,by) > y-halfH))
+
+    def removeTouching(self, x, y, width, height, player):
+        """
+        Removes the bolts of one owner that touched a box during the last
+        frame, and returns the number removed.
+
+        This is touching followed by removeMany, restricted to the bolts
+        fired by the player (if player is True) or by the aliens.
+
+        Parameter x, y: The center of the box
+        Precondition: x and y are numbers
+
+        Parameter width, height: The size of the box
+        Precondition: width and height are numbers > 0
+
+        Parameter player: whether to remove the player bolts
+        Precondition: player is a bool
+        """
+        n = self._count
+        if (self._players if player else n-self._players) == 0:
+            return 0
+        hits = self.touching(x,y,width,height)
+        if player:
+            hits &= self._player[:n]
+        else:
+            hits &= ~self._player[:n]
+        self.removeMany(hits)
+        return n-self._count
+
+
+class SimInput(object):
+    """
+    A class representing scripted keyboard input for a headless wave.
+
+    This class has the same interface that WaveSim uses from GInput (the
+    method is_key_down and the attribute key_count), so policies and tests
+    can drive a wave by pressing and releasing keys.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _keys: the set of keys currently held down
+    # Invariant: _keys is a set of strings
+
+    @property
+    def key_count(self):
+        """The number of keys currently held down"""
+        return len(self._keys)
+
+    def __init__(self):
+        """The initializer for the SimInput class"""
+        self._keys = set()
+
+    def is_key_down(self, key):
+        """
+        Returns True if key is currently held down
+
+        Parameter key: the key to test
+        Precondition: key is a string
+        """
+        return key in self._keys
+
+    def press(self, key):
+        """
+        Holds down the given key
+
+        Parameter key: the key to press
+        Precondition: key is a string
+        """
+        self._keys.add(key)
+
+    def release(self, key):
+        """
+        Releases the given key (if it is held down)
+
+        Parameter key: the key to release
+        Precondition: key is a string
+        """
+        self._keys.discard(key)
+
+    def clear(self):
+        """Releases all of the keys"""
+        self._keys.clear()
+
+
+class WaveSim(object):
+    """
+    This class simulates a single wave of Alien Invaders without drawing it.
+
+    It follows the rules of the original Wave subcontroller exactly: the
+    aliens march back and forth on a timer, drop down at the edges, and fire
+    from the bottom of a random column; the player moves and fires one bolt
+    at a time; bolts destroy aliens and the ship.
+
+    The getters match the ones on Wave, so code that only decides whether a
+    wave is won or lost can use either class.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _ship: the player ship
+    # Invariant: _ship is a SimShip object or None
+    #
+    # Attribute _formation: the aliens in the wave
+    # Invariant: _formation is a Formation object
+    #
+    # Attribute _bolts: the laser bolts currently in play
+    # Invariant: _bolts is a list of SimBolt objects, possibly empty
+    #
+    # Attribute _lives: the number of lives left
+    # Invariant: _lives is an int >= 0
+    #
+    # Attribute _time: the amount of time since the last Alien "step"
+    # Invariant: _time is a float >= 0s
+    #
+    # Attribute _direction: The current direction of the Alien Wave
+    # Invariant: _direction is either +1 or -1.
+    #
+    # Attribute _lastkeys: The number of keys pressed in the previous frame
+    # Invariant: _lastkeys is a int >= 0.
+    #
+    # Attribute _randStep: The number of steps between Alien shots
+    # Invariant: _randStep is an int between 1 and BOLT_RATE
+    #
+    # Attribute _stepsSince: The number of steps since the last Alien shot
+    # Invariant: _stepsSince is a int >= 0.
+    #
+    # Attribute _shipCol: The state of the ship's collisions
+    # Invariant: _shipCol is a boolean.
+    #
+    # Attribute _contactLine: The state of the wave's collisions with the defense line
+    # Invariant: _contactLine is a boolean.
+    #
+    # Attribute _waveEmpty: The state of the wave's emptiness (or lack thereof)
+    # Invariant: _waveEmpty is a boolean.
+    #
+    # Attribute _deathTime: The time spent in the ship explosion animation
+    # Invariant: _deathTime is a float >= 0, or None if the ship is not exploding
+    #
+    # Attribute _rng: The random number generator for alien fire
+    # Invariant: _rng is a random.Random object
+    #
+    # Attribute _shots: The number of bolts fired by the player
+    # Invariant: _shots is an int >= 0
+
+    # GETTERS AND SETTERS
+    def getShip(self):
+        """Returns the attribute _ship"""
+        return self._ship
+
+    def getFormation(self):
+        """Returns the attribute _formation"""
+        return self._formation
+
+    def getBolts(self):
+        """Returns the attribute _bolts"""
+        return self._bolts
+
+    def getLives(self):
+        """Returns the attribute _lives"""
+        return self._lives
+
+    def getShipCol(self):
+        """Returns the attribute _shipCol"""
+        return self._shipCol
+
+    def getWaveEmpty(self):
+        """Returns the attribute _waveEmpty"""
+        return self._waveEmpty
+
+    def getContactLine(self):
+        """Returns the attribute _contactLine"""
+        return self._contactLine
+
+    def getShots(self):
+        """Returns the attribute _shots"""
+        return self._shots
+
+    def setShip(self):
+        """Sets the _ship attribute equal to a new SimShip object."""
+        self._ship = SimShip()
+        self._deathTime = None
+
+    def setShipCol(self):
+        """Sets the state of a ship collision to False"""
+        self._shipCol = False
+
+    def setAliens(self):
+        """
+        Sets the _formation attribute to a full Formation of
+        ALIEN_ROWS * ALIENS_IN_ROW aliens.
+        """
+        self._formation = Formation(ALIEN_ROWS,ALIENS_IN_ROW)
+
+    def setrandStep(self):
+        """Sets the number of steps between alien shots to a random number
+        between 1 and BOLT_RATE"""
+        self._randStep = self._rng.randint(1,BOLT_RATE)
+
+    # INITIALIZER
+    def __init__(self, seed=None):
+        """
+        The initializer for the WaveSim class.
+
+        Parameter seed: the seed for the alien fire (None for a random seed)
+        Precondition: seed is None or a value accepted by random.Random
+        """
+        self._rng = random.Random(seed)
+        self.setAliens()
+        self.setShip()
+        self._bolts = []
+        self._time = 0
+        self._lives = SHIP_LIVES
+        self._lastkeys = 0
+        self._direction = 1
+        self.setrandStep()
+        self._stepsSince = 0
+        self._shipCol = False
+        self._waveEmpty = False
+        self._contactLine = False
+        self._shots = 0
+
+    # UPDATE METHOD
+    def update(self,input,dt):
+        """
+        Advances the wave by a single animation frame.
+
+        Parameter input: user input, used to control the ship
+        Precondition: input has a method is_key_down and an attribute
+        key_count (e.g. GInput or SimInput)
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        self._noAliens()
+        self._touchLine()
+        self._detShipCol()
+        if not self._waveEmpty:
+            self._detAlCol()
+            self._moveWave(dt)
+            if self._stepsSince == self._randStep:
+                self._alienFire()
+        if not self._shipCol:
+            self._moveShip(input)
+            self._boltKeyPress(input)
+        else:
+            self._explode(dt)
+        self._moveBolt()
+
+    # HELPER METHODS FOR COLLISION DETECTION
+    def _noAliens(self):
+        """Sets _waveEmpty to True if every alien has been destroyed"""
+        self._waveEmpty = self._formation.count() == 0
+
+    def _touchLine(self):
+        """Sets _contactLine to True if an alien has reached the defense line"""
+        bottom = self._formation.bottom()
+        self._contactLine = bottom is not None and bottom - ALIEN_HEIGHT/2 <= DEFENSE_LINE
+
+    def _detShipCol(self):
+        """Removes every alien bolt that hits the ship, costing a life for each"""
+        if self._ship is None:
+            return
+        # The swept test of SimBolts.touching, inlined for a handful of bolts
+        x = self._ship.x
+        y = self._ship.y
+        halfW = (SHIP_WIDTH+BOLT_WIDTH)/2
+        halfH = (SHIP_HEIGHT+BOLT_HEIGHT)/2
+        kept = []
+        for bolt in self._bolts:
+            if bolt.velocity < 0 and abs(bolt.x-x) < halfW:
+                start = bolt.y-bolt.velocity
+                if start > y-halfH and bolt.y < y+halfH:
+                    self._shipCol = True
+                    self._lives -= 1
+                    continue
+            kept.append(bolt)
+        self._bolts = kept
+
+    def _detAlCol(self):
+        """Removes every player bolt that hits an alien, destroying that alien.
+
+        A bolt destroys at most one alien: the first one it touched along its
+        motion in the last frame (the lowest one, for a rising bolt)."""
+        kept = []
+        for bolt in self._bolts:
+            hit = None
+            if bolt.velocity > 0:
+                hit = self._formation.sweep(bolt.x,bolt.y-bolt.velocity,bolt.x,bolt.y,
+                                            BOLT_WIDTH,BOLT_HEIGHT)
+            if hit is None:
+                kept.append(bolt)
+            else:
+                self._formation.kill(hit[0],hit[1])
+        self._bolts = kept
+
+    # HELPER METHODS TO MOVE THE SHIP, ALIENS AND BOLTS
+    def _moveShip(self,input):
+        """Moves the ship left or right, keeping it on screen"""
+        if input.is_key_down('left') and self._ship.x > SHIP_WIDTH/2:
+            self._ship.x -= SHIP_MOVEMENT
+        if input.is_key_down('right') and self._ship.x < GAME_WIDTH-(SHIP_WIDTH/2):
+            self._ship.x += SHIP_MOVEMENT
+
+    def _moveWave(self,dt):
+        """Marches the wave one step once ALIEN_SPEED seconds have passed,
+        dropping it down and reversing it when it reaches an edge"""
+        if self._time > ALIEN_SPEED:
+            self._formation.march(ALIEN_H_WALK * self._direction,0)
+            self._time = 0
+            self._stepsSince += 1
+            left, right = self._formation.extremes()
+            if left is not None and \
+            ((self._direction == 1 and GAME_WIDTH - ALIEN_H_SEP <= right) or \
+            (self._direction == -1 and ALIEN_H_SEP >= left)):
+                self._formation.march(0,-ALIEN_V_WALK)
+                self._direction *= -1
+        self._time += dt
+
+    def _moveBolt(self):
+        """Moves every bolt, removing those that have left the window"""
+        kept = []
+        for bolt in self._bolts:
+            bolt.y += bolt.velocity
+            if 0 <= bolt.y <= GAME_HEIGHT:
+                kept.append(bolt)
+        self._bolts = kept
+
+    def _boltKeyPress(self,input):
+        """
+        Fires a player bolt on a new press of the spacebar.
+
+        The player may only have one bolt on screen at a time.
+        """
+        curr_keys = input.key_count
+        change = curr_keys > 0 and self._lastkeys == 0 and input.is_key_down('spacebar')
+        if change:
+            for bolt in self._bolts:
+                if bolt.velocity > 0:
+                    change = False
+        if change:
+            self._bolts.append(SimBolt(self._ship.x,self._ship.y+SHIP_HEIGHT/2,BOLT_SPEED))
+            self._shots += 1
+        self._lastkeys = curr_keys
+
+    def _pickAlien(self):
+        """
+        Returns the (row, col) of the alien that should fire, or None if the
+        wave is empty.
+
+        The method chooses a random nonempty column, and then the bottom-most
+        alien in that column.
+        """
+        columns = self._formation.columns()
+        if len(columns) == 0:
+            return None
+        col = columns[self._rng.randint(0,len(columns)-1)]
+        return (self._formation.shooter(col),col)
+
+    def _alienFire(self):
+        """Fires an alien bolt and picks the number of steps until the next one"""
+        self._stepsSince = 0
+        alien = self._pickAlien()
+        if alien is not None:
+            x, y = self._formation.position(alien[0],alien[1])
+            self._bolts.append(SimBolt(x,y - ALIEN_HEIGHT/2,-BOLT_SPEED))
+        self.setrandStep()
+
+    def _explode(self,dt):
+        """
+        Advances the ship explosion by dt seconds.
+
+        The explosion takes DEATH_SPEED seconds over 7 frames of the ship
+        strip, and Wave draws the frame set here.  When it is finished, the
+        ship is removed and every bolt is cleared.
+        """
+        if self._ship is None:
+            return
+        if self._deathTime is None:
+            self._deathTime = 0
+            return
+        self._ship.frame = int(self._deathTime / DEATH_SPEED * 7)
+        self._deathTime += dt
+        if self._deathTime >= DEATH_SPEED:
+            self._deathTime = None
+            self._bolts.clear()
+            self._ship = None
+
+
+class ArrayWaveSim(WaveSim):
+    """
+    This class simulates a single wave of Alien Invaders with its bolts in arrays.
+
+    It plays by exactly the same rules as WaveSim, but it stores the laser
+    bolts in a SimBolts object instead of a list of SimBolt records.  This is
+    for headless runs with many bolts in play, where moving and testing the
+    bolts one array at a time beats looping over them in Python.  With the
+    handful of bolts in a normal game it is slower than WaveSim.
+
+    Like the bolt slots of WaveBatch, a bolt fired when every slot is in use
+    is lost, and a lost player bolt is not counted as a shot.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _bolts: the laser bolts currently in play
+    # Invariant: _bolts is a SimBolts object
+
+    # INITIALIZER
+    def __init__(self, seed=None, capacity=BOLT_CAPACITY):
+        """
+        The initializer for the ArrayWaveSim class.
+
+        Parameter seed: the seed for the alien fire (None for a random seed)
+        Precondition: seed is None or a value accepted by random.Random
+
+        Parameter capacity: the maximum number of bolts in play
+        Precondition: capacity is an int > 0
+        """
+        super().__init__(seed)
+        self._bolts = SimBolts(capacity)
+
+    # HELPER METHODS FOR COLLISION DETECTION
+    def _detShipCol(self):
+        """Removes every alien bolt that hits the ship, costing a life for each"""
+        if self._ship is None:
+            return
+        count = self._bolts.removeTouching(self._ship.x,self._ship.y,SHIP_WIDTH,SHIP_HEIGHT,False)
+        if count > 0:
+            self._shipCol = True
+            self._lives -= count
+
+    def _detAlCol(self):
+        """Removes every player bolt that hits an alien, destroying that alien.
+
+        A bolt destroys at most one alien: the first one it touched along its
+        motion in the last frame (the lowest one, for a rising bolt)."""
+        # Remove from the back, so that the swap never moves an unchecked bolt
+        for i in self._bolts.getPlayerSlots():
+            x, y, v = self._bolts.getBolt(i)
+            hit = self._formation.sweep(x,y-v,x,y,BOLT_WIDTH,BOLT_HEIGHT)
+            if hit is not None:
+                self._formation.kill(hit[0],hit[1])
+                self._bolts.remove(i)
+
+    # HELPER METHODS TO MOVE THE BOLTS
+    def _moveBolt(self):
+        """Moves every bolt, removing those that have left the window"""
+        self._bolts.move()
+
+    def _boltKeyPress(self,input):
+        """
+        Fires a player bolt on a new press of the spacebar.
+
+        The player may only have one bolt on screen at a time.
+        """
+        curr_keys = input.key_count
+        change = curr_keys > 0 and self._lastkeys == 0 and input.is_key_down('spacebar')
+        if change and not self._bolts.hasPlayerBolt():
+            if self._bolts.add(self._ship.x,self._ship.y+SHIP_HEIGHT/2,BOLT_SPEED):
+                self._shots += 1
+        self._lastkeys = curr_keys
+
+    def _alienFire(self):
+        """Fires an alien bolt and picks the number of steps until the next one"""
+        self._stepsSince = 0
+        alien = self._pickAlien()
+        if alien is not None:
+            x, y = self._formation.position(alien[0],alien[1])
+            self._bolts.add(x,y - ALIEN_HEIGHT/2,-BOLT_SPEED)
+        self.setrandStep()
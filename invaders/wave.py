@@ -8,6 +8,10 @@ you move to a new level, you are expected to make a new instance of the class.
 The subcontroller Wave manages the ship, the aliens and any laser bolts on
 screen. These are model objects.  Their classes are defined in models.py.
 
+The rules of the game are not in this module.  They are in the headless class
+WaveSim (in simulation.py), which runs without Kivy.  Wave forwards the input
+to WaveSim and positions the models from the simulation state when drawing.
+
 Most of your work on this assignment will be in either this module or
 models.py. Whether a helper method belongs in this module or models.py is
 often a complicated issue.  If you do not know, ask on Piazza and we will
@@ -19,7 +23,8 @@ answer.
 from game2d import *
 from consts import *
 from models import *
-import random
+from simulation import *
+import numpy as np
 
 # PRIMARY RULE: Wave can only access attributes in models.py via getters/setters
 # Wave is NOT allowed to access anything in app.py (Subcontrollers are not
@@ -37,6 +42,9 @@ class Wave(object):
     loses). When the wave is complete, you  should create a NEW instance of
     Wave (in Invaders) if you want to make a new wave of aliens.
 
+    The game logic itself is delegated to a WaveSim object.  This class only
+    owns the drawable models, and copies the simulation state into them.
+
     If you want to pause the game, tell this controller to draw, but do not
     update.  See subcontrollers.py from Lecture 24 for an example.  This
     class will be similar to than one in how it interacts with the main class
@@ -51,98 +59,72 @@ class Wave(object):
 
     """
     # HIDDEN ATTRIBUTES:
-    # Attribute _ship: the player ship to control
-    # Invariant: _ship is a Ship object or None
-    #
-    # Attribute _aliens: the 2d list of aliens in the wave
-    # Invariant: _aliens is a rectangular 2d list containing Alien objects or None
-    #
-    # Attribute _bolts: the laser bolts currently on screen
-    # Invariant: _bolts is a list of Bolt objects, possibly empty
-    #
-    # Attribute _dline: the defensive line being protected
-    # Invariant : _dline is a GPath object
+    # Attribute _sim: the headless simulation of this wave
+    # Invariant: _sim is a WaveSim object
     #
-    # Attribute _lives: the number of lives left
-    # Invariant: _lives is an int >= 0
+    # Attribute _ship: the player ship to draw
+    # Invariant: _ship is a Ship object or None (None when _sim has no ship)
     #
-    # Attribute _time: the amount of time since the last Alien "step"
-    # Invariant: _time is a float >= 0s
+    # Attribute _aliens: the aliens to draw, one sprite batch per alien image
+    # Invariant: _aliens is a list of GSpriteBatch objects, one for each file in
+    # ALIEN_IMAGES.  Batch k holds the formation-local positions of the living
+    # aliens of type k, and the position of every batch is the offset of the
+    # formation of _sim
     #
-    # You may change any attribute above, as long as you update the invariant
-    # You may also add any new attributes as long as you document them.
-    # LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+    # Attribute _alienCount: the number of aliens in the batches of _aliens
+    # Invariant: _alienCount is an int >= 0
     #
-    # Attribute _direction: The current direction of the Alien Wave
-    # Invariant: _direction is either +1 or -1.
+    # Attribute _bolts: the laser bolts to draw, one active Bolt per bolt in play
+    # Invariant: _bolts is a GPool of Bolt objects
     #
-    # Attribute _lastkeys: The number of keys pressed in the previous frame
-    # Invariant: _lastkeys is a int >= 0.
-    #
-    # Attribute _randStep: The number of steps between Alien shots
-    # Invariant: _randStep is an int between 1 and BOLT_RATE
-    #
-    # Attribute _stepsSince: The number of steps since the last Alien shot
-    # Invariant: _stepsSince is a int >= 0.
-    #
-    # Attribute _shipCol: The state of the ship's collisions
-    # Invariant: _shipCol is a boolean.
-    #
-    # Attribute _contactLine: The state of the wave's collisions with _dline
-    # Invariant: _contactLine is a boolean.
-    #
-    # Attribute _waveEmpty: The state of the wave's emptiness (or lack thereof)
-    # Invariant: _waveEmpty is a boolean.
+    # Attribute _dline: the defensive line being protected
+    # Invariant : _dline is a GPath object
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def getShip(self):
-        """Returns the attribute _ship"""
+        """Returns the attribute _ship (None once the ship has been destroyed)"""
+        if self._sim.getShip() is None:
+            self._ship = None
         return self._ship
 
     def getLives(self):
-        """Returns the attribute _lives"""
-        return self._lives
+        """Returns the number of lives left"""
+        return self._sim.getLives()
 
     def getShipCol(self):
-        """Returns the attribute _shipCol"""
-        return self._shipCol
+        """Returns the state of the ship's collisions"""
+        return self._sim.getShipCol()
 
     def getWaveEmpty(self):
-        """Returns the attribute _waveEmpty"""
-        return self._waveEmpty
+        """Returns the state of the wave's emptiness"""
+        return self._sim.getWaveEmpty()
 
     def getContactLine(self):
-        """Returns the attribute _contactLine"""
-        return self._contactLine
+        """Returns the state of the wave's collisions with the defense line"""
+        return self._sim.getContactLine()
 
     def setAliens(self):
         """
         Sets the _aliens attribute.
 
-        Creates ALIEN_ROWS * ALIENS_IN_ROW Alien objects and puts them all
-        into the attribute _aliens, a rectangular 2D list.
+        Creates one GSpriteBatch for each alien image.  The living aliens of
+        the formation of the simulation are drawn as sprites of the batch for
+        their type, so the whole wave is only a few Kivy meshes.
         """
-        self._aliens = []
-
-        for alien in range(ALIEN_ROWS):
-            tempAlien = []
-            for alienrow in range(ALIENS_IN_ROW):
-                hpos = ALIEN_H_SEP + (alienrow*ALIEN_H_SEP)
-                vpos = GAME_HEIGHT-(ALIEN_CEILING + (alien*ALIEN_V_SEP))
-                if alien % 6 == 5 or alien % 6 == 0:
-                    tempAlien.append(Alien(source='alien3.png',x=hpos,y=vpos))
-                if alien % 6 == 1 or alien % 6 == 2:
-                    tempAlien.append(Alien(source='alien2.png',x=hpos,y=vpos))
-                if alien % 6 == 3 or alien % 6 == 4:
-                    tempAlien.append(Alien(source='alien1.png',x=hpos,y=vpos))
-            self._aliens.append(tempAlien)
+        self._aliens = [GSpriteBatch(source=source,sprite_width=ALIEN_WIDTH,
+                                     sprite_height=ALIEN_HEIGHT)
+                        for source in ALIEN_IMAGES]
+        self._alienCount = -1
+        self._syncAliens()
 
     def setShip(self):
         """
         Creates the ship for the game.
 
-        Sets the _ship attribute equal to a new Ship object.
+        Restores the ship in the simulation and sets the _ship attribute
+        equal to a new Ship object.
         """
+        self._sim.setShip()
         self._ship = Ship()
 
     def setDline(self):
@@ -155,68 +137,31 @@ class Wave(object):
         linewidth=2,linecolor='black')
 
     def setBolts(self):
-        """Initializes the _bolts attribute by creating a new empty 1D list."""
-        self._bolts = []
-
-    def setLives(self):
-        """Sets the attribute _lives equal to the lives left
-        for the player, initially at 3"""
-        self._lives = 3
-
-    def setTime(self):
-        """Sets the amount of time since the last Alien step, initially 0"""
-        self._time = 0
-
-    def setInitialDirection(self):
-        """Sets the initial direction of the aliens when moving;
-        +1 indicates movement to the right, -1 indicates movement to the left"""
-        self._direction = 1
+        """
+        Initializes the _bolts attribute by creating a new, empty pool of bolts.
 
-    def setLastKeys(self):
-        """Sets the number of keys pressed in the previous frame, initially 0"""
-        self._lastkeys = 0
+        Bolts are made by the pool the first time that many are in play at once,
+        and reused after that.
+        """
+        self._bolts = GPool(lambda: Bolt(0,0,0))
 
-    def setrandStep(self):
-        """Sets the number of steps between alien shots by randomly choosing a
-        number between 1 and BOLT_RATE using the randint method in the random class"""
-        self._randStep = random.randint(1,BOLT_RATE)
+    def setShipCol(self):
+        """Sets the state of a ship collision to False"""
+        self._sim.setShipCol()
 
-    def setStepsSince(self):
-        """Sets the number of steps since the last alien shot, initally at 0"""
-        self._stepsSince = 0
+    # INITIALIZER (standard form) TO CREATE SHIP AND ALIENS
+    def __init__(self, seed=None):
+        """
+        The initializer for the Wave class.
 
-    def setShipCol(self):
-        """Sets the state of a ship collision; True if the ship has had a
-        collision with a bolt, False if not, initially False"""
-        self._shipCol = False
-
-    def setWaveEmpty(self):
-        """Sets the state of the wave; True if the wave is empty
-        (all elements in the list are None), False if the wave is not empty
-        (at least one of the elements in the list is are not None)"""
-        self._waveEmpty = False
-
-    def setContactLine(self):
-        """Sets the state of the alien's contact with dline;
-        True if the aliens have passed the line, False if not"""
-        self._contactLine = False
-
-        # INITIALIZER (standard form) TO CREATE SHIP AND ALIENS
-    def __init__(self):
-        """The initializer for the Wave class."""
+        Parameter seed: the seed for the alien fire (None for a random seed)
+        Precondition: seed is None or a value accepted by random.Random
+        """
+        self._sim = WaveSim(seed)
         self.setAliens()
-        self.setShip()
+        self._ship = Ship()
         self.setDline()
         self.setBolts()
-        self.setTime()
-        self.setLives()
-        self.setLastKeys()
-        self.setInitialDirection()
-        self.setrandStep()
-        self.setStepsSince()
-        self.setShipCol()
-        self.setWaveEmpty()
-        self.setContactLine()
 
     # UPDATE METHOD TO MOVE THE SHIP, ALIENS, AND LASER BOLTS
     def update(self,input,dt):
@@ -229,20 +174,7 @@ class Wave(object):
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
-        self._noAliens()
-        self._touchLine()
-        self._detShipCol()
-        if not self._waveEmpty:
-            self._detAlCol()
-            self._moveWave(dt)
-            if self._stepsSince == self._randStep:
-                self._alienFire()
-        if not self._shipCol:
-            self._moveShip(input)
-            self._boltKeyPress(input)
-        else:
-            self._coroutine(dt)
-        self._moveBolt()
+        self._sim.update(input,dt)
 
     # DRAW METHOD TO DRAW THE SHIP, ALIENS, DEFENSIVE LINE AND BOLTS
     def draw(self,view):
@@ -252,273 +184,60 @@ class Wave(object):
         Parameter view: the game view, used in drawing
         Precondition: view is an instance of GView (inherited from GameApp)
         """
-        for i in range(ALIEN_ROWS):
-            for j in range(ALIENS_IN_ROW):
-                if self._aliens[i][j] is not None:
-                    self._aliens[i][j].draw(view)
-        if self._ship is not None:
+        self._syncAliens()
+        for batch in self._aliens:
+            batch.draw(view)
+        if self.getShip() is not None:
+            ship = self._sim.getShip()
+            if self._ship.x != ship.x:
+                self._ship.x = ship.x
+            if self._ship.frame != ship.frame:
+                self._ship.frame = ship.frame
             self._ship.draw(view)
         self._dline.draw(view)
-        for x in range(len(self._bolts)):
-            self._bolts[x].draw(view)
-
-    # HELPER METHODS FOR COLLISION DETECTION
-    def _noAliens(self):
-        """The helper method to detect if the wave is empty,
-        if the wave is determined to be empty, the attribute _waveEmpty is
-        set to True; if not, the attribute is set to False."""
-        var = True
-        for i in range(ALIEN_ROWS):
-            for j in range(ALIENS_IN_ROW):
-                if self._aliens[i][j] is not None:
-                    var = False
-        self._waveEmpty = var
-
-    def _touchLine(self):
-        """The helper method to detect when an alien touches the defense line,
-        if the wave passes the defense line, the attribute _contactLine is set
-        to True; if not, the attribute is set to False."""
-        var = True
-        run = True
-        i = 0
-        while i < ALIEN_ROWS and run:
-            j = 0
-            while j < ALIENS_IN_ROW and run:
-                if self._aliens[ALIEN_ROWS-1-i][j] is not None:
-                    y = self._aliens[ALIEN_ROWS-1-i][j].y - (ALIEN_HEIGHT/2)
-                    if y <= DEFENSE_LINE:
-                        var = False
-                        run = False
-                j += 1
-            i += 1
-        self._contactLine = not var
-
-    def _coroutine(self, dt):
-        """The helper method for animating collisions"""
-        if self._ship is not None:
-            if not self._ship._animator is None:
-                if not self._ship._animator is None:
-                    try:
-                        self._ship._animator.send(dt)
-                    except:
-                        self._ship._animator = None
-                        self._bolts.clear()
-                        self._ship = None
-
-            elif self._shipCol:
-                self._ship._animator = self._ship._makeAnimator()
-                next(self._ship._animator)
-
-    def _detShipCol(self):
-        """The helper method to check for collisions with the ship by looping
-        through each element of the _bolts list and calling the Ship method collides().
-
-        If a collision is detected, the attribute _shipCol is set to True, the
-        number of lives is decremented by 1, and the bolt that is involved in the
-        collision is removed from the screen and deleted from the _bolts list;
-        if not, the attribute _shipCol stays False
-        """
-        i = 0
-        run = True
-        while i < len(self._bolts):
-            if self._ship is not None and self._ship.collides(self._bolts[i]):
-                self._shipCol = True
-                self._lives -= 1
-                del self._bolts[i]
-                if len(self._bolts) == 0:
-                    run = False
-            i += 1
-
-    def _detAlCol(self):
-        """The helper method to check for collisions with the alien/wave by looping
-        through each element of the _bolts list and _aliens list and calling the
-        Alien method collides().
-
-        If a collision is detected, the Alien element is set to None and the bolt
-        involved in the collision is removed from the screen and deleted from
-        the _bolts list.
-        """
-        i = 0
-        run = True
-        while i < len(self._bolts) and run:
-            j = 0
-            while j < ALIEN_ROWS and run:
-                k = 0
-                while k < ALIENS_IN_ROW and run:
-                    try:
-                        if self._aliens[ALIEN_ROWS-1-j][k] is not None and \
-                        self._aliens[ALIEN_ROWS-1-j][k].collides(self._bolts[i]):
-                            self._aliens[ALIEN_ROWS-1-j][k] = None
-                            del self._bolts[i]
-                            if len(self._bolts) == 0:
-                                run = False
-                        k += 1
-                    except:
-                        run = False
-                j += 1
-            i += 1
-
-    def _moveShip(self,input):
-        """The helper method to move the ship horizontally.
-
-        If the 'left' key is pressed and there is still 'room' for the ship to
-        move left, it will call the Ship method _shipLeft()
-        If the 'right' key is pressed and there is still 'room' for the ship to
-        move right, it will call the Ship method _shipRight()
-
-        Parameter input: user input, used to control the ship or resume the game
-        Precondtion: input is an instance of GInput (inherited from GameApp)
-        """
-        if input.is_key_down('left') and self._ship.x > SHIP_WIDTH/2:
-            self._ship._shipLeft()
-        if input.is_key_down('right') and self._ship.x < GAME_WIDTH-(SHIP_WIDTH/2):
-            self._ship._shipRight()
-
-    def _waveHorizontal(self):
-        """The helper method to move the wave/aliens horizontally.
-
-        If the element in _aliens is not None, it will call the Alien method
-        _alienMove() and send self._direction as an argument, and reset the time
-        attribute to 0 to indicate that an alien step has just occurred.
-        """
-        for i in range(ALIEN_ROWS):
-            for j in range(ALIENS_IN_ROW):
-                if self._aliens[i][j] is not None:
-                    self._aliens[i][j]._alienMove(self._direction)
-                    self._time = 0
-
-    def _waveVertical(self):
-        """The helper method to move the wave/aliens vertically.
-
-        If the element in _aliens is not None, it will call the Alien method
-        _alienDown(), and reset the time attribute to 0 to indicate
-        that an alien step has just occurred.
-        """
-        for i in range(ALIEN_ROWS):
-            for j in range(ALIENS_IN_ROW):
-                if self._aliens[i][j] is not None:
-                    self._aliens[i][j]._alienDown()
-                    self._time = 0
-
-    def _moveWave(self,dt):
-        """The helper method to move the wave of aliens
-        horizontally and vertically as needed"""
-        if self._time > ALIEN_SPEED:
-            self._waveHorizontal()
-            self._stepsSince += 1
-            for i in range(ALIEN_ROWS):
-                for j in range(ALIENS_IN_ROW):
-                    rowLeft = i
-                    columnLeft = j
-                    if self._aliens[rowLeft][columnLeft] is not None:
-                        break
-                else:
-                    continue # Continue if the inner loop wasn't broken.
-                break # Inner loop was broken, break the outer.
-            for i in range(ALIEN_ROWS):
-                for j in range(ALIENS_IN_ROW):
-                    rowRight = i
-                    columnRight = (ALIENS_IN_ROW-1)-j
-                    if self._aliens[rowRight][columnRight] is not None:
-                        break
-                else:
-                    continue
-                break
-            if self._aliens[rowRight][columnRight]._approachEdge(self._direction) \
-            or self._aliens[rowLeft][columnLeft]._approachEdge(self._direction):
-                self._waveVertical()
-                self._direction *= -1
-        self._time += dt
-
-    def _moveBolt(self):
-        """
-        A helper method for bolt movement.
-
-        This helper method moves all the bolts contained in the _bolts attribute
-        across the screen, deleting them from the _bolts list when they have
-        reached the top or bottom of the window
-        """
-        i = 0
-        run = True
-        while i < len(self._bolts) and run:
-            self._bolts[i]._boltUp()
-            if self._bolts[i].y > GAME_HEIGHT or self._bolts[i].y < 0:
-                del self._bolts[i]
-                if len(self._bolts) == 0:
-                    run = False
-            i += 1
-
-    def _boltKeyPress(self,input):
-        """
-        Determines if there was a key press
-
-        This method checks for a key press, and if there is one, creates a
-        player bolt. A key press is when a key is pressed for the FIRST TIME.
-        We do not want the state to continue to change as we hold down the key.
-        The user must release the key and press it again to change the state.
-
-        Parameter input: user input, used to control the ship or resume the game
-        Precondtion: input is an instance of GInput (inherited from GameApp)
-        """
-        # Determine the current number of keys pressed
-        curr_keys = input.key_count
-        # Only change if we have just pressed the keys this animation frame
-        change = curr_keys > 0 and self._lastkeys == 0 and input.is_key_down('spacebar')
-        noPlayerBolts = True
-        for x in range(len(self._bolts)):
-            if(self._bolts[x]._isPlayerBolt()):
-                noPlayerBolts = False
-        if change and noPlayerBolts:
-            self._bolts.append(Bolt(self._ship.x,self._ship.y+SHIP_HEIGHT/2,BOLT_SPEED))
-
-            # Update last_keys
-        self._lastkeys = curr_keys
-
-    def _isEmptyCol(self,i):
-        """"
-        A helper method for checking columns in the _alien attribute.
-
-        Returns True if the given column i of the list is full of None elements,
-        False if any of the elements in the column are none.
-
-        Parameter i: the specified column in _aliens to check
-        Precondition: i is an int between 0 and ALIENS_IN_ROW-1
-        """
-        empty = True
-        for x in range(ALIEN_ROWS):
-            if self._aliens[x][i] is not None:
-                empty = False
-        return empty
-
-    def _pickAlien(self):
-        """
-        A helper method to choose which alien should fire.
-
-        The method chooses a random nonempty column in _aliens, and then finds
-        the first element in the column, going from the bottom of the wave up,
-        that is not None (and is an Alien object).
-        """
-        i = random.randint(0,ALIENS_IN_ROW-1)
-        while self._isEmptyCol(i):
-            i = random.randint(0,ALIENS_IN_ROW-1)
-        bottom = True
-        x = ALIEN_ROWS - 1
-        while bottom:
-            if self._aliens[x][i] is not None:
-                return self._aliens[x][i]
-            x -= 1
-
-    def _alienFire(self):
-        """
-        A helper method to create an alien bolt.
-
-        The method resets the attribute _stepsSince to 0, to indicate that an
-        Alien shot has occurred, then calls the method _pickAlien() to choose an
-        alien at random. Once the alien has been chosen, the method adds a new
-        Bolt object to _bolts with the same position as the alien, and randomly
-        chooses the number of steps until the next Alien shot.
-        """
-        self._stepsSince = 0
-        alien = self._pickAlien()
-        self._bolts.append(Bolt(alien.x,alien.y - ALIEN_HEIGHT/2,-BOLT_SPEED))
-        self.setrandStep()
+        self._syncBolts()
+        self._bolts.draw(view)
+
+    # HELPER METHODS TO COPY THE SIMULATION INTO THE MODELS
+    def _syncAliens(self):
+        """
+        Copies the formation of the simulation into the batches of _aliens.
+
+        A march step only moves the batches, so its cost does not depend on
+        the number of aliens.  The sprite positions are only rewritten when
+        aliens have been destroyed since the last frame.
+        """
+        formation = self._sim.getFormation()
+        if formation.count() != self._alienCount:
+            alive = formation.getAlive()
+            kind = formation.getKind()
+            xs = formation.getX()
+            ys = formation.getY()
+            for k in range(len(self._aliens)):
+                mask = alive & (kind == k)
+                self._aliens[k].positions = np.stack((xs[mask],ys[mask]),axis=1)
+            self._alienCount = formation.count()
+
+        dx, dy = formation.getOffset()
+        for batch in self._aliens:
+            if batch.x != dx:
+                batch.x = dx
+            if batch.y != dy:
+                batch.y = dy
+
+    def _syncBolts(self):
+        """
+        Copies the bolt positions from the simulation into _bolts.
+
+        The pool is resized so that one Bolt is active for each bolt in play.
+        Bolt objects are reused from frame to frame, and new ones are only
+        created when there are more bolts in play than ever before.
+        """
+        records = self._sim.getBolts()
+        self._bolts.resize(len(records))
+        for i in range(len(records)):
+            bolt = self._bolts[i]
+            if bolt.x != records[i].x:
+                bolt.x = records[i].x
+            if bolt.y != records[i].y:
+                bolt.y = records[i].y
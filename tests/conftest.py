@@ -0,0 +1,48 @@
+"""
+Shared setup for the tests of Alien Invaders.
+
+The game modules use flat imports (they are run from the invaders folder), so this
+puts that folder on the path.  It also keeps Kivy from parsing the pytest arguments
+and from logging to the console, for the tests of game2d.
+"""
+import os
+import sys
+
+os.environ.setdefault('KIVY_NO_ARGS','1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG','1')
+os.environ.setdefault('KIVY_LOG_MODE','PYTHON')
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','invaders'))
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def view():
+    """
+    Returns a GView, which sets up the Kivy graphics for the game2d tests.
+
+    The tests that use this fixture are skipped if Kivy is not installed.
+    """
+    pytest.importorskip('kivy')
+    from game2d import GView
+    return GView()
+
+
+@pytest.fixture(scope='session')
+def assets(view):
+    """
+    Points GameApp at the Images and Fonts folders of the game.
+
+    The texture atlas is turned off, so that the tests load every image on its own
+    and never write an atlas.
+    """
+    import kivy.resources
+    from game2d.app import GameApp
+    folder = os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','invaders')
+    GameApp.images = os.path.join(folder,'Images')
+    GameApp.fonts  = os.path.join(folder,'Fonts')
+    GameApp.ATLAS_CACHE = {}
+    kivy.resources.resource_add_path(GameApp.images)
+    kivy.resources.resource_add_path(GameApp.fonts)
+    return GameApp
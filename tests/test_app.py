@@ -0,0 +1,183 @@
+"""
+Tests for the frame timing and texture loading of GameApp.
+"""
+import os
+from collections import OrderedDict
+
+import pytest
+
+
+@pytest.fixture
+def images(view, tmp_path, monkeypatch):
+    """
+    Returns an Images folder with three small images, used by a fresh GameApp cache.
+    """
+    Image = pytest.importorskip('PIL.Image')
+    from game2d.app import GameApp
+    folder = tmp_path/'Images'
+    folder.mkdir()
+    Image.new('RGBA',(8,4),(255,0,0,255)).save(str(folder/'red.png'))
+    Image.new('RGBA',(6,6),(0,255,0,255)).save(str(folder/'green.png'))
+    Image.new('RGBA',(4,8),(0,0,255,255)).save(str(folder/'blue.png'))
+    monkeypatch.setattr(GameApp,'images',str(folder),raising=False)
+    monkeypatch.setattr(GameApp,'ATLAS_FOLDER',str(tmp_path/'cache'))
+    monkeypatch.setattr(GameApp,'ATLAS_CACHE',None)
+    monkeypatch.setattr(GameApp,'TEXTURE_CACHE',{})
+    return folder
+
+
+class _Frames(object):
+    """
+    A stand-in for a GameApp, recording the calls that GameApp._refresh makes.
+    """
+
+    def __init__(self, timestep, maxsteps=5, turbo=1):
+        self._timestep = timestep
+        self._maxsteps = maxsteps
+        self._turbo = turbo
+        self._accumulator = 0.0
+        self.view = self
+        self.steps = []
+        self.draws = 0
+
+    def update(self, dt):
+        self.steps.append(dt)
+
+    def draw(self):
+        self.draws += 1
+
+    def clear(self):
+        pass
+
+    def _flush(self):
+        pass
+
+    def refresh(self, dt):
+        from game2d.app import GameApp
+        GameApp._refresh(self,dt)
+
+
+def test_variable_step_updates_once(view):
+    frames = _Frames(None)
+    frames.refresh(0.1)
+    frames.refresh(0.02)
+    assert frames.steps == [0.1,0.02]
+    assert frames.draws == 2
+
+
+def test_fixed_step_accumulates(view):
+    frames = _Frames(0.25)
+    frames.refresh(0.125)
+    assert frames.steps == []
+    frames.refresh(0.5)
+    assert frames.steps == [0.25,0.25]
+    assert frames._accumulator == 0.125
+    frames.refresh(0.125)
+    assert frames.steps == [0.25]*3
+    assert frames.draws == 3
+
+
+def test_fixed_step_drops_backlog(view):
+    frames = _Frames(0.25,maxsteps=2)
+    frames.refresh(10.125)
+    assert frames.steps == [0.25,0.25]
+    assert frames._accumulator == 0.125
+    assert frames.draws == 1
+
+
+def test_turbo_runs_more_steps(view):
+    frames = _Frames(0.25,maxsteps=2,turbo=4)
+    frames.refresh(0.5)
+    assert len(frames.steps) == 8
+    assert frames._accumulator == 0
+    frames.refresh(10)
+    assert len(frames.steps) == 16
+
+
+def test_atlas_packs_every_image(images):
+    from game2d.app import GameApp
+    atlas = GameApp.load_atlas()
+    assert sorted(atlas) == ['blue.png','green.png','red.png']
+    assert tuple(atlas['red.png'].size) == (8,4)
+    assert tuple(atlas['blue.png'].size) == (4,8)
+    assert GameApp.load_texture('green.png') is atlas['green.png']
+
+
+def test_atlas_is_not_written_to_images(images):
+    from game2d.app import GameApp
+    GameApp.load_atlas()
+    assert sorted(os.listdir(str(images))) == ['blue.png','green.png','red.png']
+    assert os.path.isfile(os.path.join(GameApp._atlas_folder(),'images.atlas'))
+
+
+def test_atlas_is_rebuilt_when_stale(images, monkeypatch):
+    from game2d.app import GameApp
+    from PIL import Image
+    GameApp.load_atlas()
+    Image.new('RGBA',(2,2)).save(str(images/'white.png'))
+    monkeypatch.setattr(GameApp,'ATLAS_CACHE',None)
+    assert 'white.png' in GameApp.load_atlas()
+
+    # A missing page is also stale
+    for name in os.listdir(GameApp._atlas_folder()):
+        if name.endswith('.png'):
+            os.remove(os.path.join(GameApp._atlas_folder(),name))
+    monkeypatch.setattr(GameApp,'ATLAS_CACHE',None)
+    assert len(GameApp.load_atlas()) == 4
+
+
+def test_atlas_skips_bad_images(images):
+    from game2d.app import GameApp
+    with open(str(images/'broken.png'),'w') as file:
+        file.write('not an image')
+    assert sorted(GameApp.load_atlas()) == ['blue.png','green.png','red.png']
+    assert GameApp.load_texture('broken.png') is None
+    assert GameApp.load_texture('red.png') is GameApp.load_atlas()['red.png']
+
+
+def test_atlas_is_rebuilt_when_an_image_is_replaced(images, monkeypatch):
+    from game2d.app import GameApp
+    from PIL import Image
+    GameApp.load_atlas()
+    path = str(images/'red.png')
+    stamp = os.stat(path).st_mtime_ns
+
+    # Same modification time, different size
+    Image.new('RGBA',(16,4),(255,0,0,255)).save(path)
+    os.utime(path,ns=(stamp,stamp))
+    monkeypatch.setattr(GameApp,'ATLAS_CACHE',None)
+    assert tuple(GameApp.load_atlas()['red.png'].size) == (16,4)
+
+    # An older copy, with a time before the atlas was built
+    Image.new('RGBA',(8,4),(255,0,0,255)).save(path)
+    os.utime(path,ns=(stamp-10**9,stamp-10**9))
+    monkeypatch.setattr(GameApp,'ATLAS_CACHE',None)
+    assert tuple(GameApp.load_atlas()['red.png'].size) == (8,4)
+
+
+def test_game_images_load_from_the_atlas(assets, tmp_path, monkeypatch):
+    pytest.importorskip('PIL.Image')
+    from game2d import GSprite
+    from game2d.app import GameApp
+    monkeypatch.setattr(GameApp,'ATLAS_FOLDER',str(tmp_path/'cache'))
+    monkeypatch.setattr(GameApp,'ATLAS_CACHE',None)
+    monkeypatch.setattr(GameApp,'TEXTURE_CACHE',{})
+    monkeypatch.setattr(GSprite,'FRAME_CACHE',OrderedDict())
+    atlas = GameApp.load_atlas()
+    assert sorted(atlas) == sorted(name for name in os.listdir(GameApp.images)
+                                   if name.endswith('.png'))
+
+    # The frames of a sprite are cut from its region, left-to-right and top-to-bottom
+    region = atlas['ship-strip.png']
+    sprite = GSprite(source='ship-strip.png',format=(2,4),width=44,height=44)
+    assert GameApp.load_texture('ship-strip.png') is region
+    (left, top) = region.tex_coords[6:8]
+    (right, bottom) = region.tex_coords[2:4]
+    for frame in range(8):
+        (row,col) = divmod(frame,4)
+        image = sprite._images[frame]
+        assert tuple(image.size) == (region.width/4,region.height/2)
+        assert image.tex_coords[6] == pytest.approx(left+col*(right-left)/4)
+        assert image.tex_coords[7] == pytest.approx(top+row*(bottom-top)/2)
+        assert image.tex_coords[2] == pytest.approx(left+(col+1)*(right-left)/4)
+        assert image.tex_coords[3] == pytest.approx(top+(row+1)*(bottom-top)/2)
@@ -0,0 +1,137 @@
+"""
+Tests for WaveBatch, the NumPy stepper for many waves at once.
+
+Alien fire uses a different random generator in WaveBatch, so the parity tests either
+turn alien fire off in both classes, or give both the same fixed choices.  Everything
+else must match WaveSim exactly.
+"""
+import random
+
+import numpy as np
+
+from batch import WaveBatch
+from consts import *
+from simulation import SimInput, WaveSim
+
+
+class FixedFire(object):
+    """
+    A stand-in for the alien fire generators of both WaveBatch and WaveSim.
+
+    Every wave waits STEPS steps between shots, and fires from the leftmost
+    nonempty column, so the two classes fire the same bolts.
+    """
+    STEPS = 3
+
+    def integers(self, low, high, size):
+        """Returns the steps until the next shot for size waves (WaveBatch)"""
+        return np.full(size,self.STEPS)
+
+    def random(self, shape):
+        """Returns column weights that pick the leftmost nonempty column (WaveBatch)"""
+        return np.broadcast_to(np.arange(shape[1],0,-1,dtype=float),shape)
+
+    def randint(self, a, b):
+        """Returns the steps until the next shot, or the leftmost column (WaveSim)"""
+        return a if a == 0 else self.STEPS
+
+
+def lockstep(batch, waves, odds=(0.3,0.3,0.3)):
+    """Steps batch and the WaveSims in waves with the same random input, checking
+    after every frame that they agree
+
+    Each key is pressed with the matching chance in odds (left, right, spacebar)."""
+    size = len(waves)
+    inputs = [SimInput() for i in range(size)]
+    rng = random.Random(5)
+
+    for frame in range(3000):
+        if batch.getDone().all():
+            break
+        keys = np.array([[rng.random() < odd for odd in odds] for _ in range(size)])
+        active = ~batch.getDone()
+        batch.step(keys[:,0],keys[:,1],keys[:,2],0.25)
+        for i in range(size):
+            if not active[i]:
+                continue
+            inputs[i].clear()
+            for (key,down) in zip(('left','right','spacebar'),keys[i]):
+                if down:
+                    inputs[i].press(key)
+            if waves[i].getShip() is None:
+                waves[i].setShip()
+                waves[i].setShipCol()
+            waves[i].update(inputs[i],0.25)
+
+        for i in range(size):
+            formation = waves[i].getFormation()
+            assert (batch.getAlive()[i] == formation.getAlive()).all()
+            (dx,dy) = formation.getOffset()
+            assert np.allclose(batch._alienX[i],formation.getX()+dx)
+            assert np.allclose(batch._alienY[i],formation.getY()+dy)
+            ship = waves[i].getShip()
+            assert batch._shipOn[i] == (ship is not None)
+            if ship is not None:
+                assert batch._shipX[i] == ship.x
+            assert batch.getLives()[i] == waves[i].getLives()
+            assert batch.getShipCol()[i] == waves[i].getShipCol()
+            assert batch.getShots()[i] == waves[i].getShots()
+            assert batch.getWaveEmpty()[i] == waves[i].getWaveEmpty()
+            assert batch.getContactLine()[i] == waves[i].getContactLine()
+    assert batch.getDone().all()
+
+
+def test_batch_matches_wavesim_without_alien_fire():
+    size = 4
+    batch = WaveBatch(size,seed=0)
+    batch._randStep[:] = -1
+    waves = [WaveSim(i) for i in range(size)]
+    for wave in waves:
+        wave._randStep = -1
+    lockstep(batch,waves)
+    assert batch.getShots().sum() > 0
+
+
+def test_batch_matches_wavesim_with_alien_fire():
+    size = 4
+    batch = WaveBatch(size,capacity=64)
+    batch._rng = FixedFire()
+    batch._randStep[:] = FixedFire.STEPS
+    waves = [WaveSim() for i in range(size)]
+    for wave in waves:
+        wave._rng = FixedFire()
+        wave._randStep = FixedFire.STEPS
+    # Keep the ships near the left edge, under the column that fires
+    lockstep(batch,waves,(0.5,0.1,0.3))
+    assert (batch.getLives() < SHIP_LIVES).any()
+    assert batch.getShots().sum() > 0
+
+
+def test_shots_only_count_bolts_that_fit():
+    batch = WaveBatch(2,capacity=2,seed=0)
+    batch._randStep[:] = -1
+    batch._boltOn[0] = True
+    batch._boltV[0] = -BOLT_SPEED
+    batch._boltY[0] = GAME_HEIGHT/2
+    batch.step(False,False,True,1/60)
+    assert batch.getShots().tolist() == [0,1]
+
+
+def test_batch_is_reproducible_from_its_seed():
+    def run(seed):
+        batch = WaveBatch(8,seed=seed)
+        rng = np.random.default_rng(1)
+        for _ in range(500):
+            batch.step(rng.random(8) < 0.3,rng.random(8) < 0.3,rng.random(8) < 0.3,0.25)
+        return (batch.getLives().tolist(),batch.getFrames().tolist(),batch.getAlive().sum())
+
+    assert run(3) == run(3)
+    assert run(3) != run(4)
+
+
+def test_alien_bolts_cost_lives():
+    batch = WaveBatch(16,seed=2)
+    while not batch.getDone().all():
+        batch.step(False,False,False,0.25)
+    assert (batch.getLives() < SHIP_LIVES).any()
+    assert (batch.getShots() == 0).all()
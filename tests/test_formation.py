@@ -0,0 +1,179 @@
+"""
+Tests for the Formation of aliens in a wave.
+"""
+import random
+
+from consts import *
+from formation import Formation, sweepBox
+
+
+def killAll(formation, seed):
+    """Yields after each alien in formation is destroyed, in a seeded random order"""
+    cells = [(row,col) for row in range(formation.getRows()) for col in range(formation.getCols())]
+    random.Random(seed).shuffle(cells)
+    for (row,col) in cells:
+        formation.kill(row,col)
+        yield (row,col)
+
+
+def overlaps(formation, x, y, width, height):
+    """Returns the living aliens that a box overlaps, by testing every alien"""
+    found = []
+    for row in range(formation.getRows()):
+        for col in range(formation.getCols()):
+            (ax,ay) = formation.position(row,col)
+            if (formation.isAlive(row,col) and abs(ax-x) < (ALIEN_WIDTH+width)/2 and
+                abs(ay-y) < (ALIEN_HEIGHT+height)/2):
+                found.append((row,col))
+    return found
+
+
+def test_layout_matches_original_wave():
+    formation = Formation(7,4)
+    assert (formation.getRows(),formation.getCols()) == (7,4)
+    assert formation.count() == 28
+    for row in range(7):
+        for col in range(4):
+            assert formation.isAlive(row,col)
+            assert formation.position(row,col) == (ALIEN_H_SEP*(col+1),
+                                                   GAME_HEIGHT-ALIEN_CEILING-ALIEN_V_SEP*row)
+    sources = [formation.getSource(row,0) for row in range(7)]
+    assert sources == ['alien3.png','alien2.png','alien2.png','alien1.png','alien1.png',
+                       'alien3.png','alien3.png']
+
+
+def test_kill_destroys_one_alien():
+    formation = Formation(3,3)
+    formation.kill(1,2)
+    formation.kill(1,2)
+    assert formation.count() == 8
+    assert not formation.isAlive(1,2)
+    assert formation.getAlive().sum() == 8
+
+
+def test_index_matches_alive_flags():
+    for seed in range(5):
+        formation = Formation(6,9)
+        for _ in killAll(formation,seed):
+            alive = formation.getAlive()
+            assert formation.count() == alive.sum()
+            assert formation.columns() == [col for col in range(9) if alive[:,col].any()]
+            for col in range(9):
+                rows = [row for row in range(6) if alive[row,col]]
+                assert formation.columnCount(col) == len(rows)
+                assert formation.shooter(col) == (rows[-1] if rows else None)
+        assert formation.count() == 0
+        assert formation.columns() == []
+
+
+def test_bounds_match_alive_flags():
+    for seed in range(5):
+        formation = Formation(6,9)
+        formation.march(-7,-12)
+        for _ in killAll(formation,seed):
+            alive = formation.getAlive()
+            if not alive.any():
+                assert formation.extremes() == (None,None)
+                assert formation.bottom() is None
+                continue
+            xs = [formation.position(row,col)[0] for row in range(6) for col in range(9) if alive[row,col]]
+            ys = [formation.position(row,col)[1] for row in range(6) for col in range(9) if alive[row,col]]
+            assert formation.extremes() == (min(xs),max(xs))
+            assert formation.bottom() == min(ys)
+
+
+def test_march_moves_the_offset():
+    formation = Formation(3,4)
+    local = (formation.getX().copy(),formation.getY().copy())
+    formation.march(8,0)
+    formation.march(-3,-16)
+    assert formation.getOffset() == (5,-16)
+    assert (formation.getX() == local[0]).all() and (formation.getY() == local[1]).all()
+    for row in range(3):
+        for col in range(4):
+            (x,y) = formation.position(row,col)
+            assert (x,y) == (local[0][row,col]+5,local[1][row,col]-16)
+            assert formation.hit(x,y,0,0) == (row,col)
+
+
+def test_hit_matches_brute_force():
+    rng = random.Random(0)
+    for seed in range(3):
+        formation = Formation(5,8)
+        formation.march(rng.uniform(-40,40),rng.uniform(-200,0))
+        for (count,_) in enumerate(killAll(formation,seed)):
+            if count % 4:
+                continue
+            for _ in range(50):
+                x = rng.uniform(0,GAME_WIDTH)
+                y = rng.uniform(200,GAME_HEIGHT)
+                width = rng.choice([0,BOLT_WIDTH,60])
+                height = rng.choice([0,BOLT_HEIGHT,80])
+                found = overlaps(formation,x,y,width,height)
+                expected = min(found,key=lambda cell: (-cell[0],cell[1])) if found else None
+                assert formation.hit(x,y,width,height) == expected
+
+
+def test_sweep_box_finds_the_first_touch():
+    assert sweepBox(0,-10,0,10,0,0,2,2) == 0.4
+    assert sweepBox(0,1,0,10,0,0,2,2) == 0
+    assert sweepBox(-10,-10,10,10,0,0,2,2) == 0.4
+    assert sweepBox(0,3,0,10,0,0,2,2) is None
+    assert sweepBox(2,-10,2,10,0,0,2,2) is None
+    assert sweepBox(0,-10,0,-3,0,0,2,2) is None
+
+    rng = random.Random(0)
+    for _ in range(500):
+        (x0,y0,x1,y1) = [rng.uniform(-10,10) for _ in range(4)]
+        (halfW,halfH) = (rng.uniform(0,4),rng.uniform(0,4))
+        inside = [t/200 for t in range(201)
+                  if abs(x0+(x1-x0)*t/200) < halfW and abs(y0+(y1-y0)*t/200) < halfH]
+        t = sweepBox(x0,y0,x1,y1,0,0,halfW,halfH)
+        if inside:
+            assert t is not None and inside[0]-1/200 <= t <= inside[0]
+
+
+def test_sweep_matches_brute_force():
+    rng = random.Random(1)
+    for seed in range(3):
+        formation = Formation(5,8)
+        formation.march(rng.uniform(-40,40),rng.uniform(-200,0))
+        for (count,_) in enumerate(killAll(formation,seed)):
+            if count % 4:
+                continue
+            for _ in range(50):
+                x0 = rng.uniform(0,GAME_WIDTH)
+                y0 = rng.uniform(200,GAME_HEIGHT)
+                x1 = x0+rng.choice([0,0,rng.uniform(-40,40)])
+                y1 = y0+rng.uniform(-150,150)
+                found = []
+                for row in range(5):
+                    for col in range(8):
+                        if formation.isAlive(row,col):
+                            (ax,ay) = formation.position(row,col)
+                            t = sweepBox(x0,y0,x1,y1,ax,ay,(ALIEN_WIDTH+BOLT_WIDTH)/2,
+                                         (ALIEN_HEIGHT+BOLT_HEIGHT)/2)
+                            if t is not None:
+                                found.append((t,-row,col))
+                expected = (-min(found)[1],min(found)[2]) if found else None
+                assert formation.sweep(x0,y0,x1,y1,BOLT_WIDTH,BOLT_HEIGHT) == expected
+
+
+def test_sweep_catches_a_bolt_that_jumps_an_alien():
+    formation = Formation(1,1)
+    (x,y) = formation.position(0,0)
+    (below,above) = (y-ALIEN_HEIGHT,y+ALIEN_HEIGHT)
+    assert formation.hit(x,below,BOLT_WIDTH,0) is None
+    assert formation.hit(x,above,BOLT_WIDTH,0) is None
+    assert formation.sweep(x,below,x,above,BOLT_WIDTH,0) == (0,0)
+    assert formation.sweep(x,above,x,below,BOLT_WIDTH,0) == (0,0)
+
+
+def test_sweep_breaks_ties_to_the_left():
+    formation = Formation(2,3)
+    (x,y) = formation.position(1,1)
+    start = y-ALIEN_HEIGHT*2
+    assert formation.sweep(x+ALIEN_H_SEP/2,start,x+ALIEN_H_SEP/2,y,ALIEN_WIDTH,0) == (1,1)
+    formation.kill(1,1)
+    assert formation.sweep(x+ALIEN_H_SEP/2,start,x+ALIEN_H_SEP/2,y,ALIEN_WIDTH,0) == (1,2)
+    assert formation.sweep(x,start,x,y+ALIEN_V_SEP,0,0) == (0,1)
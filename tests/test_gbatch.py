@@ -0,0 +1,69 @@
+"""
+Tests for GSpriteBatch.
+
+These check the vertices written for the mesh, the size and the selection of the
+sprites.  What the mesh looks like on screen depends on the renderer, and is not
+tested here.
+"""
+import numpy as np
+import pytest
+
+
+def make(**keywords):
+    """Returns a batch of alien1.png sprites with the given attributes"""
+    from game2d import GSpriteBatch
+    return GSpriteBatch(source='alien1.png',sprite_width=10,sprite_height=20,**keywords)
+
+
+def test_vertices_follow_positions(assets):
+    batch = make(positions=[(0,0),(30,-5)])
+    corners = batch._buffer[:2,:,:2]
+    assert corners[0].tolist() == [[-5,-10],[5,-10],[5,10],[-5,10]]
+    assert corners[1].tolist() == [[25,-15],[35,-15],[35,5],[25,5]]
+    uvs = np.array(batch._texture.tex_coords,dtype=np.float32).reshape(4,2)
+    assert (batch._buffer[:2,:,2:] == uvs).all()
+
+
+def test_size_is_centered_on_the_batch(assets):
+    batch = make(positions=[(0,0),(30,-5)])
+    assert batch.count == 2
+    assert (batch.width,batch.height) == (70.0,30.0)
+    batch.positions = []
+    assert batch.count == 0
+    assert (batch.width,batch.height) == (0.0,0.0)
+
+
+def test_buffer_grows_and_keeps_uvs(assets):
+    batch = make()
+    points = np.arange(80,dtype=float).reshape(40,2)
+    batch.positions = points
+    assert len(batch._buffer) >= 40
+    assert len(batch._mesh.vertices) == 40*16
+    assert len(batch._mesh.indices) == 40*6
+    assert batch._indices[39].tolist() == [156,157,158,158,159,156]
+    batch.positions = points[:3]
+    assert len(batch._mesh.vertices) == 3*16
+    assert (batch.positions == points[:3]).all()
+
+
+def test_select_returns_the_top_sprite(assets):
+    batch = make(x=100,y=50,positions=[(0,0),(4,0),(40,0)])
+    assert batch.select((102,50)) == 1
+    assert batch.select((98,50)) == 0
+    assert batch.select((140,59)) == 2
+    assert batch.select((140,61)) is None
+    assert batch.contains((100,55))
+    assert not batch.contains((120,50))
+
+
+def test_select_in_a_rotated_batch(assets):
+    batch = make(x=100,y=50,angle=90,positions=[(40,0)])
+    assert batch.select((100,90)) == 0
+    assert batch.select((140,50)) is None
+    (left,bottom,right,top) = batch._bounds()
+    assert (left,bottom,right,top) == pytest.approx((90,85,110,95))
+
+
+def test_positions_must_be_points(assets):
+    with pytest.raises(AssertionError):
+        make(positions=[1,2,3])
@@ -0,0 +1,146 @@
+"""
+Tests for the bounding volume tree, and the scene queries that use it.
+"""
+import random
+
+import pytest
+
+from game2d.gbounds import GBoundsTree
+
+
+def randomBox(rng, size=100):
+    """Returns a random (left, bottom, right, top) box"""
+    x = rng.uniform(-size,size)
+    y = rng.uniform(-size,size)
+    return (x,y,x+rng.uniform(0,size/5),y+rng.uniform(0,size/5))
+
+
+def overlapping(items, boxes, left, bottom, right, top):
+    """Returns the items whose boxes overlap a rectangle, by testing every box"""
+    return [item for (item,box) in zip(items,boxes)
+            if box[0] <= right and box[2] >= left and box[1] <= top and box[3] >= bottom]
+
+
+def test_empty_tree():
+    tree = GBoundsTree()
+    assert len(tree) == 0
+    assert tree.bounds is None
+    assert tree.query_point(0,0) == []
+
+
+def test_queries_match_brute_force():
+    rng = random.Random(0)
+    for size in (1,2,7,200):
+        items = ['item%d' % pos for pos in range(size)]
+        boxes = [randomBox(rng) for _ in items]
+        tree = GBoundsTree(items,boxes)
+        assert len(tree) == size and items[-1] in tree and not 'other' in tree
+        for step in range(100):
+            if step % 3 == 0:
+                pos = rng.randrange(size)
+                boxes[pos] = randomBox(rng)
+                tree.refit(items[pos],boxes[pos])
+            assert tree.bounds == (min(box[0] for box in boxes),min(box[1] for box in boxes),
+                                   max(box[2] for box in boxes),max(box[3] for box in boxes))
+            query = randomBox(rng,200)
+            assert tree.query_rect(*query) == overlapping(items,boxes,*query)
+            (x,y) = (rng.uniform(-100,100),rng.uniform(-100,100))
+            assert tree.query_point(x,y) == overlapping(items,boxes,x,y,x,y)
+
+
+def test_refit_reports_bounds_changes():
+    tree = GBoundsTree(['a','b','c'],[(0,0,1,1),(5,5,6,6),(2,2,3,3)])
+    assert not tree.refit('c',(2,2,3,3))
+    assert not tree.refit('c',(3,3,4,4))
+    assert tree.refit('c',(3,3,7,4))
+    assert tree.bounds == (0,0,7,6)
+
+
+@pytest.fixture
+def scene(view):
+    """Returns a scene of rectangles and triangles, with a nested scene"""
+    from game2d import GRectangle, GTriangle, GScene
+    rng = random.Random(1)
+    children = []
+    for pos in range(60):
+        (x,y) = (rng.uniform(-200,200),rng.uniform(-200,200))
+        if pos % 3:
+            children.append(GRectangle(x=x,y=y,width=rng.uniform(2,30),height=rng.uniform(2,30),
+                                       angle=rng.choice([0,0,30]),fillcolor='red'))
+        else:
+            children.append(GTriangle(points=(0,0,20,0,0,20),x=x,y=y,fillcolor='red'))
+    inner = GScene(children=[GRectangle(x=0,y=0,width=40,height=10,fillcolor='blue'),
+                             GRectangle(x=0,y=0,width=10,height=40,fillcolor='blue')],x=300,y=-300)
+    children.insert(30,inner)
+    return GScene(children=children,x=10,y=20)
+
+
+def selected(scene, x, y):
+    """Returns the object selected by (x,y), by testing every child in order"""
+    (x,y) = (x-scene.x,y-scene.y)
+    for child in scene.children:
+        if hasattr(child,'children'):
+            result = selected(child,x,y)
+            if not result is None:
+                return result
+        elif child.contains((x,y)):
+            return child
+    return None
+
+
+def test_select_matches_brute_force(scene):
+    rng = random.Random(2)
+    points = [(rng.uniform(-220,220),rng.uniform(-220,220)) for _ in range(500)]
+    for (x,y) in points:
+        assert scene.select((x,y)) is selected(scene,x,y)
+
+    # The nested scene is away from the others, at (310,-280) on the screen
+    inner = scene.children[30].children
+    assert scene.select((310,-280)) is inner[0]
+    assert scene.select((325,-280)) is inner[0]
+    assert scene.select((310,-265)) is inner[1]
+    assert scene.select((325,-260)) is None
+
+    # Moving a child refits the tree
+    child = scene.children[5]
+    child.x = 400
+    child.y = 400
+    assert scene.select((410,420)) is child
+
+
+def test_query_rect_matches_brute_force(scene):
+    rng = random.Random(3)
+    objects = []
+    boxes = []
+    for child in scene.children:
+        for inner in getattr(child,'children',[child]):
+            (left,bottom,right,top) = inner._bounds()
+            if inner is not child:
+                (left,bottom,right,top) = (left+child.x,bottom+child.y,right+child.x,top+child.y)
+            objects.append(inner)
+            boxes.append((left+scene.x,bottom+scene.y,right+scene.x,top+scene.y))
+    for _ in range(200):
+        query = randomBox(rng,250)
+        assert scene.query_rect(*query) == overlapping(objects,boxes,*query)
+
+
+def test_scene_size_follows_children(view):
+    from game2d import GRectangle, GScene
+    box = GRectangle(x=10,y=0,width=4,height=6)
+    other = GRectangle(x=-3,y=-1,width=2,height=2)
+    inner = GScene(children=[box])
+    scene = GScene(children=[inner,other])
+    assert scene.children is scene.children
+    assert (scene.width,scene.height) == (24,6)
+
+    box.x = -20
+    assert (inner.width,inner.height) == (44,6)
+    assert (scene.width,scene.height) == (44,6)
+    box.angle = 90
+    assert (scene.width,scene.height) == (46,4)
+    other.y = 10
+    assert (scene.width,scene.height) == (46,22)
+    box.scale = 2
+    assert (scene.width,scene.height) == (52,22)
+    scene.children = [other]
+    assert (scene.width,scene.height) == (8,22)
@@ -0,0 +1,71 @@
+"""
+Tests for the text texture cache of GLabel.
+"""
+from collections import OrderedDict
+
+import pytest
+
+
+@pytest.fixture
+def cache(assets, monkeypatch):
+    """Gives GLabel an empty text cache for the test"""
+    from game2d import GLabel
+    monkeypatch.setattr(GLabel,'TEXT_CACHE',OrderedDict())
+    return GLabel.TEXT_CACHE
+
+
+def make(**keywords):
+    """Returns a label whose text has been rendered"""
+    from game2d import GLabel
+    label = GLabel(**keywords)
+    label._label.texture_update()
+    return label
+
+
+def test_same_text_shares_a_texture(cache):
+    a = make(text='Game Over',font_size=30,font_name='Arcade.ttf')
+    b = make(text='Game Over',font_size=30,font_name='Arcade.ttf')
+    assert a._label.texture is b._label.texture
+    assert len(cache) == 1
+    assert (b.width,b.height) == (a.width,a.height)
+
+
+def test_cached_texture_matches_a_rendered_one(cache):
+    a = make(text='Game Over',font_size=30)
+    b = make(text='Game Over',font_size=30,italic=False)
+    assert not b._label.cached
+    assert b._label.texture is not a._label.texture
+    assert a._label.texture.pixels == b._label.texture.pixels
+
+
+def test_font_properties_are_part_of_the_key(cache):
+    base = make(text='Score',font_size=30)
+    others = [make(text='Score!',font_size=30),make(text='Score',font_size=31),
+              make(text='Score',font_size=30,bold=True),
+              make(text='Score',font_size=30,linecolor='red')]
+    textures = set(id(label._label.texture) for label in [base]+others)
+    assert len(textures) == 5
+
+
+def test_changing_text_keeps_the_cached_texture(cache):
+    a = make(text='Lives: 3',font_size=30)
+    texture = a._label.texture
+    pixels = texture.pixels
+    a.text = 'Lives: 2'
+    assert a._label.texture is not texture
+    assert texture.pixels == pixels
+    a.text = 'Lives: 3'
+    assert a._label.texture is texture
+
+
+def test_cache_evicts_the_least_recently_used(cache, monkeypatch):
+    from game2d import GLabel
+    monkeypatch.setattr(GLabel,'TEXT_CACHE_SIZE',3)
+    first = make(text='0')
+    for text in '123':
+        make(text=text)
+    assert [key[0] for key in cache] == ['1','2','3']
+    make(text='2')
+    make(text='4')
+    assert [key[0] for key in cache] == ['3','2','4']
+    assert make(text='0')._label.texture is not first._label.texture
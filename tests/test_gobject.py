@@ -0,0 +1,194 @@
+"""
+Tests for the geometry methods of GObject and the game2d shapes.
+"""
+import math
+
+import pytest
+
+
+def grid(left, right, bottom, top, step):
+    """Returns the list of grid points in the given box, step apart"""
+    return [(left+step*i,bottom+step*j) for i in range(int((right-left)/step)+1)
+                                        for j in range(int((top-bottom)/step)+1)]
+
+
+def crossings(point, points):
+    """Returns True if point is inside of the outline points, by ray casting"""
+    (x,y) = point
+    inside = False
+    size = len(points)//2
+    for i in range(size):
+        (ax,ay) = points[2*i:2*i+2]
+        (bx,by) = points[2*(i+1) % (2*size):2*(i+1) % (2*size)+2]
+        if (ay > y) != (by > y) and x < ax+(y-ay)*(bx-ax)/(by-ay):
+            inside = not inside
+    return inside
+
+
+def shapes():
+    """Returns a list of game2d shapes, rotated and scaled several ways"""
+    from game2d import GRectangle, GEllipse, GTriangle, GPolygon
+    result = [GRectangle(x=3,y=-2,width=20,height=10),
+              GRectangle(x=3,y=-2,width=20,height=10,angle=30),
+              GRectangle(x=0,y=0,width=20,height=10,angle=90),
+              GEllipse(x=1,y=1,width=24,height=12,fillcolor='red'),
+              GEllipse(x=1,y=1,width=24,height=12,angle=-60,fillcolor='red'),
+              GTriangle(points=(-10,-8,12,-4,0,14),fillcolor='red'),
+              GTriangle(points=(-10,-8,12,-4,0,14),angle=45,fillcolor='red'),
+              GPolygon(points=(-12,-12,12,-12,12,12,0,-2,-12,12),fillcolor='red'),
+              GPolygon(points=(-12,-12,12,-12,12,12,0,-2,-12,12),x=2,angle=135,fillcolor='red')]
+    # The initializer does not take a scale
+    result[2].scale = (1.5,0.5)
+    result[4].scale = 0.75
+    result[6].scale = 1.2
+    return result
+
+def test_overlaps_unrotated_boxes(view):
+    from game2d import GRectangle
+    a = GRectangle(x=0,y=0,width=10,height=20)
+    assert a.overlaps(GRectangle(x=9,y=0,width=10,height=4))
+    assert not a.overlaps(GRectangle(x=10,y=0,width=10,height=4))
+    assert not a.overlaps(GRectangle(x=0,y=13,width=2,height=6))
+    assert a.overlaps(GRectangle(x=0,y=12,width=2,height=6))
+
+
+def test_overlaps_applies_scale(view):
+    from game2d import GRectangle
+    a = GRectangle(x=0,y=0,width=10,height=10)
+    b = GRectangle(x=12,y=0,width=10,height=10)
+    assert not a.overlaps(b)
+    b.scale = 1.5
+    assert a.overlaps(b)
+
+
+def test_overlaps_rotated_boxes(view):
+    from game2d import GRectangle
+    a = GRectangle(x=0,y=0,width=10,height=10,angle=45)
+    # The bounding boxes overlap, but the corner of the diamond is away from b
+    b = GRectangle(x=9,y=9,width=6,height=6)
+    assert not a.overlaps(b)
+    assert not b.overlaps(a)
+    b.x = 5
+    b.y = 5
+    assert a.overlaps(b)
+    assert b.overlaps(a)
+
+
+def test_contains_many_matches_contains(view):
+    np = pytest.importorskip('numpy')
+    points = grid(-25,25,-25,25,0.75)
+    for shape in shapes():
+        mask = shape.contains_many(np.array(points))
+        assert mask.dtype == bool and mask.shape == (len(points),)
+        assert mask.tolist() == [shape.contains(point) for point in points]
+        assert 0 < mask.sum() < len(points)
+
+
+def test_contains_many_rotated_rectangle(view):
+    np = pytest.importorskip('numpy')
+    from game2d import GRectangle
+    box = GRectangle(x=5,y=5,width=20,height=4,angle=90)
+    mask = box.contains_many(np.array([(5,14),(5,-4),(14,5),(6.9,5),(7.1,5)]))
+    assert mask.tolist() == [True,True,False,True,False]
+
+
+def test_contains_unrotated(view):
+    from game2d import GRectangle
+    box = GRectangle(width=10,height=4)
+    assert box.contains((4.9,1.9)) and box.contains((-4.9,-1.9))
+    assert not box.contains((5,0)) and not box.contains((0,-2))
+    box.x = 10
+    box.scale = (2,-1)
+    assert box.contains((19,0)) and not box.contains((21,0))
+    assert box.contains((10,1.5)) and not box.contains((10,2.5))
+
+
+def test_contains_rotated(view):
+    from game2d import GRectangle
+    from game2d.gobject import Point2
+    box = GRectangle(x=2,y=3,width=10,height=4)
+    box.scale = 1.5
+    for angle in (30,-75,180):
+        box.angle = angle
+        cos = math.cos(math.radians(angle))
+        sin = math.sin(math.radians(angle))
+        for (x,y) in grid(-12,16,-11,17,0.9):
+            dx = x-2
+            dy = y-3
+            local = ((cos*dx+sin*dy)/1.5,(cos*dy-sin*dx)/1.5)
+            inside = abs(local[0]) < 5 and abs(local[1]) < 2
+            assert box.contains((x,y)) == inside
+            assert box.contains(Point2(x,y)) == inside
+    box.x = 40
+    assert box.contains((40,3)) and not box.contains((2,3))
+
+
+OUTLINES = [(-10,-8,12,-4,0,14),
+            (-12,-12,12,-12,12,12,0,-2,-12,12),
+            (0,0,20,0,20,20,15,20,15,5,5,5,5,20,0,20),
+            (10,0,3,3,0,10,-3,3,-10,0,-3,-3,0,-10,3,-3),
+            (-10,-10,10,-10,10,10,-10,10)[::-1]]
+
+
+def test_triangulate_covers_the_polygon(view):
+    from game2d.gpath import triangulate
+    for points in OUTLINES:
+        triangles = triangulate(points)
+        assert triangles.shape == (len(points)//2-2,6)
+        area = 0
+        for (x0,y0,x1,y1,x2,y2) in triangles.tolist():
+            area += abs((x1-x0)*(y2-y0)-(y1-y0)*(x2-x0))/2
+        outline = 0
+        for i in range(0,len(points),2):
+            (x0,y0,x1,y1) = (points+points[:2])[i:i+4]
+            outline += (x0*y1-x1*y0)/2
+        assert area == pytest.approx(abs(outline))
+
+
+def test_contains_matches_ray_casting(view):
+    from game2d import GTriangle, GPolygon
+    points = grid(-14.123,22.456,-14.321,22.654,0.73)
+    for outline in OUTLINES:
+        kind = GTriangle if len(outline) == 6 else GPolygon
+        shape = kind(points=outline,fillcolor='red')
+        expected = [crossings(point,outline) for point in points]
+        assert [shape.contains(point) for point in points] == expected
+        assert shape.contains_many(points).tolist() == expected
+        shape.x = 3
+        assert shape.contains((3,-1)) == crossings((0,-1),outline)
+
+
+def distance(point, points, closed):
+    """Returns the distance from point to the segments through points, one at a time"""
+    (x,y) = point
+    ends = list(points)+list(points[:2]) if closed else list(points)
+    best = math.inf
+    for i in range(0,len(ends)-2,2):
+        (ax,ay,bx,by) = ends[i:i+4]
+        length = (bx-ax)**2+(by-ay)**2
+        t = 0 if length == 0 else max(0,min(1,((x-ax)*(bx-ax)+(y-ay)*(by-ay))/length))
+        best = min(best,math.hypot(x-ax-t*(bx-ax),y-ay-t*(by-ay)))
+    return best
+
+
+def test_near_matches_brute_force(view):
+    np = pytest.importorskip('numpy')
+    from game2d import GPath, GTriangle
+    points = grid(-15.5,25.5,-15.5,25.5,1.1)
+    path = GPath(points=(-10,-10,0,12,0,12,15,-3,20,20),linecolor='red')
+    triangle = GTriangle(points=(-10,-8,12,-4,0,14),fillcolor='red')
+    for (shape,closed) in ((path,False),(triangle,True)):
+        outline = shape.points
+        expected = [distance(point,outline,closed) for point in points]
+        assert shape.distance_many(np.array(points)) == pytest.approx(expected)
+        for tolerance in (0,0.5,3):
+            near = [shape.near(point,tolerance) for point in points]
+            assert shape.near_many(points,tolerance).tolist() == near
+            for (point,dist,found) in zip(points,expected,near):
+                if closed and shape.contains(point):
+                    assert found
+                elif abs(dist-tolerance) > 1e-6:
+                    assert found == (dist < tolerance)
+    assert path.near((6,6))
+    assert not path.near((6,7),0.5)
+    assert path.near((6,7),1)
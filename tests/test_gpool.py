@@ -0,0 +1,78 @@
+"""
+Tests for the pool of reusable game2d objects.
+"""
+import pytest
+
+
+@pytest.fixture
+def pool(view):
+    """Returns an empty pool of rectangles, which counts the rectangles it makes"""
+    from game2d import GPool, GRectangle
+    made = []
+    def factory():
+        made.append(GRectangle(width=4,height=10,fillcolor='red'))
+        return made[-1]
+    result = GPool(factory)
+    result.made = made
+    return result
+
+
+def test_activate_reuses_free_objects(pool):
+    first = pool.activate(x=1,y=2)
+    second = pool.activate(x=3)
+    assert (len(pool),pool.free,len(pool.made)) == (2,0,2)
+    assert (first.x,first.y,second.x) == (1,2,3)
+    assert list(pool) == [first,second] and first in pool
+
+    pool.deactivate(first)
+    assert (len(pool),pool.free) == (1,1)
+    assert not first in pool and pool[0] is second
+    again = pool.activate(x=5)
+    assert again is first and again.x == 5 and again.y == 2
+    assert len(pool.made) == 2
+
+
+def test_deactivate_moves_the_last_object(pool):
+    objects = [pool.activate(x=pos) for pos in range(5)]
+    pool.deactivate(objects[1])
+    assert list(pool) == [objects[0],objects[4],objects[2],objects[3]]
+    pool.deactivate(objects[3])
+    pool.deactivate(objects[0])
+    assert list(pool) == [objects[2],objects[4]]
+    for obj in objects:
+        assert (obj in pool) == (obj in (objects[2],objects[4]))
+    with pytest.raises(AssertionError):
+        pool.deactivate(objects[0])
+
+
+def test_resize_allocates_only_to_the_peak(pool):
+    peak = 0
+    for size in (3,8,0,5,8,2,8):
+        pool.resize(size)
+        peak = max(peak,size)
+        assert len(pool) == size
+        assert len(pool)+pool.free == peak
+    assert len(pool.made) == 8
+    assert len(set(map(id,pool))) == 8
+    pool.clear()
+    assert (len(pool),pool.free) == (0,8)
+
+
+def test_capacity_makes_objects_up_front(view):
+    from game2d import GPool, GEllipse
+    pool = GPool(GEllipse,3)
+    assert (len(pool),pool.free) == (0,3)
+    pool.resize(3)
+    assert pool.free == 0
+    assert all(isinstance(obj,GEllipse) for obj in pool)
+
+
+def test_activate_only_sets_changed_attributes(pool):
+    obj = pool.activate(x=7,y=3)
+    pool.deactivate(obj)
+    obj.matrix
+    assert pool.activate(x=7,y=3) is obj
+    assert obj._mtrue
+    pool.deactivate(obj)
+    assert pool.activate(x=7,y=4) is obj
+    assert not obj._mtrue
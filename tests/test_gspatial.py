@@ -0,0 +1,94 @@
+"""
+Tests for the GSpatialHash broad-phase index.
+"""
+import random
+
+
+def brute(objects, left, bottom, right, top):
+    """Returns the set of objects whose boxes overlap the rectangle"""
+    return set(obj for obj in objects if obj.left <= right and obj.right >= left
+               and obj.bottom <= top and obj.top >= bottom)
+
+
+def scatter(rng, count):
+    """Returns count random rectangles"""
+    from game2d import GRectangle
+    return [GRectangle(x=rng.uniform(-200,800),y=rng.uniform(-200,800),
+                       width=rng.uniform(1,120),height=rng.uniform(1,120))
+            for _ in range(count)]
+
+
+def test_queries_match_brute_force(view):
+    from game2d import GSpatialHash
+    rng = random.Random(10)
+    objects = scatter(rng,300)
+    index = GSpatialHash(50)
+    for obj in objects:
+        index.insert(obj)
+    assert len(index) == 300
+    for _ in range(100):
+        x = rng.uniform(-250,850)
+        y = rng.uniform(-250,850)
+        w = rng.uniform(0,200)
+        h = rng.uniform(0,200)
+        found = index.query_rect(x,y,x+w,y+h)
+        assert len(found) == len(set(found))
+        assert set(found) == brute(objects,x,y,x+w,y+h)
+        assert set(index.query_point((x,y))) == brute(objects,x,y,x,y)
+
+
+def test_attribute_changes_update_the_cells(view):
+    from game2d import GSpatialHash
+    rng = random.Random(11)
+    objects = scatter(rng,200)
+    index = GSpatialHash(64)
+    for obj in objects:
+        index.insert(obj)
+    for _ in range(5):
+        for obj in objects:
+            change = rng.randint(0,4)
+            if change == 0:
+                obj.x += rng.uniform(-300,300)
+            elif change == 1:
+                obj.top = rng.uniform(-200,800)
+            elif change == 2:
+                obj.width = rng.uniform(1,200)
+            elif change == 3:
+                obj.angle = rng.uniform(0,360)
+            else:
+                obj.scale = rng.uniform(0.5,2)
+        for obj in objects:
+            expected = brute(objects,obj.left,obj.bottom,obj.right,obj.top)-set([obj])
+            assert set(index.query_object(obj)) == expected
+
+
+def test_scene_children_update_both_the_scene_and_the_hash(view):
+    from game2d import GRectangle, GScene, GSpatialHash
+    a = GRectangle(x=0,y=0,width=10,height=10)
+    b = GRectangle(x=100,y=0,width=10,height=10)
+    scene = GScene(children=[a,b])
+    index = GSpatialHash(32)
+    index.insert(a)
+    index.insert(scene)
+    b.x = 300
+    assert scene.width == 610
+    assert index.query_point((300,0)) == [scene]
+    a.x = 300
+    assert set(index.query_point((300,0))) == set([a,scene])
+
+
+def test_removed_objects_are_not_watched(view):
+    from game2d import GRectangle, GSpatialHash
+    a = GRectangle(x=0,y=0,width=10,height=10)
+    first = GSpatialHash(32)
+    second = GSpatialHash(32)
+    first.insert(a)
+    second.insert(a)
+    first.remove(a)
+    a.x = 100
+    assert first.query_point((100,0)) == []
+    assert second.query_point((100,0)) == [a]
+    second.clear()
+    assert a._indexes == ()
+    a.x = 200
+    assert len(second) == 0
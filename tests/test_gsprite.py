@@ -0,0 +1,74 @@
+"""
+Tests for the frame regions of GSprite.
+"""
+from collections import OrderedDict
+
+import pytest
+
+
+@pytest.fixture
+def strip(view, tmp_path, monkeypatch):
+    """
+    Returns the name of a filmstrip with 2 rows and 3 columns of 10x6 frames.
+
+    The filmstrip is in a new Images folder, with the texture atlas turned off.
+    """
+    Image = pytest.importorskip('PIL.Image')
+    import kivy.resources
+    from game2d import GSprite
+    from game2d.app import GameApp
+    folder = tmp_path/'Images'
+    folder.mkdir()
+    Image.new('RGBA',(30,12)).save(str(folder/'strip.png'))
+    monkeypatch.setattr(GameApp,'images',str(folder),raising=False)
+    monkeypatch.setattr(GameApp,'ATLAS_CACHE',{})
+    monkeypatch.setattr(GameApp,'TEXTURE_CACHE',{})
+    monkeypatch.setattr(GSprite,'FRAME_CACHE',OrderedDict())
+    monkeypatch.setattr(kivy.resources,'resource_paths',[str(folder)]+kivy.resources.resource_paths)
+    return 'strip.png'
+
+
+def test_frames_of_a_non_square_strip(strip):
+    from game2d import GSprite
+    from game2d.app import GameApp
+    sprite = GSprite(source=strip,format=(2,3),width=10,height=6)
+    assert sprite.count == 6
+    # Frames go left-to-right and top-to-bottom, but texture regions start at the bottom
+    texture = GameApp.load_texture(strip)
+    for frame in range(6):
+        (row,col) = divmod(frame,3)
+        region = texture.get_region(10*col,12-6*(row+1),10,6)
+        assert sprite._images[frame].size == (10,6)
+        assert sprite._images[frame].tex_coords == region.tex_coords
+    sprite.frame = 4
+    assert sprite._rect.texture is sprite._images[4]
+
+
+def test_frames_are_shared(strip):
+    from game2d import GSprite
+    from game2d.app import GameApp
+    first = GSprite(source=strip,format=(2,3),width=10,height=6)
+    second = GSprite(source=strip,format=(2,3),width=10,height=6)
+    other = GSprite(source=strip,format=(3,2),width=15,height=4)
+    assert second._images is first._images
+    assert not other._images is first._images
+    assert len(GSprite.FRAME_CACHE) == 2
+
+    # A texture loaded again gets new regions
+    from kivy.graphics.texture import Texture
+    GameApp.TEXTURE_CACHE[strip] = Texture.create(size=(30,12))
+    third = GSprite(source=strip,format=(2,3),width=10,height=6)
+    assert not third._images is first._images
+    assert third._images[0].width == 10
+
+
+def test_frame_cache_evicts_the_least_recently_used(strip, monkeypatch):
+    from game2d import GSprite
+    monkeypatch.setattr(GSprite,'FRAME_CACHE_SIZE',2)
+    first = GSprite(source=strip,format=(1,1),width=30,height=12)
+    GSprite(source=strip,format=(2,3),width=10,height=6)
+    assert GSprite(source=strip,format=(1,1),width=30,height=12)._images is first._images
+    GSprite(source=strip,format=(3,2),width=15,height=4)
+    assert [key[1] for key in GSprite.FRAME_CACHE] == [(1,1),(3,2)]
+    assert GSprite(source=strip,format=(2,3),width=10,height=6)._images[0].width == 10
+    assert [key[1] for key in GSprite.FRAME_CACHE] == [(3,2),(2,3)]
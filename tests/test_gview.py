@@ -0,0 +1,107 @@
+"""
+Tests for the display list of GView.
+
+These check the Kivy instruction groups the view keeps, not what is on the screen,
+which needs a window.
+"""
+import pytest
+
+
+@pytest.fixture
+def canvas(view):
+    """Returns a new GView, whose frame records the canvas changes it is given"""
+    from kivy.graphics import InstructionGroup
+    from game2d import GView
+
+    class Recorder(InstructionGroup):
+        def __init__(self):
+            InstructionGroup.__init__(self)
+            self.calls = []
+        def add(self, cmd):
+            self.calls.append('add')
+            InstructionGroup.add(self,cmd)
+        def remove(self, cmd):
+            self.calls.append('remove')
+            InstructionGroup.remove(self,cmd)
+        def clear(self):
+            self.calls.append('clear')
+            InstructionGroup.clear(self)
+
+    result = GView()
+    result._frame = Recorder()
+    result._reset()
+    return result
+
+
+def frame(view, *cmds):
+    """Draws one frame of the given commands, the way GameApp does"""
+    view.clear()
+    for cmd in cmds:
+        view.draw(cmd)
+    view._flush()
+
+
+def commands(count):
+    """Returns a list of new Kivy instruction groups"""
+    from kivy.graphics import InstructionGroup
+    return [InstructionGroup() for _ in range(count)]
+
+
+def test_same_frame_leaves_the_canvas_alone(canvas):
+    cmds = commands(3)
+    frame(canvas,*cmds)
+    assert canvas._frame.children == cmds
+    canvas._frame.calls = []
+    for _ in range(3):
+        frame(canvas,*cmds)
+    assert canvas._frame.calls == []
+    assert canvas._contents == cmds
+
+
+def test_changed_frame_trims_after_the_difference(canvas):
+    (a,b,c,d) = commands(4)
+    frame(canvas,a,b,c)
+    canvas._frame.calls = []
+    frame(canvas,a,d,c)
+    assert canvas._frame.children == [a,d,c]
+    assert canvas._frame.calls == ['remove','remove','add','add']
+    frame(canvas,a,d)
+    assert canvas._frame.children == [a,d]
+    frame(canvas)
+    assert canvas._frame.children == [] and canvas._contents == []
+
+
+def test_draw_twice_in_a_frame(canvas):
+    (a,b) = commands(2)
+    frame(canvas,a,b,a,b)
+    assert canvas._frame.children == [a,b]
+    frame(canvas,b,a)
+    assert canvas._frame.children == [b,a]
+
+
+def test_attached_objects_are_drawn_first(canvas):
+    from game2d import GRectangle
+    box = GRectangle(width=10,height=10,fillcolor='red')
+    other = GRectangle(width=5,height=5,fillcolor='blue')
+    (a,) = commands(1)
+    canvas.attach(box)
+    canvas.attach(box)
+    assert canvas.is_attached(box) and not canvas.is_attached(other)
+    frame(canvas,a)
+    assert canvas._frame.children == [box._cache,a]
+    canvas.attach(other)
+    frame(canvas,a)
+    assert canvas._frame.children == [box._cache,other._cache,a]
+
+    # An object whose cache is rebuilt is swapped in
+    old = box._cache
+    box._reset()
+    assert not box._cache is old
+    frame(canvas)
+    assert canvas._frame.children == [box._cache,other._cache]
+
+    canvas.detach(box)
+    canvas.detach(box)
+    frame(canvas)
+    assert canvas._frame.children == [other._cache]
+    assert not canvas.is_attached(box)
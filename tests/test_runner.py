@@ -0,0 +1,34 @@
+"""
+Tests for the process-pool rollout runner.
+"""
+from consts import *
+from runner import RandomPolicy, ScriptedPolicy, playGame, runGames
+
+
+def test_play_game_is_reproducible():
+    first = playGame(3,RandomPolicy(),maxFrames=2000,dt=0.25)
+    second = playGame(3,RandomPolicy(),maxFrames=2000,dt=0.25)
+    assert repr(first) == repr(second)
+    assert first.outcome in ('win','lose')
+
+
+def test_play_game_times_out():
+    result = playGame(1,ScriptedPolicy([()]),maxFrames=10)
+    assert (result.outcome,result.frames,result.shots) == ('timeout',10,0)
+    assert result.lives == SHIP_LIVES
+
+
+def test_idle_player_loses():
+    result = playGame(1,ScriptedPolicy([()]),maxFrames=5000,dt=0.25)
+    assert result.outcome == 'lose'
+    assert result.shots == 0
+
+
+def test_run_games_matches_play_game():
+    policy = RandomPolicy(0.4)
+    seeds = (seed for seed in range(10))
+    results = list(runGames(seeds,policy,workers=2,chunk=3,maxFrames=400,dt=0.25))
+    assert sorted(result.seed for result in results) == list(range(10))
+    for result in results:
+        expected = playGame(result.seed,policy,maxFrames=400,dt=0.25)
+        assert repr(result) == repr(expected)
@@ -0,0 +1,109 @@
+"""
+Tests for the SimBolts arrays in simulation.py.
+"""
+import random
+
+import pytest
+
+from consts import *
+from formation import sweepBox
+from simulation import SimBolt, SimBolts
+
+
+def fill(bolts, rng, count):
+    """Adds count random bolts to bolts, half of them fired by the player"""
+    for _ in range(count):
+        velocity = BOLT_SPEED if rng.random() < 0.5 else -BOLT_SPEED
+        bolts.add(rng.uniform(0,GAME_WIDTH),rng.uniform(0,GAME_HEIGHT),velocity)
+
+
+def state(bolts):
+    """Returns the bolts in play as a list of (x, y, velocity, player)"""
+    return list(zip(bolts.getX().tolist(),bolts.getY().tolist(),
+                    bolts.getVelocity().tolist(),bolts.getPlayer().tolist()))
+
+
+def test_add_drops_bolts_past_capacity():
+    bolts = SimBolts(2)
+    assert bolts.add(1,2,BOLT_SPEED)
+    assert bolts.add(3,4,-BOLT_SPEED)
+    assert not bolts.add(5,6,BOLT_SPEED)
+    assert len(bolts) == 2
+    assert bolts.countPlayer() == 1
+    assert bolts.getBolt(1) == (3.0,4.0,float(-BOLT_SPEED))
+
+
+def test_remove_swaps_with_last():
+    bolts = SimBolts(4)
+    for x in range(3):
+        bolts.add(x,10,BOLT_SPEED)
+    bolts.remove(0)
+    assert bolts.getX().tolist() == [2.0,1.0]
+    assert bolts.countPlayer() == 2
+    assert bolts.getPlayerSlots() == [1,0]
+
+
+def test_move_culls_bolts_outside_the_window():
+    bolts = SimBolts(8)
+    bolts.add(10,GAME_HEIGHT-1,BOLT_SPEED)
+    bolts.add(20,100,-BOLT_SPEED)
+    bolts.add(30,1,-BOLT_SPEED)
+    bolts.add(40,GAME_HEIGHT-BOLT_SPEED,BOLT_SPEED)
+    bolts.add(50,BOLT_SPEED,-BOLT_SPEED)
+    bolts.move()
+    assert bolts.getX().tolist() == [20.0,40.0,50.0]
+    assert bolts.countPlayer() == 1
+
+
+def test_touching_matches_sweep_box():
+    rng = random.Random(3)
+    bolts = SimBolts(BOLT_CAPACITY)
+    fill(bolts,rng,BOLT_CAPACITY)
+    halfW = (SHIP_WIDTH+BOLT_WIDTH)/2
+    halfH = (SHIP_HEIGHT+BOLT_HEIGHT)/2
+    for _ in range(50):
+        x = rng.uniform(0,GAME_WIDTH)
+        y = rng.uniform(0,GAME_HEIGHT)
+        expected = [sweepBox(bx,by-bv,bx,by,x,y,halfW,halfH) is not None
+                    for (bx,by,bv,_) in state(bolts)]
+        assert bolts.touching(x,y,SHIP_WIDTH,SHIP_HEIGHT).tolist() == expected
+
+
+@pytest.mark.parametrize('count',[0,1,5,16,BOLT_CAPACITY])
+def test_arrays_match_a_list_of_records(count):
+    rng = random.Random(count)
+    bolts = SimBolts(BOLT_CAPACITY)
+    fill(bolts,rng,count)
+    records = [SimBolt(x,y,v) for (x,y,v,_) in state(bolts)]
+    halfW = (SHIP_WIDTH+BOLT_WIDTH)/2
+    halfH = (SHIP_HEIGHT+BOLT_HEIGHT)/2
+    for _ in range(40):
+        x = rng.uniform(0,GAME_WIDTH)
+        kept = [bolt for bolt in records if bolt.isPlayerBolt() or
+                sweepBox(bolt.x,bolt.y-bolt.velocity,bolt.x,bolt.y,x,SHIP_BOTTOM,halfW,halfH) is None]
+        removed = bolts.removeTouching(x,SHIP_BOTTOM,SHIP_WIDTH,SHIP_HEIGHT,False)
+        assert removed == len(records)-len(kept)
+        records = []
+        for bolt in kept:
+            bolt.y += bolt.velocity
+            if 0 <= bolt.y <= GAME_HEIGHT:
+                records.append(bolt)
+        bolts.move()
+        assert bolts.getPositions() == [(bolt.x,bolt.y) for bolt in records]
+        assert bolts.countPlayer() == sum(bolt.isPlayerBolt() for bolt in records)
+        for _ in range(rng.randint(0,2)):
+            velocity = BOLT_SPEED if rng.random() < 0.5 else -BOLT_SPEED
+            record = SimBolt(rng.uniform(0,GAME_WIDTH),rng.uniform(0,GAME_HEIGHT),velocity)
+            if bolts.add(record.x,record.y,record.velocity):
+                records.append(record)
+
+
+def test_remove_touching_only_removes_one_owner():
+    bolts = SimBolts(4)
+    bolts.add(100,100,BOLT_SPEED)
+    bolts.add(100,100,-BOLT_SPEED)
+    bolts.add(300,100,-BOLT_SPEED)
+    assert bolts.removeTouching(100,100,10,10,False) == 1
+    assert state(bolts) == [(100.0,100.0,float(BOLT_SPEED),True),(300.0,100.0,float(-BOLT_SPEED),False)]
+    assert bolts.removeTouching(100,100,10,10,True) == 1
+    assert bolts.countPlayer() == 0
@@ -0,0 +1,164 @@
+"""
+Tests for the headless WaveSim core, and the Wave adapter that draws it.
+
+These check the rules that WaveSim took over from the original Wave: the march timer,
+the drop at the edges, one player bolt at a time, bolts destroying aliens, and alien
+bolts costing the ship a life.
+"""
+import random
+
+from consts import *
+from simulation import ArrayWaveSim, SimBolt, SimInput, WaveSim
+
+
+def quiet(wave):
+    """Stops the aliens in wave from firing"""
+    wave._randStep = -1
+    return wave
+
+
+def position(bolts):
+    """Returns the (x, y) centers of the bolts in a list of SimBolt or a SimBolts"""
+    if isinstance(bolts,list):
+        return [(bolt.x,bolt.y) for bolt in bolts]
+    return bolts.getPositions()
+
+
+def play(seed, frames, script, cls=WaveSim):
+    """Returns the trace of a seeded wave of class cls driven by a seeded random input"""
+    rng = random.Random(script)
+    wave = cls(seed)
+    input = SimInput()
+    trace = []
+    for _ in range(frames):
+        input.clear()
+        for key in ('left','right','spacebar'):
+            if rng.random() < 0.3:
+                input.press(key)
+        if wave.getShip() is None:
+            wave.setShip()
+            wave.setShipCol()
+        wave.update(input,1/60)
+        formation = wave.getFormation()
+        trace.append((formation.count(),formation.getOffset(),wave.getLives(),
+                      wave.getShots(),sorted(position(wave.getBolts()))))
+    return trace
+
+
+def test_aliens_march_on_a_timer():
+    wave = quiet(WaveSim(0))
+    input = SimInput()
+    marches = []
+    for frame in range(30):
+        before = wave.getFormation().extremes()[0]
+        wave.update(input,0.25)
+        after = wave.getFormation().extremes()[0]
+        if after != before:
+            assert after-before == ALIEN_H_WALK
+            marches.append(frame)
+    assert marches == [5,10,15,20,25]
+
+
+def test_wave_drops_and_reverses_at_the_edge():
+    wave = quiet(WaveSim(0))
+    input = SimInput()
+    formation = wave.getFormation()
+    bottom = formation.bottom()
+    while formation.bottom() == bottom:
+        wave.update(input,ALIEN_SPEED*2)
+    (left, right) = formation.extremes()
+    assert right >= GAME_WIDTH-ALIEN_H_SEP
+    assert formation.bottom() == bottom-ALIEN_V_WALK
+    wave.update(input,ALIEN_SPEED*2)
+    assert formation.extremes()[1] == right-ALIEN_H_WALK
+
+
+def test_player_fires_one_bolt_per_press():
+    wave = quiet(WaveSim(0))
+    input = SimInput()
+    input.press('spacebar')
+    for _ in range(3):
+        wave.update(input,1/60)
+    assert wave.getShots() == 1
+    input.clear()
+    wave.update(input,1/60)
+    input.press('spacebar')
+    wave.update(input,1/60)
+    assert wave.getShots() == 1
+    assert [bolt.isPlayerBolt() for bolt in wave.getBolts()] == [True]
+
+
+def test_bolt_destroys_the_lowest_alien_in_its_column():
+    wave = quiet(WaveSim(0))
+    formation = wave.getFormation()
+    wave.getShip().x = formation.position(ALIEN_ROWS-1,3)[0]
+    input = SimInput()
+    input.press('spacebar')
+    wave.update(input,1/60)
+    input.clear()
+    while formation.count() == ALIEN_ROWS*ALIENS_IN_ROW:
+        wave.update(input,1/60)
+    assert not formation.isAlive(ALIEN_ROWS-1,3)
+    assert formation.isAlive(ALIEN_ROWS-2,3)
+    assert formation.shooter(3) == ALIEN_ROWS-2
+    assert not any(bolt.isPlayerBolt() for bolt in wave.getBolts())
+
+
+def test_alien_bolt_costs_a_life():
+    wave = quiet(WaveSim(0))
+    ship = wave.getShip()
+    wave.getBolts().append(SimBolt(ship.x,ship.y+SHIP_HEIGHT,-BOLT_SPEED))
+    wave.getBolts().append(SimBolt(ship.x+SHIP_WIDTH,ship.y,-BOLT_SPEED))
+    input = SimInput()
+    while not wave.getShipCol():
+        wave.update(input,1/60)
+    assert wave.getLives() == SHIP_LIVES-1
+    assert len(wave.getBolts()) == 1
+
+    time = 0
+    while wave.getShip() is not None:
+        wave.update(input,1/60)
+        time += 1/60
+    assert DEATH_SPEED <= time <= DEATH_SPEED+0.05
+    assert len(wave.getBolts()) == 0
+
+
+def test_seeded_waves_are_reproducible():
+    first = play(7,1500,1)
+    assert first == play(7,1500,1)
+    assert first != play(8,1500,1)
+
+
+def test_array_wave_plays_the_same_game():
+    assert play(7,1500,1,ArrayWaveSim) == play(7,1500,1)
+    assert play(2,3000,5,ArrayWaveSim) == play(2,3000,5)
+
+
+def test_wave_draws_the_simulation(assets):
+    from game2d import GView
+    from wave import Wave
+    view = GView()
+    wave = Wave(3)
+    input = SimInput()
+    rng = random.Random(4)
+    for frame in range(600):
+        input.clear()
+        if rng.random() < 0.3:
+            input.press('spacebar')
+        wave.update(input,1/60)
+        if frame % 50 == 0:
+            view.clear()
+            wave.draw(view)
+            sim = wave._sim
+            formation = sim.getFormation()
+            drawn = set()
+            for batch in wave._aliens:
+                for (x,y) in batch.positions.tolist():
+                    drawn.add((x+batch.x,y+batch.y))
+            alive = set()
+            for row in range(ALIEN_ROWS):
+                for col in range(ALIENS_IN_ROW):
+                    if formation.isAlive(row,col):
+                        alive.add(formation.position(row,col))
+            assert drawn == alive
+            assert [(bolt.x,bolt.y) for bolt in wave._bolts] == position(sim.getBolts())